@@ -1,12 +1,51 @@
-from typing import Dict, List, Tuple
-import numpy as np
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from collections import Counter
+import hashlib
+import heapq
+import json
+import os
 import re
-from unicodedata import normalize
-from database import sample_texts
+import weakref
+from authors import AuthorSet
+from cache import ResultCache, hash_file, make_key, normalize_text
+from corpus import BuiltinCorpus, Corpus, CorpusEntry
+from index import BOUND_EPSILON
+from instrumentation import NULL_METRICS, Metrics, MetricsHook
+from profiles import ProfileStore
+from references import ReferenceSet
+from streaming import extract_stream_features, read_chunks
+from tokenizer import (DIGITS, SYMBOLS, sentence_length_stats, tokenize,
+                       word_frequency_stats)
+from vocabulary import CompactProfile
+
+# NumPy solo se importa en las rutas vectorizadas (score_many, formato columnar)
+if TYPE_CHECKING:
+    import numpy as np
+    from columnar import ColumnarFeatures
+
+# Número máximo de palabras distintas memorizadas por el motor de patrones
+WORD_CACHE_LIMIT = 200000
+
+# Versión del formato de rasgos; incrementarla invalida los perfiles guardados
+FEATURES_VERSION = 1
+
+# Niveles de detalle de los patrones ortográficos en los resultados:
+# solo scores, unos pocos ejemplos por categoría o las listas completas
+DETAIL_LEVELS = ('scores', 'examples', 'full')
+
+# Ejemplos por categoría con el nivel 'examples'
+MAX_PATTERN_EXAMPLES = 5
+
+# Almacén de perfiles por defecto, en la caché del usuario y no junto al código
+DEFAULT_PROFILE_STORE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'analizador-estilo', 'profiles.jsonl'
+)
 
 class SpellingPatternAnalyzer:
-    def __init__(self):
+    def __init__(self, metrics=NULL_METRICS):
+        self.metrics = metrics
+
         # Patrones comunes de errores ortográficos en español
         self.common_patterns = {
             'b_v': [
@@ -40,6 +79,14 @@ class SpellingPatternAnalyzer:
             ]
         }
 
+        # Patrones precompilados y resultados memorizados por palabra
+        self._compiled_patterns = [
+            (category, [(re.compile(pattern), replacement) for pattern, replacement in patterns])
+            for category, patterns in self.common_patterns.items()
+        ]
+        self._word_cache: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        self._pattern_count = sum(len(patterns) for _, patterns in self._compiled_patterns)
+
     def find_spelling_patterns(self, text: str) -> Dict[str, List[Tuple[str, str]]]:
         """
         Analiza el texto en busca de patrones de errores ortográficos.
@@ -50,29 +97,94 @@ class SpellingPatternAnalyzer:
         Returns:
             Dict[str, List[Tuple[str, str]]]: Diccionario con categorías de errores y sus instancias
         """
-        patterns_found = {category: [] for category in self.common_patterns.keys()}
-        words = text.lower().split()
+        with self.metrics.stage('spelling_patterns'):
+            patterns_found = {category: [] for category in self.common_patterns.keys()}
+            word_cache = self._word_cache
+            words = text.lower().split()
+            misses = 0
+
+            for word in words:
+                matches = word_cache.get(word)
+                if matches is None:
+                    if len(word_cache) >= WORD_CACHE_LIMIT:
+                        word_cache.clear()
+                    matches = self._match_word(word)
+                    word_cache[word] = matches
+                    misses += 1
+
+                for category, potential_error in matches:
+                    patterns_found[category].append((word, potential_error))
+
+        if self.metrics.enabled:
+            self.metrics.count('words_processed', len(words))
+            self.metrics.count('regex_evaluations', misses * self._pattern_count)
 
-        for word in words:
-            norm_word = normalize('NFKD', word).encode('ASCII', 'ignore').decode('ASCII')
+        return patterns_found
 
-            for category, patterns in self.common_patterns.items():
-                for pattern, replacement in patterns:
-                    if re.search(pattern, word):
-                        potential_error = re.sub(pattern, replacement, word)
-                        if potential_error != word:
-                            patterns_found[category].append((word, potential_error))
+    def word_matches(self, word: str) -> Tuple[Tuple[str, str], ...]:
+        """
+        Categorías y posibles errores de una palabra ya en minúsculas, memorizados.
 
-        return patterns_found
+        Args:
+            word (str): Palabra a analizar
+
+        Returns:
+            Tuple[Tuple[str, str], ...]: (categoría, posible error) por cada patrón que aplica
+        """
+        matches = self._word_cache.get(word)
+        if matches is None:
+            if len(self._word_cache) >= WORD_CACHE_LIMIT:
+                self._word_cache.clear()
+            matches = self._match_word(word)
+            self._word_cache[word] = matches
+            if self.metrics.enabled:
+                self.metrics.count('regex_evaluations', self._pattern_count)
+        return matches
+
+    def _match_word(self, word: str) -> Tuple[Tuple[str, str], ...]:
+        """Calcula las categorías y posibles errores de una palabra."""
+        matches = []
+        for category, patterns in self._compiled_patterns:
+            for regex, replacement in patterns:
+                # Si el patrón no aparece, la sustitución devuelve la misma palabra
+                potential_error = regex.sub(replacement, word)
+                if potential_error != word:
+                    matches.append((category, potential_error))
+        return tuple(matches)
 
 class TextStyleAnalyzer:
-    def __init__(self):
+    def __init__(self, profile_store_path: Optional[str] = DEFAULT_PROFILE_STORE,
+                 corpus: Optional[Corpus] = None, metrics: Optional[Metrics] = None,
+                 cache: Optional[ResultCache] = None, features_path: Optional[str] = None):
         self.spanish_stopwords = {
             'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'y', 'o',
             'pero', 'porque', 'que', 'de', 'a', 'en', 'con', 'por', 'para', 'del',
             'al', 'lo', 'le', 'se', 'su', 'sus', 'mi', 'mis', 'tu', 'tus'
         }
-        self.spelling_analyzer = SpellingPatternAnalyzer()
+        # Instrumentación opcional; desactivada no tiene coste apreciable
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.spelling_analyzer = SpellingPatternAnalyzer(self.metrics)
+
+        # Pesos para cada métrica
+        self.weights = {
+            'sentence_length': 0.2,
+            'word_length': 0.15,
+            'unique_words': 0.2,
+            'common_words': 0.15,
+            'spelling_patterns': 0.3
+        }
+
+        # Corpus de referencia por defecto y perfiles precalculados de sus textos
+        self.corpus = corpus if corpus is not None else BuiltinCorpus()
+        self.profile_store = ProfileStore(self, profile_store_path)
+
+        # Caché opcional de rasgos y coincidencias de textos ya analizados
+        self.cache = cache
+        # Perfiles exportados en formato columnar con los que arrancar sin recalcular
+        self.features_path = features_path
+        # Perfiles, índice y matriz de cada corpus usado, actualizados de forma incremental
+        self._references = weakref.WeakKeyDictionary()
+        self._author_sets = weakref.WeakKeyDictionary()
 
     def analyze_text(self, text: str) -> Dict:
         """
@@ -84,140 +196,572 @@ class TextStyleAnalyzer:
         Returns:
             Dict: Resultados del análisis
         """
-        # Análisis básico
-        word_count = len(text.split())
-        sentence_count = len([s for s in text.split('.') if s.strip()])
-
-        # Análisis de errores ortográficos
-        spelling_patterns = self.spelling_analyzer.find_spelling_patterns(text)
-
-        # Estadísticas de texto
-        stats = {
-            **self.get_sentence_length_stats(text),
-            **self.get_word_frequency_stats(text)
-        }
+        # Estadísticas básicas, patrones y estadísticas del texto sin preprocesar
+        # en un solo recorrido
+        record = tokenize(self, text, raw_stats=True)
 
         return {
-            'basic_stats': {
-                'word_count': word_count,
-                'sentence_count': sentence_count,
-                'avg_words_per_sentence': word_count / sentence_count if sentence_count > 0 else 0
-            },
-            'spelling_patterns': spelling_patterns,
-            'text_stats': stats
+            'basic_stats': record.basic_stats(),
+            'spelling_patterns': record.spelling_patterns,
+            'text_stats': record.raw_text_stats()
         }
 
-    def analyze_against_database(self, input_text: str, min_similarity: float = 70.0) -> List[Dict]:
+    def analyze_against_database(self, input_text: str, min_similarity: float = 70.0,
+                                 corpus: Optional[Corpus] = None,
+                                 top_k: Optional[int] = None,
+                                 detail: str = 'full') -> List[Dict]:
         """
         Compara un texto de entrada contra la base de datos de textos conocidos.
 
+        Con una caché configurada, los rasgos y las coincidencias se reutilizan
+        para textos ya analizados con la misma configuración y versión del corpus.
+
         Args:
             input_text (str): Texto a comparar
             min_similarity (float): Umbral mínimo de similitud (0-100)
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            top_k (Optional[int]): Devolver solo las top_k mejores coincidencias
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
+
+        Returns:
+            List[Dict]: Lista de coincidencias que superan el umbral
+        """
+        def extract():
+            # Solo se analiza el texto de entrada; los de referencia vienen del almacén
+            record = tokenize(self, input_text)
+            return record.features(), record.spelling_patterns
+
+        if self.cache is None:
+            return self.match_features(*extract(), min_similarity, corpus, top_k, detail)
+        return self._cached_matches('text', make_key(normalize_text(input_text)), extract,
+                                    min_similarity, corpus, top_k, detail)
+
+    def analyze_file_against_database(self, path: str, min_similarity: float = 70.0,
+                                      corpus: Optional[Corpus] = None,
+                                      chunk_size: Optional[int] = None,
+                                      top_k: Optional[int] = None,
+                                      detail: str = 'full') -> List[Dict]:
+        """
+        Compara un archivo contra la base de datos leyéndolo por bloques.
+
+        El archivo nunca se carga entero en memoria; las coincidencias incluyen
+        solo algunos ejemplos de cada categoría de patrones ortográficos. Con
+        una caché configurada, los resultados se reutilizan para archivos con
+        el mismo contenido.
+
+        Args:
+            path (str): Ruta del archivo UTF-8
+            min_similarity (float): Umbral mínimo de similitud (0-100)
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            chunk_size (Optional[int]): Caracteres leídos por bloque
+            top_k (Optional[int]): Devolver solo las top_k mejores coincidencias
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
+
+        Returns:
+            List[Dict]: Lista de coincidencias que superan el umbral
+        """
+        def extract():
+            result = extract_stream_features(self, read_chunks(path, chunk_size))
+            return result['features'], result['spelling_examples']
+
+        if self.cache is None:
+            return self.match_features(*extract(), min_similarity, corpus, top_k, detail)
+        # La huella se calcula leyendo el archivo por bloques, sin cargarlo entero
+        return self._cached_matches('file', hash_file(path), extract,
+                                    min_similarity, corpus, top_k, detail)
+
+    def _cached_matches(self, kind: str, content_hash: str,
+                        extract: Callable[[], Tuple[Dict, Dict]], min_similarity: float,
+                        corpus: Optional[Corpus], top_k: Optional[int],
+                        detail: str) -> List[Dict]:
+        """
+        match_features con los rasgos y las coincidencias guardados en la caché.
+
+        Args:
+            kind (str): Origen de la entrada ('text' o 'file'); los archivos solo
+                conservan algunos ejemplos de patrones, así que no comparten entradas
+            content_hash (str): Huella del contenido de la entrada
+            extract (Callable[[], Tuple[Dict, Dict]]): Calcula los rasgos y los
+                patrones ortográficos de la entrada
+            min_similarity (float): Umbral mínimo de similitud (0-100)
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            top_k (Optional[int]): Número máximo de coincidencias a devolver
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
+
+        Returns:
+            List[Dict]: Lista de coincidencias que superan el umbral
+        """
+        corpus = corpus if corpus is not None else self.corpus
+        # Huella calculada al crear el almacén de perfiles
+        feature_config = self.profile_store.config_hash
+        matches_key = make_key(kind, 'matches', content_hash, feature_config, self.weights,
+                               corpus.fingerprint, min_similarity, top_k, detail)
+
+        matches = self.cache.get(matches_key)
+        if matches is not None:
+            return matches
+
+        features_key = make_key(kind, 'features', content_hash, feature_config)
+        cached_features = self.cache.get(features_key)
+        if cached_features is None:
+            cached_features = extract()
+            self.cache.put(features_key, cached_features)
+
+        input_features, spelling_patterns = cached_features
+        matches = self.match_features(input_features, spelling_patterns, min_similarity, corpus,
+                                      top_k, detail)
+        self.cache.put(matches_key, matches)
+        return matches
+
+    def match_features(self, input_features: Dict, spelling_patterns: Dict,
+                       min_similarity: float = 70.0, corpus: Optional[Corpus] = None,
+                       top_k: Optional[int] = None, detail: str = 'full') -> List[Dict]:
+        """
+        Compara un vector de rasgos ya extraído contra la base de datos.
+
+        Con top_k, las referencias se evalúan en orden de su cota superior de
+        score y la búsqueda termina cuando ninguna de las restantes puede
+        entrar entre las top_k mejores. El resultado coincide con los primeros
+        top_k elementos de la búsqueda completa. Los patrones del texto de
+        entrada se preparan una vez y todas las coincidencias comparten el mismo
+        objeto 'raw_patterns', que debe tratarse como de solo lectura.
+
+        Args:
+            input_features (Dict): Vector de rasgos del texto de entrada
+            spelling_patterns (Dict): Patrones ortográficos del texto de entrada
+            min_similarity (float): Umbral mínimo de similitud (0-100)
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            top_k (Optional[int]): Número máximo de coincidencias a devolver
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
 
         Returns:
             List[Dict]: Lista de coincidencias que superan el umbral
         """
+        raw_patterns = self._raw_patterns(detail, text1=spelling_patterns)
+
+        metrics = self.metrics
+        with metrics.stage('reference_profiles'):
+            references = self._sync_references(corpus)
+        with metrics.stage('candidate_filter'):
+            candidates = references.index.bounded_candidates(input_features, min_similarity / 100)
+
+        with metrics.stage('scoring'):
+            # Las palabras del texto de entrada se traducen una vez al vocabulario común
+            query = references.codec.query(input_features)
+            if top_k is None:
+                scored = self._score_candidates(query, candidates, references, min_similarity)
+                evaluated = len(candidates)
+            else:
+                scored, evaluated = self._score_top_k(query, candidates, references,
+                                                      min_similarity, top_k)
+
         matches = []
+        for similarity_score, position, detailed_scores in scored:
+            entry = references.entries[position]
+            if raw_patterns is not None:
+                detailed_scores['raw_patterns'] = raw_patterns
+            matches.append({
+                'id': entry.id,
+                'autor': entry.autor,
+                'similitud': similarity_score * 100,
+                'detalles': detailed_scores
+            })
+
+        if metrics.enabled:
+            metrics.count('references_scored', evaluated)
+            metrics.count('references_skipped', len(references) - evaluated)
 
-        for sample in sample_texts:
-            similarity_score, detailed_scores = self.calculate_similarity_score(
-                input_text, sample['texto']
-            )
+        return matches
 
+    def _score_candidates(self, query: CompactProfile, candidates: List[Tuple],
+                          references: ReferenceSet, min_similarity: float) -> List[Tuple]:
+        """Evalúa todos los candidatos y los ordena por similitud descendente."""
+        # Se conserva el orden del corpus para desempatar igual que sin índice
+        positions = references.positions
+        candidates = sorted(candidates, key=lambda candidate: positions[candidate[1]])
+
+        # Con un archivo columnar solo se reconstruyen los perfiles de los candidatos
+        references.decode(key for _, key in candidates)
+        profiles = references.profiles
+        scored = []
+        for _, key in candidates:
+            similarity_score, detailed_scores = self.compare_features(query, profiles[key])
             if similarity_score * 100 >= min_similarity:
-                matches.append({
-                    'id': sample['id'],
-                    'autor': sample['autor'],
-                    'similitud': similarity_score * 100,
-                    'detalles': detailed_scores
-                })
+                scored.append((similarity_score, positions[key], detailed_scores))
 
         # Ordenar por similitud descendente
-        matches.sort(key=lambda x: x['similitud'], reverse=True)
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return scored
+
+    def _score_top_k(self, query: CompactProfile, candidates: List[Tuple],
+                     references: ReferenceSet, min_similarity: float,
+                     top_k: int) -> Tuple[List[Tuple], int]:
+        """
+        Evalúa los candidatos de mayor a menor cota con un montículo de top_k elementos.
+
+        Returns:
+            Tuple[List[Tuple], int]: Las top_k mejores (score, posición, detalles),
+                ordenadas como en _score_candidates, y el número de candidatos evaluados
+        """
+        if top_k <= 0:
+            return [], 0
+
+        # Montículo de cotas: la mayor primero, sin ordenar toda la lista
+        pending = [(-bound, i) for i, (bound, _) in enumerate(candidates)]
+        heapq.heapify(pending)
+
+        # Montículo de mínimos con las mejores coincidencias; a igual score gana
+        # la que aparece antes en el corpus. Con un archivo columnar solo se
+        # reconstruyen los perfiles que llegan a evaluarse
+        profiles, positions = references.profiles, references.positions
+        best = []
+        evaluated = 0
+        while pending:
+            negative_bound, i = heapq.heappop(pending)
+            if len(best) == top_k and -negative_bound + BOUND_EPSILON < best[0][0]:
+                break
+
+            _, key = candidates[i]
+            similarity_score, detailed_scores = self.compare_features(query, profiles[key])
+            evaluated += 1
+            if similarity_score * 100 < min_similarity:
+                continue
+
+            item = (similarity_score, -positions[key], i, detailed_scores)
+            if len(best) < top_k:
+                heapq.heappush(best, item)
+            elif item[:2] > best[0][:2]:
+                heapq.heapreplace(best, item)
+
+        best.sort(key=lambda item: item[:2], reverse=True)
+        return [(score, -negative_position, details)
+                for score, negative_position, _, details in best], evaluated
+
+    def analyze_against_authors(self, input_text: str, min_similarity: float = 70.0,
+                                corpus: Optional[Corpus] = None,
+                                top_k: Optional[int] = None,
+                                detail: str = 'full') -> List[Dict]:
+        """
+        Compara un texto de entrada contra el perfil agregado de cada autor.
+
+        Todas las muestras de un autor se combinan en un único perfil, de modo
+        que se calcula un score por autor en lugar de uno por texto. Un autor
+        con una sola muestra obtiene el mismo score que en analyze_against_database.
+
+        Args:
+            input_text (str): Texto a comparar
+            min_similarity (float): Umbral mínimo de similitud (0-100)
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            top_k (Optional[int]): Devolver solo los top_k autores más parecidos
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
+
+        Returns:
+            List[Dict]: Una coincidencia por autor que supera el umbral, con el
+                número de muestras agregadas en 'muestras'
+        """
+        record = tokenize(self, input_text)
+        input_features = record.features()
+        raw_patterns = self._raw_patterns(detail, text1=record.spelling_patterns)
+
+        metrics = self.metrics
+        corpus = corpus if corpus is not None else self.corpus
+        with metrics.stage('author_profiles'):
+            author_set = self._author_sets.get(corpus)
+            if author_set is None:
+                author_set = AuthorSet(self)
+                self._author_sets[corpus] = author_set
+            author_set.sync(corpus)
+            profiles = author_set.author_profiles()
+
+        matches = []
+        with metrics.stage('scoring'):
+            for profile in profiles:
+                similarity_score, detailed_scores = self.compare_features(
+                    input_features, profile.features()
+                )
+
+                if similarity_score * 100 >= min_similarity:
+                    if raw_patterns is not None:
+                        detailed_scores['raw_patterns'] = raw_patterns
+                    matches.append({
+                        'autor': profile.autor,
+                        'muestras': profile.samples,
+                        'similitud': similarity_score * 100,
+                        'detalles': detailed_scores
+                    })
+
+            # Ordenar por similitud descendente
+            if top_k is None:
+                matches.sort(key=lambda x: x['similitud'], reverse=True)
+            else:
+                matches = heapq.nlargest(max(0, top_k), matches, key=lambda x: x['similitud'])
+
+        if metrics.enabled:
+            metrics.count('authors_scored', len(profiles))
+
         return matches
 
-    def preprocess_text(self, text: str) -> str:
-        """Preprocesa el texto para análisis."""
-        text = text.lower()
-        text = re.sub(r'\d+', '', text)
-        text = re.sub(r'[^\w\s\.]', '', text)
-        return text
+    def enable_instrumentation(self, hook: Optional[MetricsHook] = None) -> Metrics:
+        """
+        Activa los temporizadores por etapa y los contadores.
 
-    def get_sentence_length_stats(self, text: str) -> Dict[str, float]:
-        """Calcula estadísticas sobre la longitud de las oraciones."""
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
-        lengths = [len(s.split()) for s in sentences]
+        Args:
+            hook (Optional[MetricsHook]): Función que recibe cada medición como
+                (tipo, nombre, valor), p. ej. para enviarla a un colector propio
 
-        return {
-            'avg_sentence_length': np.mean(lengths) if lengths else 0,
-            'std_sentence_length': np.std(lengths) if lengths else 0,
-            'max_sentence_length': max(lengths) if lengths else 0,
-            'min_sentence_length': min(lengths) if lengths else 0
-        }
+        Returns:
+            Metrics: Métricas activas del analizador
+        """
+        if not self.metrics.enabled:
+            self.metrics = Metrics()
+            self.spelling_analyzer.metrics = self.metrics
+        if hook is not None:
+            self.metrics.add_hook(hook)
+        return self.metrics
+
+    def disable_instrumentation(self):
+        """Desactiva la instrumentación."""
+        self.metrics = NULL_METRICS
+        self.spelling_analyzer.metrics = NULL_METRICS
+
+    def get_metrics(self) -> Dict:
+        """
+        Devuelve los tiempos por etapa y los contadores acumulados.
 
-    def get_word_frequency_stats(self, text: str) -> Dict[str, float]:
-        """Calcula estadísticas sobre frecuencia de palabras."""
-        words = [w for w in text.split() if w not in self.spanish_stopwords]
-        freq = Counter(words)
+        Returns:
+            Dict: Instantánea de las métricas; vacía si la instrumentación está desactivada
+        """
+        if not self.metrics.enabled:
+            return {}
+        return self.metrics.snapshot()
+
+    def _sync_references(self, corpus: Optional[Corpus] = None) -> ReferenceSet:
+        """Devuelve las estructuras de referencia de un corpus, aplicando sus cambios."""
+        corpus = corpus if corpus is not None else self.corpus
+        references = self._references.get(corpus)
+        if references is None:
+            references = ReferenceSet(self.weights, self.profile_store.codec)
+            self._references[corpus] = references
+            columnar = self._open_features()
+            if columnar is not None:
+                references.load_columnar(corpus, columnar)
+        references.sync(corpus, self.profile_store)
+        return references
+
+    def _open_features(self) -> Optional['ColumnarFeatures']:
+        """Abre los perfiles exportados si existen y son de esta configuración."""
+        if not self.features_path:
+            return None
+        from columnar import ColumnarFeatures
+        try:
+            columnar = ColumnarFeatures(self.features_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if columnar.config != self.profile_store.config_hash:
+            return None
+        return columnar
+
+    def export_features(self, path: Optional[str] = None, corpus: Optional[Corpus] = None):
+        """
+        Exporta los perfiles de un corpus en formato columnar para abrirlos con numpy.memmap.
 
-        return {
-            'unique_words_ratio': len(set(words)) / len(words) if words else 0,
-            'avg_word_length': np.mean([len(w) for w in words]) if words else 0,
-            'common_words': set(dict(freq.most_common(10)).keys())
+        Args:
+            path (Optional[str]): Directorio destino; por defecto features_path
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+        """
+        from columnar import write_columnar
+
+        path = path or self.features_path
+        if not path:
+            raise ValueError("No se indicó el directorio de los perfiles exportados")
+        references = self._sync_references(corpus)
+        write_columnar(
+            path,
+            [entry.id for entry in references.entries],
+            references.profile_list(),
+            [references.fingerprints[entry.id] for entry in references.entries],
+            self.profile_store.config_hash,
+            references.corpus_fingerprint
+        )
+
+    def prepare_references(self, corpus: Optional[Corpus] = None
+                           ) -> Tuple[List[CorpusEntry], List[Dict]]:
+        """
+        Obtiene los perfiles de un corpus, calculando y guardando los que falten.
+
+        Tras un cambio en el corpus solo se procesan las entradas afectadas.
+
+        Args:
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+
+        Returns:
+            Tuple[List[CorpusEntry], List[Dict]]: Entradas del corpus y sus vectores
+                de rasgos, en el orden del corpus
+        """
+        references = self._sync_references(corpus)
+        return references.entries, references.profile_list()
+
+    def load_references(self, corpus: Optional[Corpus] = None) -> int:
+        """
+        Deja listos los perfiles y el índice de un corpus sin devolverlos.
+
+        A diferencia de prepare_references, no reconstruye los perfiles de un
+        archivo columnar: con features_path, el índice trabaja sobre los
+        arreglos proyectados y el arranque no depende del tamaño del corpus.
+
+        Args:
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+
+        Returns:
+            int: Número de textos de referencia
+        """
+        references = self._sync_references(corpus)
+        # El índice se construye en su primer uso
+        references.index
+        return len(references)
+
+    def compact_references(self, corpus: Optional[Corpus] = None, exclusive: bool = False):
+        """
+        Compacta el almacenamiento del corpus, la matriz de rasgos y el almacén de perfiles.
+
+        Del almacén, que puede compartirse con otros corpus, solo se descartan
+        los perfiles de textos que este corpus dejó de usar mientras el
+        analizador lo tenía cargado y que no usa ningún otro corpus cargado.
+        Con exclusive, el almacén se considera propio de los corpus cargados y
+        se descarta todo lo demás, incluidos los perfiles de bajas anteriores.
+
+        Args:
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+            exclusive (bool): El almacén de perfiles solo sirve a este analizador
+        """
+        corpus = corpus if corpus is not None else self.corpus
+        corpus.compact()
+        references = self._sync_references(corpus)
+        references.compact()
+
+        live = set()
+        for loaded in self._references.values():
+            live.update(loaded.fingerprints.values())
+        if exclusive:
+            self.profile_store.compact(live)
+        else:
+            self.profile_store.discard(references.retired - live)
+        references.retired.clear()
+
+    def score_many(self, input_text: str, corpus: Optional[Corpus] = None
+                   ) -> Tuple['np.ndarray', Dict[str, 'np.ndarray']]:
+        """
+        Calcula en bloque la similitud de un texto contra toda la base de datos.
+
+        Args:
+            input_text (str): Texto a comparar
+            corpus (Optional[Corpus]): Corpus de referencia; por defecto el del analizador
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: Scores de similitud (0-1) y
+                similitudes individuales, en el orden del corpus
+        """
+        input_features = self.extract_features(input_text)
+        references = self._sync_references(corpus)
+        scores, detailed_scores = references.matrix().score(input_features, self.weights)
+        order = references.order()
+        return scores[order], {name: values[order] for name, values in detailed_scores.items()}
+
+    def feature_config_hash(self) -> str:
+        """Huella de la configuración que determina los rasgos extraídos."""
+        config = {
+            'version': FEATURES_VERSION,
+            'patterns': self.spelling_analyzer.common_patterns,
+            'stopwords': sorted(self.spanish_stopwords)
         }
+        encoded = json.dumps(config, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
 
-    def calculate_similarity_score(self, text1: str, text2: str) -> Tuple[float, Dict]:
+    def extract_features(self, text: str,
+                         spelling_patterns: Optional[Dict] = None) -> Dict:
         """
-        Calcula la similitud entre dos textos.
+        Extrae el vector de rasgos de un texto usado en la comparación.
 
         Args:
-            text1 (str): Primer texto
-            text2 (str): Segundo texto
+            text (str): Texto a analizar
+            spelling_patterns (Optional[Dict]): Patrones ya calculados para el texto;
+                si se indican, determinan las categorías ortográficas
 
         Returns:
-            Tuple[float, Dict]: Score de similitud (0-1) y detalles del cálculo
+            Dict: Estadísticas de oraciones y palabras, palabras comunes y
+                presencia de cada categoría de patrones ortográficos
+        """
+        features = tokenize(self, text).features()
+        if spelling_patterns is not None:
+            features['spelling_categories'] = {
+                category: bool(errors) for category, errors in spelling_patterns.items()
+            }
+        return features
+
+    def compare_features(self, features1: Dict, features2: Dict) -> Tuple[float, Dict]:
         """
-        # Análisis de errores ortográficos
-        spelling_patterns1 = self.spelling_analyzer.find_spelling_patterns(text1)
-        spelling_patterns2 = self.spelling_analyzer.find_spelling_patterns(text2)
-        spelling_sim = self._compare_spelling_patterns(spelling_patterns1, spelling_patterns2)
+        Calcula la similitud entre dos vectores de rasgos.
+
+        Args:
+            features1 (Dict): Rasgos del primer texto
+            features2 (Dict): Rasgos del segundo texto
 
-        # Preprocesar textos
-        proc_text1 = self.preprocess_text(text1)
-        proc_text2 = self.preprocess_text(text2)
+        Returns:
+            Tuple[float, Dict]: Score de similitud (0-1) y detalles del cálculo
+        """
+        if isinstance(features1, CompactProfile) and isinstance(features2, CompactProfile):
+            return self._compare_compact(features1, features2)
 
-        # Obtener estadísticas
-        stats1 = {**self.get_sentence_length_stats(proc_text1),
-                 **self.get_word_frequency_stats(proc_text1)}
-        stats2 = {**self.get_sentence_length_stats(proc_text2),
-                 **self.get_word_frequency_stats(proc_text2)}
+        spelling_sim = self._compare_spelling_patterns(
+            features1['spelling_categories'],
+            features2['spelling_categories']
+        )
 
         # Calcular similitudes individuales
         sentence_length_sim = self._safe_similarity(
-            stats1['avg_sentence_length'],
-            stats2['avg_sentence_length']
+            features1['avg_sentence_length'],
+            features2['avg_sentence_length']
         )
         word_length_sim = self._safe_similarity(
-            stats1['avg_word_length'],
-            stats2['avg_word_length']
+            features1['avg_word_length'],
+            features2['avg_word_length']
         )
         unique_words_sim = self._safe_similarity(
-            stats1['unique_words_ratio'],
-            stats2['unique_words_ratio']
+            features1['unique_words_ratio'],
+            features2['unique_words_ratio']
         )
         common_words_sim = len(
-            stats1['common_words'].intersection(stats2['common_words'])
+            features1['common_words'].intersection(features2['common_words'])
         ) / 10
 
-        # Pesos para cada métrica
-        weights = {
-            'sentence_length': 0.2,
-            'word_length': 0.15,
-            'unique_words': 0.2,
-            'common_words': 0.15,
-            'spelling_patterns': 0.3
-        }
+        return self._weighted_score(sentence_length_sim, word_length_sim, unique_words_sim,
+                                    common_words_sim, spelling_sim)
+
+    def _compare_compact(self, profile1: CompactProfile,
+                         profile2: CompactProfile) -> Tuple[float, Dict]:
+        """
+        compare_features para dos perfiles compactos del mismo vocabulario.
+
+        Las palabras comunes se cruzan como enteros y las categorías
+        ortográficas con la máscara de bits; el resultado es idéntico.
+        """
+        category_count = len(profile1.codec.categories)
+        differing = bin(profile1.spelling ^ profile2.spelling).count('1')
+        spelling_sim = (category_count - differing) / category_count if category_count else 0.0
+
+        return self._weighted_score(
+            self._safe_similarity(profile1.avg_sentence_length, profile2.avg_sentence_length),
+            self._safe_similarity(profile1.avg_word_length, profile2.avg_word_length),
+            self._safe_similarity(profile1.unique_words_ratio, profile2.unique_words_ratio),
+            profile1.common_word_overlap(profile2) / 10,
+            spelling_sim
+        )
+
+    def _weighted_score(self, sentence_length_sim: float, word_length_sim: float,
+                        unique_words_sim: float, common_words_sim: float,
+                        spelling_sim: float) -> Tuple[float, Dict]:
+        """Combina las similitudes individuales con los pesos del analizador."""
+        weights = self.weights
 
         # Calcular score final
         final_score = (
@@ -233,32 +777,103 @@ class TextStyleAnalyzer:
             'word_length_similarity': word_length_sim,
             'unique_words_similarity': unique_words_sim,
             'common_words_similarity': common_words_sim,
-            'spelling_patterns_similarity': spelling_sim,
-            'raw_patterns': {
-                'text1': spelling_patterns1,
-                'text2': spelling_patterns2
-            }
+            'spelling_patterns_similarity': spelling_sim
         }
 
         return final_score, detailed_scores
 
+    def preprocess_text(self, text: str) -> str:
+        """Preprocesa el texto para análisis."""
+        with self.metrics.stage('preprocess'):
+            text = text.lower()
+            text = DIGITS.sub('', text)
+            text = SYMBOLS.sub('', text)
+        return text
+
+    def get_sentence_length_stats(self, text: str) -> Dict[str, float]:
+        """Calcula estadísticas sobre la longitud de las oraciones."""
+        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        return sentence_length_stats([len(s.split()) for s in sentences])
+
+    def get_word_frequency_stats(self, text: str) -> Dict[str, float]:
+        """Calcula estadísticas sobre frecuencia de palabras."""
+        words = [w for w in text.split() if w not in self.spanish_stopwords]
+        return word_frequency_stats(Counter(words), len(words), sum(len(w) for w in words))
+
+    def calculate_similarity_score(self, text1: str, text2: str,
+                                   detail: str = 'full') -> Tuple[float, Dict]:
+        """
+        Calcula la similitud entre dos textos.
+
+        Args:
+            text1 (str): Primer texto
+            text2 (str): Segundo texto
+            detail (str): Nivel de detalle de 'raw_patterns' (ver DETAIL_LEVELS)
+
+        Returns:
+            Tuple[float, Dict]: Score de similitud (0-1) y detalles del cálculo
+        """
+        # Rasgos y patrones ortográficos de cada texto en un solo recorrido
+        record1 = tokenize(self, text1)
+        record2 = tokenize(self, text2)
+
+        final_score, detailed_scores = self.compare_features(record1.features(),
+                                                             record2.features())
+        raw_patterns = self._raw_patterns(detail, text1=record1.spelling_patterns,
+                                          text2=record2.spelling_patterns)
+        if raw_patterns is not None:
+            detailed_scores['raw_patterns'] = raw_patterns
+
+        return final_score, detailed_scores
+
+    @staticmethod
+    def _raw_patterns(detail: str, **patterns: Dict) -> Optional[Dict]:
+        """
+        Prepara 'raw_patterns' según el nivel de detalle pedido.
+
+        Args:
+            detail (str): 'scores', 'examples' o 'full'
+            **patterns (Dict): Patrones ortográficos de cada texto ('text1', 'text2')
+
+        Returns:
+            Optional[Dict]: None con 'scores'; si no, los patrones de cada texto,
+                recortados a MAX_PATTERN_EXAMPLES por categoría con 'examples'
+        """
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"Nivel de detalle desconocido: {detail!r}")
+        if detail == 'scores':
+            return None
+        if detail == 'examples':
+            return {
+                name: {category: errors[:MAX_PATTERN_EXAMPLES]
+                       for category, errors in text_patterns.items()}
+                for name, text_patterns in patterns.items()
+            }
+        return patterns
+
     def _compare_spelling_patterns(self, patterns1: Dict, patterns2: Dict) -> float:
-        """Compara patrones de errores ortográficos entre dos textos."""
+        """
+        Compara patrones de errores ortográficos entre dos textos.
+
+        Cada categoría puede venir como lista de errores, booleano o, en los
+        perfiles de autor, fracción de muestras en que aparece.
+        """
         similarity_scores = []
 
         for category in patterns1.keys():
             # Calcular similitud basada en la presencia de tipos similares de errores
-            has_pattern1 = bool(patterns1[category])
-            has_pattern2 = bool(patterns2[category])
+            has_pattern1 = self._pattern_frequency(patterns1[category])
+            has_pattern2 = self._pattern_frequency(patterns2[category])
+            similarity_scores.append(1.0 - abs(has_pattern1 - has_pattern2))
 
-            if has_pattern1 and has_pattern2:
-                similarity_scores.append(1.0)
-            elif not has_pattern1 and not has_pattern2:
-                similarity_scores.append(1.0)
-            else:
-                similarity_scores.append(0.0)
+        return sum(similarity_scores) / len(similarity_scores) if similarity_scores else 0.0
 
-        return np.mean(similarity_scores) if similarity_scores else 0.0
+    @staticmethod
+    def _pattern_frequency(value) -> float:
+        """Frecuencia (0-1) de una categoría: las fracciones se conservan, el resto es presencia."""
+        if isinstance(value, float):
+            return value
+        return 1.0 if value else 0.0
 
     def _safe_similarity(self, val1: float, val2: float) -> float:
         """Calcula similitud entre dos valores de manera segura."""
@@ -287,16 +902,23 @@ def format_analysis_results(results: List[Dict]) -> str:
     for match in results:
         output.append(f"\nCoincidencia con Autor: {match['autor']}")
         output.append(f"Porcentaje de similitud: {match['similitud']:.2f}%")
+        if 'muestras' in match:
+            output.append(f"Muestras del autor: {match['muestras']}")
         output.append("\nDetalles de la similitud:")
         for key, value in match['detalles'].items():
             if key != 'raw_patterns':
                 output.append(f"- {key}: {value:.2f}")
 
+        raw_patterns = match['detalles'].get('raw_patterns')
+        if not raw_patterns:
+            continue
+
         output.append("\nPatrones de errores ortográficos encontrados:")
-        for category, errors in match['detalles']['raw_patterns']['text1'].items():
+        for category, errors in raw_patterns['text1'].items():
             if errors:
                 output.append(f"\n{category}:")
-                for original, correction in errors[:5]:  # Mostrar solo los primeros 5 ejemplos
+                # Mostrar solo los primeros ejemplos
+                for original, correction in errors[:MAX_PATTERN_EXAMPLES]:
                     output.append(f"  {original} -> {correction}")
 
     return "\n".join(output)
\ No newline at end of file
@@ -0,0 +1,218 @@
+# authors.py
+import math
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from corpus import Corpus
+from tokenizer import tokenize
+
+
+def summarize_text(analyzer, text: str) -> Dict:
+    """
+    Calcula las estadísticas suficientes de un texto para agregarlo a un autor.
+
+    Args:
+        analyzer (TextStyleAnalyzer): Analizador con la configuración a usar
+        text (str): Texto de referencia
+
+    Returns:
+        Dict: Conteos, sumas y dispersión de oraciones y palabras, frecuencias
+            de palabras y presencia de cada categoría ortográfica
+    """
+    record = tokenize(analyzer, text)
+    lengths = record.sentence_lengths
+    mean = sum(lengths) / len(lengths) if lengths else 0.0
+    words = record.content_words
+
+    return {
+        'sentences': len(lengths),
+        'sentence_total': sum(lengths),
+        'sentence_m2': sum((length - mean) ** 2 for length in lengths),
+        'sentence_max': max(lengths) if lengths else 0,
+        'sentence_min': min(lengths) if lengths else 0,
+        'words': words,
+        'word_chars': record.content_chars,
+        'unique_words_ratio': len(record.word_freq) / words if words else 0,
+        'word_counts': record.word_freq,
+        'spelling_categories': record.spelling_categories()
+    }
+
+
+class AuthorProfile:
+    """
+    Perfil de un autor agregado sobre todas sus muestras.
+
+    Las longitudes de oración se combinan con la fórmula de Chan para medias
+    y varianzas, las frecuencias de palabras se suman y las categorías
+    ortográficas pasan a ser la fracción de muestras en que aparecen. Con una
+    sola muestra, features() coincide con extract_features del texto.
+    """
+
+    def __init__(self, autor: str):
+        """
+        Args:
+            autor (str): Nombre del autor
+        """
+        self.autor = autor
+        self.samples = 0
+        self.sentences = 0
+        self.sentence_total = 0
+        self.sentence_m2 = 0.0
+        self.sentence_max = 0
+        self.sentence_min = 0
+        self.words = 0
+        self.word_chars = 0
+        self.unique_ratio_total = 0.0
+        self.word_counts = Counter()
+        self.spelling_counts: Dict[str, int] = {}
+        self._features: Optional[Dict] = None
+
+    def add(self, summary: Dict):
+        """
+        Incorpora una muestra.
+
+        Args:
+            summary (Dict): Resultado de summarize_text
+        """
+        n_a, n_b = self.sentences, summary['sentences']
+        if n_b:
+            if n_a:
+                delta = summary['sentence_total'] / n_b - self.sentence_total / n_a
+                self.sentence_m2 += (summary['sentence_m2'] +
+                                     delta * delta * n_a * n_b / (n_a + n_b))
+                self.sentence_max = max(self.sentence_max, summary['sentence_max'])
+                self.sentence_min = min(self.sentence_min, summary['sentence_min'])
+            else:
+                self.sentence_m2 = summary['sentence_m2']
+                self.sentence_max = summary['sentence_max']
+                self.sentence_min = summary['sentence_min']
+            self.sentences += n_b
+            self.sentence_total += summary['sentence_total']
+
+        self.samples += 1
+        self.words += summary['words']
+        self.word_chars += summary['word_chars']
+        self.unique_ratio_total += summary['unique_words_ratio']
+        self.word_counts.update(summary['word_counts'])
+        for category, present in summary['spelling_categories'].items():
+            self.spelling_counts[category] = self.spelling_counts.get(category, 0) + present
+
+        self._features = None
+
+    def features(self) -> Dict:
+        """
+        Vector de rasgos del autor, con el formato de extract_features.
+
+        Returns:
+            Dict: Rasgos agregados; 'spelling_categories' contiene la fracción
+                de muestras con cada categoría en lugar de un booleano
+        """
+        if self._features is None:
+            sentences = self.sentences
+            self._features = {
+                'avg_sentence_length': self.sentence_total / sentences if sentences else 0,
+                'std_sentence_length': math.sqrt(self.sentence_m2 / sentences) if sentences else 0,
+                'max_sentence_length': self.sentence_max,
+                'min_sentence_length': self.sentence_min,
+                'unique_words_ratio': self.unique_ratio_total / self.samples if self.samples else 0,
+                'avg_word_length': self.word_chars / self.words if self.words else 0,
+                'common_words': set(dict(self.word_counts.most_common(10)).keys()),
+                'spelling_categories': {
+                    category: count / self.samples
+                    for category, count in self.spelling_counts.items()
+                }
+            }
+        return self._features
+
+
+class AuthorSet:
+    """
+    Perfiles por autor de un corpus, mantenidos de forma incremental.
+
+    Las estadísticas de cada texto se calculan una vez y se guardan por su
+    huella. Las altas que siguen a todas las muestras de su autor se suman a
+    su perfil; una baja, una modificación o una muestra que llega antes de
+    otras del autor recombina solo ese autor, en el orden del corpus y a
+    partir de las estadísticas ya calculadas, sin volver a leer sus textos.
+    El resultado coincide siempre con el de sincronizar un AuthorSet nuevo.
+    """
+
+    def __init__(self, analyzer):
+        """
+        Args:
+            analyzer (TextStyleAnalyzer): Analizador con la configuración a usar
+        """
+        self.analyzer = analyzer
+        self.profiles: Dict[str, AuthorProfile] = {}
+        self.corpus_fingerprint: Optional[str] = None
+        self._members: Dict[Hashable, Tuple[str, str]] = {}
+        self._summaries: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def _summary(self, entry) -> Dict:
+        summary = self._summaries.get(entry.fingerprint)
+        if summary is None:
+            summary = summarize_text(self.analyzer, entry.read_text())
+            self._summaries[entry.fingerprint] = summary
+        return summary
+
+    def sync(self, corpus: Corpus) -> bool:
+        """
+        Aplica los cambios del corpus desde la última sincronización.
+
+        Args:
+            corpus (Corpus): Corpus de referencia
+
+        Returns:
+            bool: True si el corpus había cambiado
+        """
+        fingerprint = corpus.fingerprint
+        if fingerprint == self.corpus_fingerprint:
+            return False
+
+        entries = list(corpus)
+        members = {entry.id: (entry.autor, entry.fingerprint) for entry in entries}
+
+        # Autores con bajas o modificaciones: se recombinan desde sus muestras
+        stale = {autor for key, (autor, _) in self._members.items()
+                 if members.get(key) != self._members[key]}
+
+        # Las palabras comunes desempatan por orden de aparición, así que una
+        # muestra nueva solo se suma al final si sigue a todas las que el autor
+        # conserva; si no, el autor también se recombina en el orden del corpus
+        last_kept = {}
+        for position, entry in enumerate(entries):
+            if self._members.get(entry.id) == members[entry.id]:
+                last_kept[entry.autor] = position
+        for position, entry in enumerate(entries):
+            if (self._members.get(entry.id) != members[entry.id] and
+                    position < last_kept.get(entry.autor, -1)):
+                stale.add(entry.autor)
+
+        profiles = {}
+        for entry in entries:
+            autor = entry.autor
+            profile = profiles.get(autor)
+            if profile is None:
+                profile = self.profiles.get(autor)
+                if profile is None or autor in stale:
+                    profile = AuthorProfile(autor)
+                profiles[autor] = profile
+            if (autor in stale or profile is not self.profiles.get(autor) or
+                    self._members.get(entry.id) != members[entry.id]):
+                profile.add(self._summary(entry))
+
+        live = {entry_fingerprint for _, entry_fingerprint in members.values()}
+        self._summaries = {
+            key: summary for key, summary in self._summaries.items() if key in live
+        }
+        self.profiles = profiles
+        self._members = members
+        self.corpus_fingerprint = fingerprint
+        return True
+
+    def author_profiles(self) -> List[AuthorProfile]:
+        """Perfiles en el orden de la primera aparición de cada autor en el corpus."""
+        return list(self.profiles.values())
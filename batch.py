@@ -0,0 +1,210 @@
+# batch.py
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from analyzer import TextStyleAnalyzer
+from instrumentation import Metrics
+from workers import create_analyzer, worker_analyzer, worker_pool
+
+# Extensiones consideradas al recorrer un directorio
+TEXT_EXTENSIONS = ('.txt',)
+
+# Columnas de la salida CSV (una fila por coincidencia)
+CSV_COLUMNS = [
+    'archivo', 'id', 'autor', 'similitud',
+    'sentence_length_similarity', 'word_length_similarity',
+    'unique_words_similarity', 'common_words_similarity',
+    'spelling_patterns_similarity', 'error'
+]
+
+
+def expand_inputs(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Expande archivos, directorios y patrones glob a las rutas de archivo.
+
+    Args:
+        inputs (Iterable[str]): Rutas, directorios o patrones glob
+
+    Returns:
+        Iterator[str]: Rutas de los archivos a analizar, sin repetidos
+    """
+    seen = set()
+
+    def emit(path):
+        if path not in seen:
+            seen.add(path)
+            yield path
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if name.lower().endswith(TEXT_EXTENSIONS):
+                        yield from emit(os.path.join(root, name))
+        elif os.path.isfile(item):
+            yield from emit(item)
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield from emit(path)
+
+
+def format_matches(matches: List[Dict]) -> List[Dict]:
+    """Convierte las coincidencias del analizador en registros serializables a JSON."""
+    return [
+        {
+            'id': match['id'],
+            'autor': match['autor'],
+            'similitud': float(match['similitud']),
+            'detalles': {key: float(value) for key, value in match['detalles'].items()}
+        }
+        for match in matches
+    ]
+
+
+def score_file(path: str, min_similarity: float,
+               analyzer: Optional[TextStyleAnalyzer] = None, top_k: Optional[int] = None) -> Dict:
+    """
+    Analiza un archivo contra la base de datos.
+
+    Args:
+        path (str): Ruta del archivo
+        min_similarity (float): Umbral mínimo de similitud (0-100)
+        analyzer (Optional[TextStyleAnalyzer]): Analizador a usar; por defecto el del proceso
+        top_k (Optional[int]): Conservar solo las top_k mejores coincidencias
+
+    Returns:
+        Dict: Registro con el archivo, sus coincidencias y el error si lo hubo;
+            con la instrumentación activa incluye también sus 'metricas'
+    """
+    analyzer = analyzer or worker_analyzer() or TextStyleAnalyzer()
+    if analyzer.metrics.enabled:
+        analyzer.metrics.reset()
+
+    try:
+        # Los registros solo llevan los scores: no se prepara 'raw_patterns'
+        matches = analyzer.analyze_file_against_database(path, min_similarity=min_similarity,
+                                                         top_k=top_k, detail='scores')
+    except Exception as e:
+        record = {'archivo': path, 'coincidencias': [], 'error': str(e)}
+    else:
+        record = {'archivo': path, 'coincidencias': format_matches(matches), 'error': None}
+
+    if analyzer.metrics.enabled:
+        record['metricas'] = analyzer.get_metrics()
+    return record
+
+
+class ResultWriter:
+    """Escribe registros de resultados en JSONL o CSV a medida que llegan."""
+
+    def __init__(self, output: str, output_format: Optional[str] = None):
+        """
+        Args:
+            output (str): Archivo de salida, o '-' para la salida estándar
+            output_format (Optional[str]): 'jsonl' o 'csv'; se deduce de la extensión si falta
+        """
+        if output_format is None:
+            output_format = 'csv' if output.lower().endswith('.csv') else 'jsonl'
+        self.format = output_format
+        self._file = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8', newline='')
+        self._csv = None
+        if self.format == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_COLUMNS)
+            self._csv.writeheader()
+
+    def write(self, record: Dict):
+        """Escribe un registro y vacía el búfer para que la salida sea incremental."""
+        if self._csv is None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            rows = record['coincidencias'] or [{}]
+            for match in rows:
+                self._csv.writerow({
+                    'archivo': record['archivo'],
+                    'id': match.get('id', ''),
+                    'autor': match.get('autor', ''),
+                    'similitud': match.get('similitud', ''),
+                    **match.get('detalles', {}),
+                    'error': record['error'] or ''
+                })
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def run_batch(inputs: List[str], min_similarity: float = 70.0, workers: Optional[int] = None,
+              output: str = '-', output_format: Optional[str] = None,
+              corpus_path: Optional[str] = None, timings: bool = False,
+              top_k: Optional[int] = None, cache_dir: Optional[str] = None) -> Dict:
+    """
+    Analiza un conjunto de documentos en paralelo y escribe los resultados.
+
+    Con cache_dir, los documentos cuyo contenido ya se analizó con la misma
+    configuración y versión del corpus, en esta ejecución o en una anterior,
+    no se vuelven a procesar.
+
+    Args:
+        inputs (List[str]): Archivos, directorios o patrones glob
+        min_similarity (float): Umbral mínimo de similitud (0-100)
+        workers (Optional[int]): Número de procesos; por defecto uno por núcleo
+        output (str): Archivo de salida, o '-' para la salida estándar
+        output_format (Optional[str]): 'jsonl' o 'csv'
+        corpus_path (Optional[str]): Directorio del corpus; por defecto el incorporado
+        timings (bool): Registrar tiempos por etapa y contadores de cada documento
+        top_k (Optional[int]): Coincidencias por documento; por defecto todas
+        cache_dir (Optional[str]): Directorio de la caché de resultados en disco
+
+    Returns:
+        Dict: Documentos procesados, documentos con error y, con timings,
+            las métricas agregadas de todos los procesos en 'metrics'
+    """
+    workers = workers or os.cpu_count() or 1
+
+    analyzer = create_analyzer(corpus_path, cache_dir=cache_dir, timings=timings)
+
+    writer = ResultWriter(output, output_format)
+    summary = {'documents': 0, 'errors': 0}
+    metrics = Metrics()
+
+    def record_done(record):
+        if 'metricas' in record:
+            metrics.merge(record['metricas'])
+        writer.write(record)
+        summary['documents'] += 1
+        if record['error']:
+            summary['errors'] += 1
+
+    try:
+        if workers == 1:
+            # Los perfiles de referencia no cuentan en las métricas del primer documento
+            analyzer.load_references()
+            for path in expand_inputs(inputs):
+                record_done(score_file(path, min_similarity, analyzer, top_k))
+        else:
+            # Número limitado de tareas en vuelo para no acumular resultados en memoria
+            max_pending = workers * 4
+            with worker_pool(analyzer, corpus_path, workers, cache_dir, timings) as executor:
+                pending = set()
+                for path in expand_inputs(inputs):
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record_done(future.result())
+                    pending.add(executor.submit(score_file, path, min_similarity, None, top_k))
+
+                for future in wait(pending).done:
+                    record_done(future.result())
+    finally:
+        writer.close()
+
+    if timings:
+        summary['metrics'] = metrics.snapshot()
+    return summary
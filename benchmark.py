@@ -0,0 +1,634 @@
+# benchmark.py
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from analyzer import SpellingPatternAnalyzer, TextStyleAnalyzer, format_analysis_results
+from corpus import BuiltinCorpus
+from database import sample_texts
+from tokenizer import tokenize
+
+SEED = 1234
+
+# Tiempo máximo (en segundos) para analizar un archivo pequeño desde la línea de comandos
+STARTUP_BUDGET = 0.5
+
+# Directorio del proyecto, desde el que se lanza main.py
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def legacy_find_spelling_patterns(analyzer: SpellingPatternAnalyzer,
+                                  text: str) -> Dict[str, List[Tuple[str, str]]]:
+    """Implementación original (bucle por palabra con re.search/re.sub) como referencia."""
+    patterns_found = {category: [] for category in analyzer.common_patterns.keys()}
+    words = text.lower().split()
+
+    for word in words:
+        for category, patterns in analyzer.common_patterns.items():
+            for pattern, replacement in patterns:
+                if re.search(pattern, word):
+                    potential_error = re.sub(pattern, replacement, word)
+                    if potential_error != word:
+                        patterns_found[category].append((word, potential_error))
+
+    return patterns_found
+
+
+def legacy_extract_features(analyzer: TextStyleAnalyzer, text: str) -> Tuple[Dict, Dict]:
+    """Extracción original por etapas (un recorrido del texto por etapa) como referencia."""
+    spelling_patterns = analyzer.spelling_analyzer.find_spelling_patterns(text)
+    proc_text = analyzer.preprocess_text(text)
+    features = {
+        **analyzer.get_sentence_length_stats(proc_text),
+        **analyzer.get_word_frequency_stats(proc_text),
+        'spelling_categories': {
+            category: bool(errors) for category, errors in spelling_patterns.items()
+        }
+    }
+    return features, spelling_patterns
+
+
+def synthetic_corpus(size_bytes: int, seed: int = SEED) -> str:
+    """
+    Genera un texto sintético en español con el vocabulario de la base de datos.
+
+    Args:
+        size_bytes (int): Tamaño aproximado del texto en bytes
+        seed (int): Semilla para que el texto sea reproducible
+
+    Returns:
+        str: Texto generado
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted({w for sample in sample_texts for w in sample['texto'].split()})
+    # Distribución tipo Zipf: las primeras palabras se repiten mucho más
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    rng.shuffle(vocabulary)
+
+    parts = []
+    size = 0
+    while size < size_bytes:
+        sentence = ' '.join(rng.choices(vocabulary, cum_weights=cum_weights,
+                                        k=rng.randint(5, 25)))
+        sentence = sentence[0].upper() + sentence[1:] + '. '
+        parts.append(sentence)
+        size += len(sentence.encode('utf-8'))
+
+    return ''.join(parts)
+
+
+def synthetic_samples(count: int, size_bytes: int = 2048, seed: int = SEED) -> List[Dict]:
+    """
+    Genera textos de referencia sintéticos con el formato de database.sample_texts.
+
+    Args:
+        count (int): Número de textos
+        size_bytes (int): Tamaño aproximado de cada texto
+        seed (int): Semilla base
+
+    Returns:
+        List[Dict]: Entradas con 'id', 'autor' y 'texto'
+    """
+    return [
+        {'id': i + 1, 'autor': f'Sintetico{i + 1}', 'texto': synthetic_corpus(size_bytes, seed + i + 1)}
+        for i in range(count)
+    ]
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> float:
+    """Devuelve el mejor tiempo (en segundos) de varias ejecuciones."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_spelling(synthetic_mb: float = 10.0, repeat: int = 3) -> List[Dict]:
+    """
+    Compara palabras por segundo del motor de patrones original y el compilado.
+
+    Args:
+        synthetic_mb (float): Tamaño del corpus sintético en MB
+        repeat (int): Repeticiones por medición
+
+    Returns:
+        List[Dict]: Resultados por corpus
+    """
+    corpora = {
+        'database.py': '\n'.join(sample['texto'] for sample in sample_texts),
+        f'sintetico {synthetic_mb:g} MB': synthetic_corpus(int(synthetic_mb * 1024 * 1024)),
+    }
+
+    results = []
+    for name, text in corpora.items():
+        word_count = len(text.split())
+
+        legacy_analyzer = SpellingPatternAnalyzer()
+        legacy_time = measure(lambda: legacy_find_spelling_patterns(legacy_analyzer, text), repeat)
+
+        # Analizador nuevo en cada repetición para incluir el coste de memorizar
+        compiled_time = measure(lambda: SpellingPatternAnalyzer().find_spelling_patterns(text), repeat)
+
+        if legacy_find_spelling_patterns(legacy_analyzer, text) != \
+                SpellingPatternAnalyzer().find_spelling_patterns(text):
+            raise AssertionError(f"Resultados distintos en el corpus {name}")
+
+        results.append({
+            'corpus': name,
+            'words': word_count,
+            'legacy_words_per_second': word_count / legacy_time,
+            'compiled_words_per_second': word_count / compiled_time,
+            'speedup': legacy_time / compiled_time
+        })
+
+    return results
+
+
+def benchmark_tokenizer(input_sizes: List[int], repeat: int = 3) -> List[Dict]:
+    """
+    Compara la extracción de rasgos por etapas con el recorrido único de tokenize.
+
+    Args:
+        input_sizes (List[int]): Tamaños de los textos de entrada en bytes
+        repeat (int): Repeticiones por medición
+
+    Returns:
+        List[Dict]: Tiempo y pico de memoria de cada versión por tamaño
+    """
+    results = []
+    for size in input_sizes:
+        text = synthetic_corpus(size)
+        # Analizadores nuevos en cada ejecución para incluir el coste de memorizar
+        legacy = lambda: legacy_extract_features(TextStyleAnalyzer(profile_store_path=None), text)
+
+        def single_pass():
+            record = tokenize(TextStyleAnalyzer(profile_store_path=None), text)
+            return record.features(), record.spelling_patterns
+
+        if legacy() != single_pass():
+            raise AssertionError(f"Resultados distintos con una entrada de {size} bytes")
+
+        legacy_time = measure(legacy, repeat)
+        single_time = measure(single_pass, repeat)
+        results.append({
+            'input_bytes': size,
+            'legacy_seconds': legacy_time,
+            'single_pass_seconds': single_time,
+            'speedup': legacy_time / single_time,
+            'legacy_peak_memory_bytes': measure_peak_memory(legacy),
+            'single_pass_peak_memory_bytes': measure_peak_memory(single_pass)
+        })
+    return results
+
+
+def measure_retained_memory(func: Callable[[], object], repeat: int = 1) -> int:
+    """
+    Devuelve la memoria (en bytes) que sigue asignada al resultado de una función.
+
+    Con varias repeticiones se queda con la menor, que no incluye lo que la
+    primera llamada deja en cachés del intérprete.
+    """
+    retained = []
+    for _ in range(repeat):
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            result = func()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        retained.append(after - before)
+    return min(retained)
+
+
+def benchmark_profile_memory(count: int, repeat: int = 1) -> Dict:
+    """
+    Mide la memoria por perfil de referencia cargado desde el almacén.
+
+    Compara los perfiles como diccionarios con un conjunto de cadenas
+    (formato anterior) con los CompactProfile del almacén actual, incluido
+    su vocabulario, y el índice de prefiltrado construido sobre cada uno.
+
+    Args:
+        count (int): Número de textos de referencia
+        repeat (int): Repeticiones por medición
+
+    Returns:
+        Dict: Bytes por perfil de cada formato, con y sin índice
+    """
+    from index import ReferenceIndex
+    from vocabulary import ProfileCodec
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'profiles.jsonl')
+        analyzer = TextStyleAnalyzer(profile_store_path=path,
+                                     corpus=BuiltinCorpus(synthetic_samples(count, size_bytes=512)))
+        analyzer.prepare_references()
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()[1:]
+
+        def load_dicts():
+            profiles = []
+            for line in lines:
+                features = json.loads(line)['features']
+                features['common_words'] = set(features['common_words'])
+                profiles.append(features)
+            return profiles
+
+        def load_compact():
+            # Igual que ProfileStore: el vocabulario forma parte de lo medido
+            codec = ProfileCodec(analyzer.spelling_analyzer.common_patterns.keys())
+            return codec, [codec.encode(json.loads(line)['features']) for line in lines]
+
+        def with_index(load):
+            def build():
+                loaded = load()
+                profiles = loaded[1] if isinstance(loaded, tuple) else loaded
+                index = ReferenceIndex(analyzer.weights)
+                for key, profile in enumerate(profiles):
+                    index.add(key, profile)
+                return loaded, index
+            return build
+
+        dict_bytes = measure_retained_memory(load_dicts, repeat)
+        compact_bytes = measure_retained_memory(load_compact, repeat)
+        dict_index_bytes = measure_retained_memory(with_index(load_dicts), repeat)
+        compact_index_bytes = measure_retained_memory(with_index(load_compact), repeat)
+
+    return {
+        'references': count,
+        'dict_bytes_per_profile': dict_bytes / count,
+        'compact_bytes_per_profile': compact_bytes / count,
+        'reduction': dict_bytes / compact_bytes,
+        'dict_with_index_bytes_per_profile': dict_index_bytes / count,
+        'compact_with_index_bytes_per_profile': compact_index_bytes / count,
+        'reduction_with_index': dict_index_bytes / compact_index_bytes
+    }
+
+
+def parse_size(value: str) -> int:
+    """Convierte tamaños como '1KB', '10MB' o '512' a bytes."""
+    units = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'B': 1}
+    value = value.strip().upper()
+    for unit, factor in units.items():
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * factor)
+    return int(value)
+
+
+def measure_peak_memory(func: Callable[[], object]) -> int:
+    """Devuelve el pico de memoria (en bytes) asignado durante una ejecución."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _stage_result(stage: str, seconds: float, peak: int, input_bytes: int,
+                  references: int, work: float, unit: str) -> Dict:
+    return {
+        'stage': stage,
+        'input_bytes': input_bytes,
+        'references': references,
+        'seconds': seconds,
+        'throughput': work / seconds if seconds > 0 else float('inf'),
+        'throughput_unit': unit,
+        'peak_memory_bytes': peak
+    }
+
+
+def benchmark_stages(input_sizes: List[int], reference_counts: List[int],
+                     repeat: int = 3, track_memory: bool = True) -> List[Dict]:
+    """
+    Mide por separado cada etapa del cálculo de similitud.
+
+    Las etapas de texto se miden para cada tamaño de entrada y las de
+    comparación contra la base de datos para cada tamaño de corpus.
+
+    Args:
+        input_sizes (List[int]): Tamaños de los textos de entrada en bytes
+        reference_counts (List[int]): Números de textos de referencia
+        repeat (int): Repeticiones por medición
+        track_memory (bool): Medir también el pico de memoria con tracemalloc
+
+    Returns:
+        List[Dict]: Una entrada por etapa y tamaño con tiempo, rendimiento y memoria
+    """
+    results = []
+
+    def run(stage, func, input_bytes, references, work, unit):
+        seconds = measure(func, repeat)
+        peak = measure_peak_memory(func) if track_memory else 0
+        results.append(_stage_result(stage, seconds, peak, input_bytes, references, work, unit))
+
+    analyzer = TextStyleAnalyzer(profile_store_path=None)
+    reference_text = sample_texts[0]['texto']
+
+    for size in input_sizes:
+        text = synthetic_corpus(size)
+        proc_text = analyzer.preprocess_text(text)
+
+        # Analizador nuevo para medir también el coste de memorizar palabras
+        run('find_spelling_patterns',
+            lambda: SpellingPatternAnalyzer().find_spelling_patterns(text),
+            size, 0, size, 'bytes/s')
+        run('preprocess_text', lambda: analyzer.preprocess_text(text),
+            size, 0, size, 'bytes/s')
+        run('get_sentence_length_stats', lambda: analyzer.get_sentence_length_stats(proc_text),
+            size, 0, size, 'bytes/s')
+        run('get_word_frequency_stats', lambda: analyzer.get_word_frequency_stats(proc_text),
+            size, 0, size, 'bytes/s')
+        run('calculate_similarity_score',
+            lambda: analyzer.calculate_similarity_score(text, reference_text),
+            size, 0, size, 'bytes/s')
+
+    query = synthetic_corpus(input_sizes[0] if input_sizes else 1024, seed=SEED - 1)
+
+    for count in reference_counts:
+        corpus = BuiltinCorpus(synthetic_samples(count))
+        db_analyzer = TextStyleAnalyzer(profile_store_path=None, corpus=corpus)
+        # Los perfiles de referencia se calculan fuera de la medición
+        db_analyzer.prepare_references()
+        matches = db_analyzer.analyze_against_database(query, min_similarity=0)
+
+        run('analyze_against_database',
+            lambda: db_analyzer.analyze_against_database(query, min_similarity=0),
+            len(query.encode('utf-8')), count, count, 'references/s')
+        run('format_analysis_results', lambda: format_analysis_results(matches),
+            0, count, len(matches), 'matches/s')
+
+    return results
+
+
+def compare_with_baseline(results: List[Dict], baseline: List[Dict],
+                          threshold: float) -> List[Dict]:
+    """
+    Busca etapas más lentas que la línea base por encima del umbral.
+
+    Args:
+        results (List[Dict]): Resultados actuales
+        baseline (List[Dict]): Resultados de referencia
+        threshold (float): Empeoramiento relativo tolerado (0.2 = 20 %)
+
+    Returns:
+        List[Dict]: Regresiones encontradas
+    """
+    def key(result):
+        return result['stage'], result['input_bytes'], result['references']
+
+    baseline_by_key = {key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        previous = baseline_by_key.get(key(result))
+        if previous is None or previous['seconds'] <= 0:
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        if ratio > 1 + threshold:
+            regressions.append({**result, 'baseline_seconds': previous['seconds'], 'ratio': ratio})
+
+    return regressions
+
+
+def parse_import_times(stderr: str) -> Dict[str, int]:
+    """Tiempo acumulado (en microsegundos) de cada módulo según -X importtime."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = [field.strip() for field in line[len('import time:'):].split('|')]
+        if len(fields) == 3 and fields[1].isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def benchmark_startup(repeat: int = 5) -> Dict:
+    """
+    Mide el tiempo total de analizar un archivo pequeño con main.py en un proceso nuevo.
+
+    Incluye el arranque del intérprete, las importaciones y la carga de la
+    base de datos, que dominan el coste en las ejecuciones cortas.
+
+    Args:
+        repeat (int): Número de ejecuciones
+
+    Returns:
+        Dict: Tiempos de cada ejecución, mediana, mínimo y módulos más lentos de importar
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'entrada.txt')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.write(synthetic_corpus(1024))
+        command = [sys.executable, os.path.join(PROJECT_DIR, 'main.py'), input_path,
+                   '--workers', '1', '--output', os.path.join(tmp, 'salida.jsonl')]
+
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=tmp, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+
+        profile = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=tmp,
+                                 check=True, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE, text=True)
+
+    imports = parse_import_times(profile.stderr)
+    slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'times': times,
+        'median': statistics.median(times),
+        'min': min(times),
+        'slowest_imports': slowest[:10],
+        'numpy_loaded': 'numpy' in imports
+    }
+
+
+def run_spelling(args: argparse.Namespace) -> int:
+    print("=== Motor de patrones ortográficos ===")
+    for result in benchmark_spelling(args.synthetic_mb, args.repeat):
+        print(f"\n{result['corpus']} ({result['words']} palabras)")
+        print(f"- original:  {result['legacy_words_per_second']:,.0f} palabras/s")
+        print(f"- compilado: {result['compiled_words_per_second']:,.0f} palabras/s")
+        print(f"- aceleración: {result['speedup']:.1f}x")
+    return 0
+
+
+def run_stages(args: argparse.Namespace) -> int:
+    input_sizes = [parse_size(size) for size in args.sizes.split(',')]
+    reference_counts = [int(count) for count in args.references.split(',')]
+
+    results = benchmark_stages(input_sizes, reference_counts, args.repeat,
+                               track_memory=not args.no_memory)
+
+    print(f"{'etapa':<28} {'entrada':>10} {'refs':>7} {'segundos':>10} "
+          f"{'rendimiento':>22} {'memoria':>10}")
+    for result in results:
+        print(f"{result['stage']:<28} {result['input_bytes']:>10} {result['references']:>7} "
+              f"{result['seconds']:>10.4f} "
+              f"{result['throughput']:>14,.0f} {result['throughput_unit']:<7} "
+              f"{result['peak_memory_bytes'] / 1024 ** 2:>8.1f}MB")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': SEED,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados guardados en: {args.output}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Línea base creada en: {args.baseline}")
+            return 0
+
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegresiones (umbral {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"- {regression['stage']} (entrada {regression['input_bytes']}, "
+                      f"refs {regression['references']}): "
+                      f"{regression['baseline_seconds']:.4f}s -> {regression['seconds']:.4f}s "
+                      f"({regression['ratio']:.2f}x)")
+            return 1
+        print("\nSin regresiones respecto a la línea base.")
+
+    return 0
+
+
+def run_tokenizer(args: argparse.Namespace) -> int:
+    input_sizes = [parse_size(size) for size in args.sizes.split(',')]
+
+    print(f"{'entrada':>10} {'por etapas':>12} {'un recorrido':>13} {'aceleración':>12} "
+          f"{'memoria (etapas)':>17} {'memoria (uno)':>14}")
+    for result in benchmark_tokenizer(input_sizes, args.repeat):
+        print(f"{result['input_bytes']:>10} {result['legacy_seconds']:>11.4f}s "
+              f"{result['single_pass_seconds']:>12.4f}s {result['speedup']:>11.1f}x "
+              f"{result['legacy_peak_memory_bytes'] / 1024 ** 2:>15.1f}MB "
+              f"{result['single_pass_peak_memory_bytes'] / 1024 ** 2:>12.1f}MB")
+    return 0
+
+
+def run_memory(args: argparse.Namespace) -> int:
+    result = benchmark_profile_memory(args.references, args.repeat)
+
+    print(f"=== Memoria por perfil ({result['references']} referencias) ===")
+    print(f"- diccionario con cadenas: {result['dict_bytes_per_profile']:,.0f} bytes")
+    print(f"- CompactProfile:          {result['compact_bytes_per_profile']:,.0f} bytes "
+          f"({result['reduction']:.1f}x menos)")
+    print(f"- con índice, diccionario: {result['dict_with_index_bytes_per_profile']:,.0f} bytes")
+    print(f"- con índice, compacto:    {result['compact_with_index_bytes_per_profile']:,.0f} bytes "
+          f"({result['reduction_with_index']:.1f}x menos)")
+    return 0
+
+
+def run_startup(args: argparse.Namespace) -> int:
+    result = benchmark_startup(args.repeat)
+
+    print("=== Arranque de main.py con un archivo de 1 KB ===")
+    print(f"- mediana: {result['median']:.3f}s")
+    print(f"- mínimo:  {result['min']:.3f}s")
+    print(f"- NumPy importado: {'sí' if result['numpy_loaded'] else 'no'}")
+    print("\nMódulos más lentos de importar (acumulado):")
+    for module, microseconds in result['slowest_imports']:
+        print(f"- {module:<30} {microseconds / 1000:>8.1f}ms")
+
+    if result['median'] > args.budget:
+        print(f"\nEl arranque supera el presupuesto de {args.budget:.3f}s")
+        return 1
+    print(f"\nDentro del presupuesto de {args.budget:.3f}s")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador de estilo")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repeticiones por medición (por defecto: 3)")
+    # --repeat también se acepta tras el subcomando; SUPPRESS evita que el
+    # valor por defecto del subcomando pise el que se dio antes de él
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--repeat', type=int, default=argparse.SUPPRESS,
+                        help="Repeticiones por medición (por defecto: 3)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    spelling = subparsers.add_parser('spelling', parents=[common],
+                                     help="Motor de patrones: original frente a compilado")
+    spelling.add_argument('--synthetic-mb', type=float, default=10.0,
+                          help="Tamaño del corpus sintético en MB (por defecto: 10)")
+
+    stages = subparsers.add_parser('stages', parents=[common],
+                                   help="Tiempo, rendimiento y memoria de cada etapa")
+    stages.add_argument('--sizes', default='1KB,10KB,100KB,1MB',
+                        help="Tamaños de entrada separados por comas (hasta 100MB)")
+    stages.add_argument('--references', default='10,100,1000',
+                        help="Tamaños del corpus de referencia separados por comas (hasta 100000)")
+    stages.add_argument('--output', default=None,
+                        help="Archivo JSON donde guardar los resultados")
+    stages.add_argument('--baseline', default=None,
+                        help="Línea base JSON; se crea si no existe y si no se compara contra ella")
+    stages.add_argument('--threshold', type=float, default=0.25,
+                        help="Empeoramiento relativo tolerado (por defecto: 0.25)")
+    stages.add_argument('--no-memory', action='store_true',
+                        help="No medir el pico de memoria")
+
+    tokenizer = subparsers.add_parser('tokenizer', parents=[common],
+                                      help="Extracción por etapas frente a un solo recorrido")
+    tokenizer.add_argument('--sizes', default='10KB,1MB,10MB',
+                           help="Tamaños de entrada separados por comas")
+
+    memory = subparsers.add_parser('memory', parents=[common],
+                                   help="Memoria por perfil de referencia")
+    memory.add_argument('--references', type=int, default=10000,
+                        help="Número de textos de referencia (por defecto: 10000)")
+
+    startup = subparsers.add_parser('startup', parents=[common],
+                                    help="Tiempo de main.py con un archivo pequeño")
+    startup.add_argument('--budget', type=float, default=STARTUP_BUDGET,
+                         help=f"Tiempo máximo (mediana) en segundos (por defecto: {STARTUP_BUDGET})")
+
+    args = parser.parse_args()
+
+    if args.command == 'spelling':
+        sys.exit(run_spelling(args))
+    if args.command == 'stages':
+        sys.exit(run_stages(args))
+    if args.command == 'tokenizer':
+        sys.exit(run_tokenizer(args))
+    if args.command == 'memory':
+        sys.exit(run_memory(args))
+    if args.command == 'startup':
+        sys.exit(run_startup(args))
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# cache.py
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Marcador para distinguir "no está en caché" de un valor None guardado
+_MISSING = object()
+
+# Bytes leídos por bloque al calcular la huella de un archivo
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para usarlo como clave de caché.
+
+    Colapsa los espacios en blanco, que no influyen en ningún rasgo: todos se
+    calculan sobre palabras separadas por espacios y oraciones recortadas.
+    """
+    return ' '.join(text.split())
+
+
+def make_key(*parts: Any) -> str:
+    """Construye una clave de caché a partir de sus componentes."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    Huella del contenido de un archivo, leído por bloques.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        str: SHA-256 de sus bytes
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de resultados direccionada por contenido, con dos niveles.
+
+    El nivel en memoria es un LRU de tamaño fijo. El nivel opcional en disco
+    guarda cada valor en un archivo y elimina los menos usados cuando se
+    supera el tamaño máximo. Las claves incluyen la configuración y la versión
+    del corpus, así que un cambio en cualquiera de ellas no reutiliza entradas
+    antiguas. Los valores devueltos son compartidos y deben tratarse como de
+    solo lectura.
+
+    El tamaño y el orden de uso de los archivos se llevan en memoria: el
+    directorio se recorre al abrir la caché y de nuevo solo tras tantas
+    escrituras como entradas conocidas, para incorporar las de otros procesos
+    sin recorrerlo en cada escritura.
+
+    Los valores se guardan con pickle, que puede ejecutar código al leerlos:
+    el directorio del nivel en disco debe ser de confianza y no escribible
+    por otros usuarios.
+    """
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): Entradas máximas en memoria
+            directory (Optional[str]): Directorio del nivel en disco, de confianza;
+                None para desactivarlo
+            max_disk_bytes (int): Tamaño máximo del nivel en disco
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict = OrderedDict()
+        # Tamaño de cada archivo del nivel en disco, del menos al más usado
+        self._disk: OrderedDict = OrderedDict()
+        self._disk_bytes = 0
+        self._writes_since_scan = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._scan_disk()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Busca un valor en memoria y después en disco.
+
+        Args:
+            key (str): Clave creada con make_key
+            default (Any): Valor devuelto si no está en caché
+
+        Returns:
+            Any: Valor guardado o default
+        """
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.directory:
+            value = self._read_disk(key)
+            if value is not _MISSING:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    def put(self, key: str, value: Any):
+        """Guarda un valor en memoria y, si está activo, en disco."""
+        self._remember(key, value)
+        if self.directory:
+            self._write_disk(key, value)
+
+    def clear(self):
+        """Vacía ambos niveles."""
+        self._memory.clear()
+        if self.directory:
+            for key, _, _ in self._disk_files():
+                os.remove(self._path(key))
+            self._scan_disk()
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pkl')
+
+    def _disk_files(self):
+        """Archivos del nivel en disco como (clave, tamaño, último uso)."""
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                yield name[:-len('.pkl')], stat.st_size, stat.st_mtime
+
+    def _scan_disk(self):
+        """Reconstruye el índice del nivel en disco a partir del directorio."""
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        self._disk = OrderedDict((key, size) for key, size, _ in files)
+        self._disk_bytes = sum(self._disk.values())
+        self._writes_since_scan = 0
+
+    def _read_disk(self, key: str) -> Any:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+                size = os.fstat(f.fileno()).st_size
+            # La fecha de modificación marca el último uso para otros procesos
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # Desalojado por otro proceso, o incompleto
+            self._disk_bytes -= self._disk.pop(key, 0)
+            return _MISSING
+
+        self._disk_bytes += size - self._disk.pop(key, 0)
+        self._disk[key] = size
+        return value
+
+    def _write_disk(self, key: str, value: Any):
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._disk_bytes += size - self._disk.pop(key, 0)
+        self._disk[key] = size
+        self._writes_since_scan += 1
+        if self._writes_since_scan >= len(self._disk):
+            # Coste amortizado constante por escritura
+            self._scan_disk()
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Elimina los archivos menos usados hasta volver por debajo del límite."""
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._disk_bytes -= size
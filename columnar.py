@@ -0,0 +1,428 @@
+# columnar.py
+import json
+import os
+import tempfile
+import uuid
+from array import array
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from index import BOUND_EPSILON, ReferenceIndex
+from vectorized import NUMERIC_COLUMNS, FeatureMatrix, safe_similarity
+from vocabulary import PROFILE_NUMBERS, CompactProfile, ProfileCodec, Vocabulary
+
+# Versión del formato columnar
+COLUMNAR_FORMAT_VERSION = 2
+
+# Columnas numéricas del archivo; las de FeatureMatrix van primero
+FLOAT_COLUMNS = NUMERIC_COLUMNS + ('std_sentence_length',
+                                   'max_sentence_length', 'min_sentence_length')
+
+# Columnas guardadas como enteros al reconstruir un perfil
+INT_COLUMNS = ('max_sentence_length', 'min_sentence_length')
+
+# Palabras comunes por perfil; los huecos se rellenan con -1
+WORDS_PER_PROFILE = 10
+
+# Archivos de datos; su nombre en disco lleva la generación (ver _data_name)
+NUMERIC_FILE = 'numeric.f64'
+SPELLING_FILE = 'spelling.u8'
+WORDS_FILE = 'words.i32'
+VOCAB_FILE = 'vocab.json'
+DATA_FILES = (NUMERIC_FILE, SPELLING_FILE, WORDS_FILE, VOCAB_FILE)
+META_FILE = 'meta.json'
+
+# Bits a 1 de cada byte, para contar categorías distintas sobre los bits empaquetados
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _replace_file(directory: str, name: str, write):
+    """Escribe un archivo del directorio de forma atómica."""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _data_name(name: str, generation: str) -> str:
+    """Nombre en disco de un archivo de datos de una generación."""
+    stem, extension = os.path.splitext(name)
+    return f"{stem}-{generation}{extension}"
+
+
+def _remove_other_generations(path: str, generation: str):
+    """Borra los archivos de datos de exportaciones anteriores."""
+    current = {_data_name(name, generation) for name in DATA_FILES}
+    stems = tuple(os.path.splitext(name)[0] + '-' for name in DATA_FILES)
+    for name in os.listdir(path):
+        if name.startswith(stems) and name not in current:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+def write_columnar(path: str, keys: List[Hashable], profiles: List[Dict],
+                   fingerprints: List[str], config: str,
+                   corpus_fingerprint: Optional[str] = None):
+    """
+    Guarda perfiles de referencia en formato columnar.
+
+    El directorio contiene los rasgos numéricos como float64 de ancho fijo,
+    las categorías ortográficas como bits empaquetados, los identificadores
+    de las palabras comunes como int32 y, en JSON, el vocabulario y los
+    metadatos. Cada exportación es una generación nueva: los archivos de datos
+    llevan su identificador en el nombre y los metadatos, escritos al final
+    de forma atómica, indican cuáles abrir. Un lector nunca mezcla archivos
+    de dos exportaciones; los de generaciones anteriores se borran después
+    (quien ya los proyectó en memoria los sigue leyendo).
+
+    Args:
+        path (str): Directorio destino
+        keys (List[Hashable]): Identificador de cada perfil
+        profiles (List[Dict]): Vectores de rasgos
+        fingerprints (List[str]): Huella del texto de cada perfil
+        config (str): Huella de la configuración del analizador
+        corpus_fingerprint (Optional[str]): Huella de la versión del corpus
+    """
+    os.makedirs(path, exist_ok=True)
+    count = len(profiles)
+    categories = list(profiles[0]['spelling_categories']) if profiles else []
+
+    numeric = np.array(
+        [[profile[column] for column in FLOAT_COLUMNS] for profile in profiles],
+        dtype='<f8'
+    ).reshape(count, len(FLOAT_COLUMNS))
+
+    spelling = np.array(
+        [[bool(profile['spelling_categories'][category]) for category in categories]
+         for profile in profiles],
+        dtype=bool
+    ).reshape(count, len(categories))
+    packed = np.packbits(spelling, axis=1)
+
+    vocabulary = Vocabulary()
+    words = np.full((count, WORDS_PER_PROFILE), -1, dtype='<i4')
+    for row, profile in enumerate(profiles):
+        # Orden estable para que dos exportaciones iguales produzcan los mismos bytes
+        for column, word in enumerate(sorted(profile['common_words'])[:WORDS_PER_PROFILE]):
+            words[row, column] = vocabulary.intern(word)
+
+    generation = uuid.uuid4().hex
+    meta = {
+        'version': COLUMNAR_FORMAT_VERSION,
+        'generation': generation,
+        'config': config,
+        'corpus_fingerprint': corpus_fingerprint,
+        'count': count,
+        'float_columns': list(FLOAT_COLUMNS),
+        'categories': categories,
+        'spelling_bytes': packed.shape[1],
+        'keys': list(keys),
+        'fingerprints': list(fingerprints)
+    }
+
+    _replace_file(path, _data_name(NUMERIC_FILE, generation),
+                  lambda f: f.write(numeric.tobytes()))
+    _replace_file(path, _data_name(SPELLING_FILE, generation),
+                  lambda f: f.write(packed.tobytes()))
+    _replace_file(path, _data_name(WORDS_FILE, generation),
+                  lambda f: f.write(words.tobytes()))
+    _replace_file(path, _data_name(VOCAB_FILE, generation), lambda f: f.write(
+        json.dumps(vocabulary.words, ensure_ascii=False).encode('utf-8')))
+    _replace_file(path, META_FILE, lambda f: f.write(
+        json.dumps(meta, ensure_ascii=False).encode('utf-8')))
+    _remove_other_generations(path, generation)
+
+
+class ColumnarFeatures:
+    """
+    Perfiles de referencia abiertos desde el formato columnar con numpy.memmap.
+
+    Abrir el archivo solo lee los metadatos y el vocabulario; los arreglos se
+    proyectan en memoria de solo lectura, de modo que varios procesos
+    comparten las mismas páginas. Los perfiles como diccionario se
+    reconstruyen solo para las filas que se piden.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Directorio creado con write_columnar
+
+        Raises:
+            ValueError: Si el formato no es compatible o los archivos no concuerdan
+            OSError: Si los archivos de la generación ya no existen
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if (meta.get('version') != COLUMNAR_FORMAT_VERSION or
+                meta.get('float_columns') != list(FLOAT_COLUMNS)):
+            raise ValueError(f"Formato columnar no compatible: {path}")
+
+        self.meta = meta
+        self.config: str = meta['config']
+        self.corpus_fingerprint: Optional[str] = meta['corpus_fingerprint']
+        self.keys: List[Hashable] = meta['keys']
+        self.fingerprints: List[str] = meta['fingerprints']
+        self.categories: List[str] = meta['categories']
+        self.generation: str = meta['generation']
+        count = meta['count']
+
+        with open(os.path.join(path, _data_name(VOCAB_FILE, self.generation)), 'r',
+                  encoding='utf-8') as f:
+            self.vocabulary = Vocabulary(json.load(f))
+
+        self.numeric = self._map(NUMERIC_FILE, '<f8', (count, len(FLOAT_COLUMNS)))
+        self.spelling = self._map(SPELLING_FILE, np.uint8, (count, meta['spelling_bytes']))
+        self.words = self._map(WORDS_FILE, '<i4', (count, WORDS_PER_PROFILE))
+        self._rows: Optional[Dict[Hashable, int]] = None
+        # Identificador en el vocabulario de un codificador de cada palabra del archivo
+        self._translations: Dict[int, np.ndarray] = {}
+
+    def _map(self, name: str, dtype, shape) -> np.ndarray:
+        file_path = os.path.join(self.path, _data_name(name, self.generation))
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if os.path.getsize(file_path) != expected:
+            raise ValueError(f"El archivo {file_path} no concuerda con los metadatos")
+        if expected == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def rows(self) -> Dict[Hashable, int]:
+        """Fila de cada identificador."""
+        if self._rows is None:
+            self._rows = {key: row for row, key in enumerate(self.keys)}
+        return self._rows
+
+    def spelling_matrix(self) -> np.ndarray:
+        """Categorías ortográficas desempaquetadas (N x categorías, booleano)."""
+        return np.unpackbits(self.spelling, axis=1, count=len(self.categories)).astype(bool)
+
+    def profile(self, row: int) -> Dict:
+        """Reconstruye el vector de rasgos de una fila con el formato de extract_features."""
+        return self.profiles([row])[0]
+
+    def profiles(self, rows: Sequence[int]) -> List[Dict]:
+        """
+        Reconstruye los vectores de rasgos de varias filas.
+
+        Solo se leen las filas pedidas; se convierten en bloque porque
+        convertir fila a fila con NumPy es mucho más lento.
+
+        Args:
+            rows (Sequence[int]): Filas a reconstruir
+
+        Returns:
+            List[Dict]: Vectores de rasgos con el formato de extract_features
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        numeric = self.numeric[rows].tolist()
+        word_ids = self.words[rows].tolist()
+        spelling = np.unpackbits(self.spelling[rows], axis=1,
+                                 count=len(self.categories)).astype(bool).tolist()
+
+        words = self.vocabulary.words
+        profiles = []
+        for row_numeric, row_words, row_spelling in zip(numeric, word_ids, spelling):
+            profile = {}
+            for column, value in zip(FLOAT_COLUMNS, row_numeric):
+                profile[column] = int(value) if column in INT_COLUMNS else value
+            profile['common_words'] = {words[word_id] for word_id in row_words if word_id >= 0}
+            profile['spelling_categories'] = dict(zip(self.categories, row_spelling))
+            profiles.append(profile)
+        return profiles
+
+    def translate(self, codec: ProfileCodec) -> np.ndarray:
+        """
+        Registra el vocabulario del archivo en un codificador.
+
+        Returns:
+            np.ndarray: Identificador en el codificador de cada palabra del
+                archivo, más un -1 final para los huecos
+        """
+        translation = self._translations.get(id(codec))
+        if translation is None:
+            intern = codec.vocabulary.intern
+            translation = np.array([intern(word) for word in self.vocabulary.words] + [-1],
+                                   dtype=np.int64)
+            self._translations[id(codec)] = translation
+        return translation
+
+    def compact_profiles(self, rows: Sequence[int], codec: ProfileCodec) -> List[CompactProfile]:
+        """
+        Reconstruye varias filas directamente como CompactProfile de un codificador.
+
+        Equivale a codec.encode(self.profile(row)) sin pasar por conjuntos de
+        palabras ni diccionarios intermedios.
+
+        Args:
+            rows (Sequence[int]): Filas a reconstruir
+            codec (ProfileCodec): Codificador de los perfiles
+
+        Returns:
+            List[CompactProfile]: Perfiles en el orden de las filas
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = [FLOAT_COLUMNS.index(key) for key in PROFILE_NUMBERS]
+        integers = [i for i, key in enumerate(PROFILE_NUMBERS) if key in INT_COLUMNS]
+        numeric = self.numeric[rows][:, columns].tolist()
+
+        # Los huecos (-1) quedan al principio de cada fila ordenada
+        word_ids = np.sort(self.translate(codec)[self.words[rows]], axis=1).tolist()
+
+        category_count = len(self.categories)
+        bits = np.unpackbits(self.spelling[rows], axis=1, count=category_count)
+        masks = (bits.astype(np.int64) << np.arange(category_count)).sum(axis=1).tolist()
+
+        profiles = []
+        for numbers, words, mask in zip(numeric, word_ids, masks):
+            for i in integers:
+                numbers[i] = int(numbers[i])
+            words = array('i', [word_id for word_id in words if word_id >= 0])
+            profiles.append(codec.from_values(numbers, words, mask))
+        return profiles
+
+    def bounds(self, query: Dict, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Score de cada fila contra un vector de rasgos, calculado en bloque.
+
+        Usa las mismas fórmulas que compare_features, pero con operaciones de
+        NumPy cuyo redondeo puede diferir en el último bit; sirve como cota
+        superior con la holgura BOUND_EPSILON.
+
+        Args:
+            query (Dict): Vector de rasgos del texto de entrada
+            weights (Dict[str, float]): Pesos de cada métrica
+
+        Returns:
+            np.ndarray: Score aproximado (0-1) de cada fila
+        """
+        numeric = self.numeric
+        bounds = (
+            weights['sentence_length'] * safe_similarity(query['avg_sentence_length'],
+                                                         numeric[:, 0]) +
+            weights['word_length'] * safe_similarity(query['avg_word_length'], numeric[:, 1]) +
+            weights['unique_words'] * safe_similarity(query['unique_words_ratio'],
+                                                      numeric[:, 2])
+        )
+
+        # El último elemento corresponde a los huecos (-1) de cada fila
+        query_words = np.zeros(len(self.vocabulary) + 1, dtype=bool)
+        for word in query['common_words']:
+            word_id = self.vocabulary.get(word)
+            if word_id >= 0:
+                query_words[word_id] = True
+        bounds += weights['common_words'] * (query_words[self.words].sum(axis=1) / 10)
+
+        category_count = len(self.categories)
+        if category_count:
+            query_spelling = np.packbits(
+                [bool(query['spelling_categories'][category]) for category in self.categories]
+            )
+            differing = POPCOUNT[self.spelling ^ query_spelling].sum(axis=1)
+            bounds += weights['spelling_patterns'] * ((category_count - differing) / category_count)
+        return bounds
+
+    def feature_matrix(self) -> FeatureMatrix:
+        """
+        FeatureMatrix sobre los arreglos proyectados, sin copiar los rasgos numéricos.
+
+        La matriz se copia a memoria propia la primera vez que se le añade una fila.
+        """
+        count = len(self.keys)
+        mask = self.words >= 0
+        word_rows = np.repeat(np.arange(count, dtype=np.int64), mask.sum(axis=1))
+        word_ids = self.words[mask].astype(np.int64)
+        return FeatureMatrix.from_arrays(
+            self.keys, self.numeric[:, :len(NUMERIC_COLUMNS)], self.spelling_matrix(),
+            word_rows, word_ids, self.vocabulary, self.categories
+        )
+
+
+class ColumnarIndex:
+    """
+    Índice de prefiltrado sobre los arreglos proyectados de un archivo columnar.
+
+    La cota de cada fila se calcula en bloque con ColumnarFeatures.bounds, sin
+    reconstruir ningún perfil ni crear objetos por referencia, así que abrir
+    el índice no cuesta nada y los procesos comparten las páginas del archivo.
+    Las referencias añadidas o modificadas después de la exportación van a un
+    ReferenceIndex aparte. Tiene la interfaz de ReferenceIndex.
+    """
+
+    def __init__(self, weights: Dict[str, float], columnar: ColumnarFeatures):
+        """
+        Args:
+            weights (Dict[str, float]): Pesos de cada métrica del analizador
+            columnar (ColumnarFeatures): Perfiles exportados
+        """
+        self.weights = weights
+        self.columnar = columnar
+        # Filas del archivo que siguen vigentes; se activan con keep
+        self.alive = np.zeros(len(columnar), dtype=bool)
+        self.overlay = ReferenceIndex(weights)
+
+    def __len__(self) -> int:
+        return int(self.alive.sum()) + len(self.overlay)
+
+    def keep(self, key: Hashable):
+        """Usa la fila exportada de un perfil, que no ha cambiado desde la exportación."""
+        self.alive[self.columnar.rows[key]] = True
+
+    def add(self, key: Hashable, features: Dict):
+        """
+        Añade un perfil, sustituyendo el anterior con la misma clave.
+
+        Args:
+            key (Hashable): Identificador del perfil
+            features (Dict): Vector de rasgos del perfil
+        """
+        row = self.columnar.rows.get(key)
+        if row is not None:
+            self.alive[row] = False
+        self.overlay.add(key, features)
+
+    def remove(self, key: Hashable):
+        """
+        Elimina un perfil del índice.
+
+        Args:
+            key (Hashable): Identificador del perfil
+        """
+        if key in self.overlay.entries:
+            self.overlay.remove(key)
+        row = self.columnar.rows.get(key)
+        if row is not None:
+            self.alive[row] = False
+
+    def bounded_candidates(self, query: Dict, min_score: float
+                           ) -> List[Tuple[float, Hashable]]:
+        """
+        Devuelve los perfiles cuyo score máximo alcanzable llega al umbral.
+
+        Args:
+            query (Dict): Vector de rasgos del texto de entrada
+            min_score (float): Score mínimo (0-1)
+
+        Returns:
+            List[Tuple[float, Hashable]]: Pares (cota, identificador) sin orden definido
+        """
+        bounds = self.columnar.bounds(query, self.weights)
+        rows = np.flatnonzero(self.alive & (bounds >= min_score - BOUND_EPSILON))
+        keys = self.columnar.keys
+        selected = [(bound, keys[row])
+                    for row, bound in zip(rows.tolist(), bounds[rows].tolist())]
+        selected.extend(self.overlay.bounded_candidates(query, min_score))
+        return selected
@@ -0,0 +1,377 @@
+# corpus.py
+import json
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from profiles import hash_text
+
+MANIFEST_NAME = 'manifest.jsonl'
+TEXTS_DIR = 'texts'
+
+# Líneas obsoletas del manifiesto toleradas antes de compactarlo automáticamente
+COMPACT_MIN_STALE_LINES = 1000
+
+
+class CorpusEntry:
+    """
+    Texto de referencia de un corpus.
+
+    El cuerpo del texto no se guarda en la entrada: se lee bajo demanda con
+    read_text, de modo que recorrer el corpus solo cuesta leer su manifiesto.
+    """
+
+    __slots__ = ('id', 'autor', '_fingerprint', '_loader')
+
+    def __init__(self, entry_id, autor: str, loader: Callable[[], str],
+                 fingerprint: Optional[str] = None):
+        self.id = entry_id
+        self.autor = autor
+        self._loader = loader
+        self._fingerprint = fingerprint
+
+    @property
+    def fingerprint(self) -> str:
+        """Huella del contenido; si el manifiesto no la trae, se calcula leyendo el texto."""
+        if self._fingerprint is None:
+            self._fingerprint = hash_text(self.read_text())
+        return self._fingerprint
+
+    def read_text(self) -> str:
+        """Lee el cuerpo del texto de referencia."""
+        return self._loader()
+
+
+class Corpus(ABC):
+    """Interfaz común de los corpus de referencia."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        """Recorre las entradas del corpus en orden."""
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    @property
+    @abstractmethod
+    def fingerprint(self) -> str:
+        """Huella de la versión del corpus; cambia cuando cambia su contenido."""
+
+    @abstractmethod
+    def add_author(self, autor: str, texto: str, entry_id=None):
+        """
+        Añade un texto de referencia.
+
+        Args:
+            autor (str): Autor del texto
+            texto (str): Texto de referencia
+            entry_id: Identificador; por defecto el siguiente entero libre
+
+        Returns:
+            Identificador de la nueva entrada
+        """
+
+    @abstractmethod
+    def update(self, entry_id, texto: Optional[str] = None, autor: Optional[str] = None):
+        """
+        Sustituye el texto o el autor de una entrada existente.
+
+        Args:
+            entry_id: Identificador de la entrada
+            texto (Optional[str]): Nuevo texto
+            autor (Optional[str]): Nuevo autor
+        """
+
+    @abstractmethod
+    def remove(self, entry_id):
+        """Elimina una entrada por su identificador."""
+
+    def compact(self):
+        """Elimina del almacenamiento los datos obsoletos; por defecto no hace nada."""
+
+
+def _next_id(ids: Iterable) -> int:
+    """Siguiente identificador entero libre."""
+    return max((entry_id for entry_id in ids if isinstance(entry_id, int)), default=0) + 1
+
+
+class BuiltinCorpus(Corpus):
+    """Corpus en memoria con el formato de database.sample_texts."""
+
+    def __init__(self, samples: Optional[List[Dict]] = None):
+        """
+        Args:
+            samples (Optional[List[Dict]]): Entradas con 'id', 'autor' y 'texto';
+                por defecto database.sample_texts, importado al primer uso
+        """
+        self._samples = samples
+        # La lista recibida no se modifica: se copia antes del primer cambio
+        self._owned = False
+        self._entries: Optional[List[CorpusEntry]] = None
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def samples(self) -> List[Dict]:
+        if self._samples is None:
+            from database import sample_texts
+            self._samples = sample_texts
+        return self._samples
+
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        if self._entries is None:
+            self._entries = [
+                CorpusEntry(sample['id'], sample['autor'],
+                            lambda text=sample['texto']: text)
+                for sample in self.samples
+            ]
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def fingerprint(self) -> str:
+        # Se recalcula solo después de una modificación
+        if self._fingerprint is None:
+            self._fingerprint = hash_text('\n'.join(
+                f"{entry.id}\t{entry.autor}\t{entry.fingerprint}" for entry in self
+            ))
+        return self._fingerprint
+
+    def _modified(self) -> List[Dict]:
+        """Copia la lista de textos antes de la primera modificación e invalida cachés."""
+        if not self._owned:
+            self._samples = list(self.samples)
+            self._owned = True
+        self._entries = None
+        self._fingerprint = None
+        return self._samples
+
+    def _find(self, entry_id) -> int:
+        for position, sample in enumerate(self.samples):
+            if sample['id'] == entry_id:
+                return position
+        raise KeyError(f"No existe la entrada {entry_id!r}")
+
+    def add_author(self, autor: str, texto: str, entry_id=None):
+        if entry_id is None:
+            entry_id = _next_id(sample['id'] for sample in self.samples)
+        elif any(sample['id'] == entry_id for sample in self.samples):
+            raise ValueError(f"Ya existe la entrada {entry_id!r}")
+        self._modified().append({'id': entry_id, 'autor': autor, 'texto': texto})
+        return entry_id
+
+    def update(self, entry_id, texto: Optional[str] = None, autor: Optional[str] = None):
+        position = self._find(entry_id)
+        samples = self._modified()
+        sample = dict(samples[position])
+        if texto is not None:
+            sample['texto'] = texto
+        if autor is not None:
+            sample['autor'] = autor
+        samples[position] = sample
+
+    def remove(self, entry_id):
+        position = self._find(entry_id)
+        del self._modified()[position]
+
+
+class DirectoryCorpus(Corpus):
+    """
+    Corpus guardado en disco: un directorio de archivos de texto con un manifiesto.
+
+    El manifiesto (manifest.jsonl) es un registro de solo anexado con una línea
+    JSON por cambio: 'id', 'autor', 'file' (relativo al directorio) y
+    opcionalmente 'sha256', o {'id': ..., 'deleted': true} para una baja. La
+    última línea de cada id gana y una modificación conserva la posición de la
+    entrada. Cada texto se guarda en texts/ con el nombre de su huella, nunca
+    con el identificador, que puede venir de un cliente; las entradas con el
+    mismo texto comparten archivo. Los textos solo se abren bajo demanda.
+    Cuando las líneas obsoletas superan a las vigentes el manifiesto se
+    compacta. Se admite un único proceso escritor.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Directorio del corpus
+        """
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_NAME)
+        if not os.path.isfile(self.manifest_path):
+            raise FileNotFoundError(f"No existe el manifiesto del corpus: {self.manifest_path}")
+        self._records: Dict = {}
+        self._entries: List[CorpusEntry] = []
+        self._stale_lines = 0
+        self._manifest_stat = None
+
+    def _loader(self, file_name: str) -> Callable[[], str]:
+        file_path = os.path.join(self.path, file_name)
+
+        def load() -> str:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+
+        return load
+
+    def _read_manifest(self) -> Dict:
+        """Lee el manifiesto si cambió desde la última lectura y resuelve el registro."""
+        stat = os.stat(self.manifest_path)
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._manifest_stat:
+            return self._records
+
+        records = {}
+        lines = 0
+        with open(self.manifest_path, 'r', encoding='utf-8') as manifest:
+            for line in manifest:
+                if not line.strip():
+                    continue
+                lines += 1
+                record = json.loads(line)
+                if record.get('deleted'):
+                    records.pop(record['id'], None)
+                else:
+                    records[record['id']] = record
+
+        self._records = records
+        self._entries = [
+            CorpusEntry(record['id'], record['autor'],
+                        self._loader(record['file']), record.get('sha256'))
+            for record in records.values()
+        ]
+        self._stale_lines = lines - len(records)
+        self._manifest_stat = key
+        return records
+
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        self._read_manifest()
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._read_manifest())
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Huella basada en el manifiesto, que se reescribe con cada cambio del corpus.
+
+        Si se edita un texto sin actualizar el manifiesto, la huella no cambia.
+        """
+        stat = os.stat(self.manifest_path)
+        return f"{os.path.abspath(self.path)}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    @staticmethod
+    def _write_text(path: str, entry_id, autor: str, texto: str) -> Dict:
+        """Guarda un texto con el nombre de su huella y devuelve su línea de manifiesto."""
+        sha256 = hash_text(texto)
+        file_name = f"{TEXTS_DIR}/{sha256}.txt"
+        os.makedirs(os.path.join(path, TEXTS_DIR), exist_ok=True)
+        with open(os.path.join(path, file_name), 'w', encoding='utf-8') as f:
+            f.write(texto)
+        return {'id': entry_id, 'autor': autor, 'file': file_name, 'sha256': sha256}
+
+    def _append(self, record: Dict):
+        with open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+            manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._read_manifest()
+        if self._stale_lines > max(COMPACT_MIN_STALE_LINES, len(self._records)):
+            self.compact()
+
+    def add_author(self, autor: str, texto: str, entry_id=None):
+        records = self._read_manifest()
+        if entry_id is None:
+            entry_id = _next_id(records)
+        elif entry_id in records:
+            raise ValueError(f"Ya existe la entrada {entry_id!r}")
+        self._append(self._write_text(self.path, entry_id, autor, texto))
+        return entry_id
+
+    def update(self, entry_id, texto: Optional[str] = None, autor: Optional[str] = None):
+        records = self._read_manifest()
+        if entry_id not in records:
+            raise KeyError(f"No existe la entrada {entry_id!r}")
+        record = dict(records[entry_id])
+        if autor is not None:
+            record['autor'] = autor
+        if texto is not None:
+            # El archivo anterior se conserva hasta la compactación
+            record = self._write_text(self.path, entry_id, record['autor'], texto)
+        self._append(record)
+
+    def remove(self, entry_id):
+        if entry_id not in self._read_manifest():
+            raise KeyError(f"No existe la entrada {entry_id!r}")
+        self._append({'id': entry_id, 'deleted': True})
+
+    def compact(self):
+        """Reescribe el manifiesto solo con las entradas vigentes y borra los textos huérfanos."""
+        records = self._read_manifest()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as manifest:
+                for record in records.values():
+                    manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.manifest_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        live_files = {os.path.normpath(record['file']) for record in records.values()}
+        texts_dir = os.path.join(self.path, TEXTS_DIR)
+        if os.path.isdir(texts_dir):
+            for name in os.listdir(texts_dir):
+                if os.path.normpath(f"{TEXTS_DIR}/{name}") not in live_files:
+                    os.remove(os.path.join(texts_dir, name))
+
+        self._read_manifest()
+
+    @classmethod
+    def create(cls, path: str, samples: Iterable[Dict]) -> 'DirectoryCorpus':
+        """
+        Crea un corpus en disco a partir de entradas con 'id', 'autor' y 'texto'.
+
+        Args:
+            path (str): Directorio destino
+            samples (Iterable[Dict]): Textos de referencia
+
+        Returns:
+            DirectoryCorpus: Corpus creado
+        """
+        os.makedirs(os.path.join(path, TEXTS_DIR), exist_ok=True)
+
+        with open(os.path.join(path, MANIFEST_NAME), 'w', encoding='utf-8') as manifest:
+            for sample in samples:
+                record = cls._write_text(path, sample['id'], sample['autor'], sample['texto'])
+                manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        return cls(path)
+
+
+def open_corpus(path: Optional[str] = None) -> Corpus:
+    """
+    Abre el corpus de un directorio, o el corpus incorporado si no se indica ruta.
+
+    Args:
+        path (Optional[str]): Directorio del corpus
+
+    Returns:
+        Corpus: Corpus de referencia
+    """
+    if path is None:
+        return BuiltinCorpus()
+    return DirectoryCorpus(path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Uso: python corpus.py <directorio>  (exporta la base de datos incorporada)")
+        sys.exit(1)
+
+    corpus = DirectoryCorpus.create(sys.argv[1], BuiltinCorpus().samples)
+    print(f"Corpus creado en {corpus.path} con {len(corpus)} textos")
@@ -0,0 +1,199 @@
+# index.py
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, List, Set, Tuple
+
+# Razón entre los límites de cada cubeta de longitudes medias
+BUCKET_BASE = 1.25
+
+# Holgura para que los errores de redondeo nunca descarten un candidato válido
+BOUND_EPSILON = 1e-9
+
+
+def _bucket(value: float) -> int:
+    """Cubeta logarítmica de un valor; los ceros tienen su propia cubeta."""
+    if value <= 0:
+        return -1
+    return math.floor(math.log(value, BUCKET_BASE))
+
+
+def _similarity_bound(query: float, low: float, high: float) -> float:
+    """
+    Cota superior de _safe_similarity(query, v) para cualquier v en [low, high].
+
+    Args:
+        query (float): Valor del texto de entrada
+        low (float): Menor valor de la cubeta
+        high (float): Mayor valor de la cubeta
+
+    Returns:
+        float: Cota superior de la similitud
+    """
+    if query == 0:
+        return 1.0 if low == 0 else 0.0
+    if high == 0:
+        return 0.0
+    if low <= query <= high:
+        return 1.0
+    if high < query:
+        return high / query
+    return query / low
+
+
+def spelling_mask(categories: Dict[str, bool]) -> int:
+    """Codifica la presencia de cada categoría ortográfica como máscara de bits."""
+    mask = 0
+    for bit, present in enumerate(categories.values()):
+        if present:
+            mask |= 1 << bit
+    return mask
+
+
+class ReferenceIndex:
+    """
+    Índice de los perfiles de referencia sobre sus rasgos baratos.
+
+    Agrupa los perfiles por cubeta de longitud media de oración, cubeta de
+    longitud media de palabra y máscara de categorías ortográficas, y mantiene
+    listas invertidas de las palabras comunes. Con ello acota el score máximo
+    alcanzable por cada candidato y descarta los que no pueden llegar al umbral.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        """
+        Args:
+            weights (Dict[str, float]): Pesos de cada métrica del analizador
+        """
+        self.weights = weights
+        self.category_count = 0
+        self.entries: Dict[Hashable, Tuple[Dict, Tuple[int, int, int]]] = {}
+        self.postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self.groups: Dict[Tuple[int, int, int], Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, key: Hashable, features: Dict):
+        """
+        Añade un perfil al índice, sustituyendo el anterior con la misma clave.
+
+        Args:
+            key (Hashable): Identificador del perfil
+            features (Dict): Vector de rasgos del perfil
+        """
+        if key in self.entries:
+            self.remove(key)
+
+        self.category_count = len(features['spelling_categories'])
+        sentence_length = features['avg_sentence_length']
+        word_length = features['avg_word_length']
+        mask = spelling_mask(features['spelling_categories'])
+        group_key = (_bucket(sentence_length), _bucket(word_length), mask)
+
+        # (rasgos, grupo) de cada perfil
+        self.entries[key] = (features, group_key)
+
+        for word in features['common_words']:
+            self.postings[word].add(key)
+
+        group = self.groups.get(group_key)
+        if group is None:
+            self.groups[group_key] = {
+                'mask': mask,
+                'members': {key},
+                'sentence_min': sentence_length,
+                'sentence_max': sentence_length,
+                'word_min': word_length,
+                'word_max': word_length
+            }
+        else:
+            group['members'].add(key)
+            group['sentence_min'] = min(group['sentence_min'], sentence_length)
+            group['sentence_max'] = max(group['sentence_max'], sentence_length)
+            group['word_min'] = min(group['word_min'], word_length)
+            group['word_max'] = max(group['word_max'], word_length)
+
+    def remove(self, key: Hashable):
+        """
+        Elimina un perfil del índice.
+
+        Los límites de su grupo no se estrechan: siguen siendo una cota válida.
+
+        Args:
+            key (Hashable): Identificador del perfil
+        """
+        features, group_key = self.entries.pop(key)
+
+        for word in features['common_words']:
+            postings = self.postings[word]
+            postings.discard(key)
+            if not postings:
+                del self.postings[word]
+
+        group = self.groups[group_key]
+        group['members'].discard(key)
+        if not group['members']:
+            del self.groups[group_key]
+
+    def candidates(self, query: Dict, min_score: float) -> List[Tuple[Hashable, Dict]]:
+        """
+        Devuelve los perfiles cuyo score máximo alcanzable llega al umbral.
+
+        Args:
+            query (Dict): Vector de rasgos del texto de entrada
+            min_score (float): Score mínimo (0-1)
+
+        Returns:
+            List[Tuple[Hashable, Dict]]: Pares (identificador, rasgos) sin orden definido
+        """
+        return [(key, self.entries[key][0])
+                for _, key in self.bounded_candidates(query, min_score)]
+
+    def bounded_candidates(self, query: Dict, min_score: float
+                           ) -> List[Tuple[float, Hashable]]:
+        """
+        Como candidates, pero con la cota superior del score de cada perfil.
+
+        Args:
+            query (Dict): Vector de rasgos del texto de entrada
+            min_score (float): Score mínimo (0-1)
+
+        Returns:
+            List[Tuple[float, Hashable]]: Pares (cota, identificador) sin orden definido
+        """
+        weights = self.weights
+        threshold = min_score - BOUND_EPSILON
+        query_mask = spelling_mask(query['spelling_categories'])
+        query_sentence = query['avg_sentence_length']
+        query_word = query['avg_word_length']
+
+        # Coincidencias exactas de palabras comunes a partir de las listas invertidas
+        overlaps = Counter()
+        for word in query['common_words']:
+            overlaps.update(self.postings.get(word, ()))
+        common_bound = min(len(query['common_words']), 10) / 10
+
+        selected = []
+        for group in self.groups.values():
+            differing = bin(query_mask ^ group['mask']).count('1')
+            spelling_sim = (self.category_count - differing) / self.category_count \
+                if self.category_count else 0.0
+
+            partial = (
+                weights['sentence_length'] * _similarity_bound(
+                    query_sentence, group['sentence_min'], group['sentence_max']) +
+                weights['word_length'] * _similarity_bound(
+                    query_word, group['word_min'], group['word_max']) +
+                weights['unique_words'] * 1.0 +
+                weights['spelling_patterns'] * spelling_sim
+            )
+
+            if partial + weights['common_words'] * common_bound < threshold:
+                continue
+
+            for key in group['members']:
+                bound = partial + weights['common_words'] * overlaps.get(key, 0) / 10
+                if bound >= threshold:
+                    selected.append((bound, key))
+
+        return selected
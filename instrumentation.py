@@ -0,0 +1,128 @@
+# instrumentation.py
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+# Firma de los ganchos: (tipo, nombre, valor); tipo es 'timing' o 'counter'
+MetricsHook = Callable[[str, str, float], None]
+
+
+class _StageTimer:
+    """Cronómetro de una etapa usado como gestor de contexto."""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Temporizadores por etapa y contadores del analizador.
+
+    Las etapas pueden anidarse (por ejemplo, los patrones ortográficos se
+    calculan dentro de la preparación de perfiles), así que sus tiempos no
+    son aditivos. Cada medición se reenvía a los ganchos registrados.
+    """
+
+    enabled = True
+
+    def __init__(self, hooks: Optional[List[MetricsHook]] = None):
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.calls: Counter = Counter()
+        self.counters: Counter = Counter()
+        self.hooks: List[MetricsHook] = list(hooks or [])
+
+    def add_hook(self, hook: MetricsHook):
+        """Registra una función que recibe cada medición, p. ej. para enviarla a un colector."""
+        self.hooks.append(hook)
+
+    def stage(self, name: str) -> _StageTimer:
+        """Devuelve un gestor de contexto que mide el tiempo de una etapa."""
+        return _StageTimer(self, name)
+
+    def record(self, name: str, seconds: float):
+        """Acumula el tiempo de una etapa."""
+        self.timings[name] += seconds
+        self.calls[name] += 1
+        for hook in self.hooks:
+            hook('timing', name, seconds)
+
+    def count(self, name: str, amount: int = 1):
+        """Incrementa un contador."""
+        self.counters[name] += amount
+        for hook in self.hooks:
+            hook('counter', name, amount)
+
+    def reset(self):
+        """Pone a cero tiempos y contadores, conservando los ganchos."""
+        self.timings.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def merge(self, snapshot: Dict):
+        """Suma a estas métricas una instantánea de otras (p. ej. de otro proceso)."""
+        for name, seconds in snapshot.get('timings', {}).items():
+            self.timings[name] += seconds
+        self.calls.update(snapshot.get('calls', {}))
+        self.counters.update(snapshot.get('counters', {}))
+
+    def snapshot(self) -> Dict:
+        """
+        Devuelve una copia serializable de las métricas.
+
+        Returns:
+            Dict: 'timings' (segundos por etapa), 'calls' y 'counters'
+        """
+        return {
+            'timings': dict(self.timings),
+            'calls': dict(self.calls),
+            'counters': dict(self.counters)
+        }
+
+    def format_report(self) -> str:
+        """Formatea el desglose de tiempos y contadores para mostrarlo."""
+        if not self.timings and not self.counters:
+            return "No hay métricas registradas."
+
+        output = ["Desglose de tiempos por etapa:"]
+        for name, seconds in sorted(self.timings.items(), key=lambda item: item[1], reverse=True):
+            output.append(f"- {name}: {seconds * 1000:.2f} ms ({self.calls[name]} llamadas)")
+
+        if self.counters:
+            output.append("\nContadores:")
+            for name, value in sorted(self.counters.items()):
+                output.append(f"- {name}: {value}")
+
+        return "\n".join(output)
+
+
+class NullMetrics:
+    """Métricas desactivadas: todas las operaciones son no-ops sin reservar memoria."""
+
+    enabled = False
+
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+
+NULL_METRICS = NullMetrics()
@@ -1,8 +1,11 @@
 # main.py
+import argparse
 import sys
 import os
-from typing import Optional
+from typing import List, Optional
 from analyzer import TextStyleAnalyzer, format_analysis_results
+from corpus import open_corpus
+from instrumentation import Metrics
 
 def clear_screen():
     """Limpia la pantalla de la terminal."""
@@ -97,9 +100,81 @@ def save_results(results: str):
         except Exception as e:
             print(f"Error al guardar los resultados: {e}")
 
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Interpreta los argumentos de la línea de comandos.
+
+    Args:
+        argv (Optional[List[str]]): Argumentos; por defecto los de sys.argv
+
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    parser = argparse.ArgumentParser(
+        description="Analizador de similitud de textos. Sin archivos de entrada "
+                    "se inicia el modo interactivo."
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="Archivos, directorios o patrones glob a analizar en lote")
+    parser.add_argument('--min-similarity', type=float, default=70.0,
+                        help="Umbral mínimo de similitud (0-100) [por defecto: 70]")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de procesos en paralelo [por defecto: uno por núcleo]")
+    parser.add_argument('--output', default='-',
+                        help="Archivo de salida .jsonl o .csv, o '-' para la salida estándar")
+    parser.add_argument('--corpus', default=None,
+                        help="Directorio del corpus de referencia [por defecto: el incorporado]")
+    parser.add_argument('--timings', action='store_true',
+                        help="Mostrar el desglose de tiempos por etapa y los contadores")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                        help="Formato de salida [por defecto: según la extensión de --output]")
+    parser.add_argument('--top-k', type=int, default=None,
+                        help="Mostrar solo las N coincidencias más parecidas [por defecto: todas]")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Directorio de confianza para la caché de resultados en disco, "
+                             "compartida entre procesos y ejecuciones [por defecto: sin caché]")
+    parser.add_argument('--by-author', action='store_true',
+                        help="Comparar contra el perfil agregado de cada autor (modo interactivo)")
+    return parser.parse_args(argv)
+
+def run_batch_mode(args: argparse.Namespace):
+    """
+    Analiza en lote los documentos indicados en la línea de comandos.
+
+    Args:
+        args (argparse.Namespace): Argumentos interpretados
+    """
+    from batch import run_batch
+
+    summary = run_batch(
+        args.inputs,
+        min_similarity=max(0, min(100, args.min_similarity)),
+        workers=args.workers,
+        output=args.output,
+        output_format=args.format,
+        corpus_path=args.corpus,
+        timings=args.timings,
+        top_k=args.top_k,
+        cache_dir=args.cache_dir
+    )
+    print(f"Documentos analizados: {summary['documents']} "
+          f"(con error: {summary['errors']})", file=sys.stderr)
+
+    if args.timings:
+        metrics = Metrics()
+        metrics.merge(summary['metrics'])
+        print("\n" + metrics.format_report(), file=sys.stderr)
+
 def main():
     """Función principal del programa."""
-    analyzer = TextStyleAnalyzer()
+    args = parse_arguments()
+    if args.inputs:
+        run_batch_mode(args)
+        return
+
+    analyzer = TextStyleAnalyzer(corpus=open_corpus(args.corpus))
+    if args.timings:
+        analyzer.enable_instrumentation()
 
     while True:
         clear_screen()
@@ -121,17 +196,34 @@ def main():
 
         print("\nAnalizando texto...")
 
+        if args.timings:
+            analyzer.metrics.reset()
+
         # Realizar análisis
-        results = analyzer.analyze_against_database(
-            input_text,
-            min_similarity=params['min_similarity']
-        )
+        if args.by_author:
+            results = analyzer.analyze_against_authors(
+                input_text,
+                min_similarity=params['min_similarity'],
+                top_k=args.top_k,
+                detail='examples'
+            )
+        else:
+            results = analyzer.analyze_against_database(
+                input_text,
+                min_similarity=params['min_similarity'],
+                top_k=args.top_k,
+                detail='examples'
+            )
 
         # Formatear y mostrar resultados
-        formatted_results = format_analysis_results(results)
+        with analyzer.metrics.stage('format'):
+            formatted_results = format_analysis_results(results)
         print("\nResultados del análisis:")
         print(formatted_results)
 
+        if args.timings:
+            print("\n" + analyzer.metrics.format_report())
+
         # Guardar resultados
         save_results(formatted_results)
 
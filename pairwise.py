@@ -0,0 +1,330 @@
+# pairwise.py
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer import TextStyleAnalyzer
+from batch import expand_inputs
+from streaming import extract_stream_features, read_chunks
+from vectorized import NUMERIC_COLUMNS, FeatureMatrix
+from workers import init_worker, worker_analyzer
+
+# Celdas (filas x documentos) de cada bloque de la matriz de similitud
+DEFAULT_BLOCK_CELLS = 4 * 1024 * 1024
+
+_worker_matrix: Optional['PairwiseMatrix'] = None
+
+
+def _safe_similarity_matrix(rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """Versión por pares de TextStyleAnalyzer._safe_similarity (filas x columnas)."""
+    a = rows[:, None]
+    b = columns[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = 1 - np.abs(a - b) / np.maximum(a, b)
+    similarity = np.where((a == 0) | (b == 0), 0.0, similarity)
+    return np.where(a == b, 1.0, similarity)
+
+
+class PairwiseMatrix:
+    """
+    Similitud de todos contra todos sobre los rasgos ya extraídos de un conjunto.
+
+    La matriz completa nunca se guarda: se calcula por bloques de filas con
+    las mismas métricas y pesos que calculate_similarity_score. Las palabras
+    comunes se cruzan con listas invertidas, así que el coste de cada bloque
+    depende de los documentos que comparten palabras, no del vocabulario.
+    """
+
+    def __init__(self, profiles: List[Dict], weights: Dict[str, float]):
+        """
+        Args:
+            profiles (List[Dict]): Vectores de rasgos de los documentos
+            weights (Dict[str, float]): Pesos de cada métrica
+        """
+        matrix = FeatureMatrix(profiles)
+        self.weights = weights
+        self.size = matrix.size
+        self.numeric = matrix.numeric[:matrix.size].copy()
+        self.spelling = matrix.spelling[:matrix.size].astype(np.float64)
+        self.category_count = len(matrix.categories or ())
+
+        word_rows = matrix.word_rows[:matrix.word_count]
+        word_ids = matrix.word_ids[:matrix.word_count]
+
+        # Palabras de cada documento (las filas se añadieron en orden)
+        self.doc_words = word_ids
+        self.doc_indptr = np.searchsorted(word_rows, np.arange(self.size + 1))
+
+        # Documentos de cada palabra
+        order = np.argsort(word_ids, kind='stable')
+        self.posting_docs = word_rows[order]
+        self.posting_indptr = np.searchsorted(
+            word_ids[order], np.arange(len(matrix.vocabulary) + 1)
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _common_word_overlap(self, start: int, stop: int) -> np.ndarray:
+        """Palabras comunes compartidas por cada fila del bloque con cada documento."""
+        block = stop - start
+        first, last = self.doc_indptr[start], self.doc_indptr[stop]
+        words = self.doc_words[first:last]
+        rows = np.repeat(np.arange(block), np.diff(self.doc_indptr[start:stop + 1]))
+
+        counts = self.posting_indptr[words + 1] - self.posting_indptr[words]
+        offsets = np.repeat(self.posting_indptr[words] - np.cumsum(counts) + counts, counts)
+        columns = self.posting_docs[offsets + np.arange(counts.sum())]
+        cells = np.repeat(rows, counts) * self.size + columns
+
+        return np.bincount(cells, minlength=block * self.size).reshape(block, self.size)
+
+    def block(self, start: int, stop: int) -> np.ndarray:
+        """
+        Calcula las filas [start, stop) de la matriz de similitud.
+
+        Args:
+            start (int): Primera fila
+            stop (int): Fila siguiente a la última
+
+        Returns:
+            np.ndarray: Scores (0-1) de cada fila contra todos los documentos
+        """
+        weights = self.weights
+        numeric = self.numeric
+        columns = {name: i for i, name in enumerate(NUMERIC_COLUMNS)}
+
+        scores = np.zeros((stop - start, self.size))
+        for metric, column in (('sentence_length', 'avg_sentence_length'),
+                               ('word_length', 'avg_word_length'),
+                               ('unique_words', 'unique_words_ratio')):
+            values = numeric[:, columns[column]]
+            scores += weights[metric] * _safe_similarity_matrix(values[start:stop], values)
+
+        scores += weights['common_words'] * (self._common_word_overlap(start, stop) / 10)
+
+        if self.category_count:
+            spelling = self.spelling
+            block = spelling[start:stop]
+            agreement = block @ spelling.T + (1 - block) @ (1 - spelling).T
+            scores += weights['spelling_patterns'] * (agreement / self.category_count)
+
+        return scores
+
+    def blocks(self, block_cells: int = DEFAULT_BLOCK_CELLS) -> Iterator[Tuple[int, int]]:
+        """Rangos de filas de cada bloque, con unas block_cells celdas por bloque."""
+        rows = max(1, block_cells // max(self.size, 1))
+        for start in range(0, self.size, rows):
+            yield start, min(start + rows, self.size)
+
+
+def top_k_neighbors(scores: np.ndarray, start: int,
+                    k: Optional[int]) -> List[List[Tuple[int, float]]]:
+    """
+    Los k documentos más parecidos a cada fila de un bloque, sin contar el propio.
+
+    Args:
+        scores (np.ndarray): Bloque devuelto por PairwiseMatrix.block
+        start (int): Primera fila del bloque
+        k (Optional[int]): Vecinos por documento; None para todos
+
+    Returns:
+        List[List[Tuple[int, float]]]: (documento, score) por fila, de mayor a menor
+            score y, a igual score, por índice
+    """
+    scores = scores.copy()
+    rows = np.arange(len(scores))
+    scores[rows, rows + start] = -np.inf
+    k = scores.shape[1] - 1 if k is None else min(k, scores.shape[1] - 1)
+    if k <= 0:
+        return [[] for _ in rows]
+
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    neighbors = []
+    for row, columns in zip(rows, candidates):
+        values = scores[row, columns]
+        order = np.lexsort((columns, -values))
+        neighbors.append([(int(columns[i]), float(values[i])) for i in order])
+    return neighbors
+
+
+def pairs_above(scores: np.ndarray, start: int, min_similarity: float
+                ) -> List[Tuple[int, int, float]]:
+    """
+    Pares (i, j) con i < j cuyo score alcanza el umbral.
+
+    Args:
+        scores (np.ndarray): Bloque devuelto por PairwiseMatrix.block
+        start (int): Primera fila del bloque
+        min_similarity (float): Umbral mínimo de similitud (0-100)
+
+    Returns:
+        List[Tuple[int, int, float]]: Pares y su score, por fila y columna
+    """
+    rows, columns = np.nonzero(scores * 100 >= min_similarity)
+    keep = columns > rows + start
+    rows, columns = rows[keep], columns[keep]
+    return [(int(i + start), int(j), float(scores[i, j])) for i, j in zip(rows, columns)]
+
+
+def _extract_file(path: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Extrae los rasgos de un archivo leyéndolo por bloques."""
+    analyzer = worker_analyzer() or TextStyleAnalyzer(profile_store_path=None)
+    try:
+        return path, extract_stream_features(analyzer, read_chunks(path))['features'], None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _init_block_worker(matrix: PairwiseMatrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _score_block(start: int, stop: int, top_k: Optional[int],
+                 min_similarity: Optional[float], matrix: Optional[PairwiseMatrix] = None):
+    matrix = matrix or _worker_matrix
+    scores = matrix.block(start, stop)
+    if min_similarity is not None:
+        return start, pairs_above(scores, start, min_similarity)
+    return start, top_k_neighbors(scores, start, top_k)
+
+
+def run_pairwise(inputs: List[str], top_k: Optional[int] = 10,
+                 min_similarity: Optional[float] = None, workers: Optional[int] = None,
+                 output: str = '-', block_cells: int = DEFAULT_BLOCK_CELLS) -> Dict:
+    """
+    Compara todos los documentos de un conjunto entre sí y escribe los resultados.
+
+    Con min_similarity se escribe una línea JSON por par que alcanza el umbral;
+    si no, una línea por documento con sus top_k vecinos más parecidos, o con
+    todos los demás documentos si top_k es None.
+
+    Args:
+        inputs (List[str]): Archivos, directorios o patrones glob
+        top_k (Optional[int]): Vecinos por documento; None para todos
+        min_similarity (Optional[float]): Umbral mínimo de similitud (0-100)
+        workers (Optional[int]): Número de procesos; por defecto uno por núcleo
+        output (str): Archivo JSONL de salida, o '-' para la salida estándar
+        block_cells (int): Celdas de la matriz calculadas por bloque
+
+    Returns:
+        Dict: Documentos comparados, documentos con error y líneas escritas
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = list(expand_inputs(inputs))
+    summary = {'documents': 0, 'errors': 0, 'records': 0}
+
+    # Los rasgos de cada documento se extraen una sola vez
+    if workers == 1:
+        extracted = map(_extract_file, paths)
+        executor = None
+    else:
+        # Los procesos solo extraen rasgos: no necesitan perfiles de referencia
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=partial(init_worker, profile_store_path=None, references=False)
+        )
+        extracted = executor.map(_extract_file, paths, chunksize=16)
+
+    documents, profiles = [], []
+    try:
+        for path, features, error in extracted:
+            if error is not None:
+                print(f"Error en {path}: {error}", file=sys.stderr)
+                summary['errors'] += 1
+            else:
+                documents.append(path)
+                profiles.append(features)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    summary['documents'] = len(documents)
+    if not documents:
+        return summary
+
+    matrix = PairwiseMatrix(profiles, TextStyleAnalyzer(profile_store_path=None).weights)
+    out = sys.stdout if output == '-' else open(output, 'w', encoding='utf-8')
+
+    def write(start: int, result):
+        if min_similarity is not None:
+            for i, j, score in result:
+                out.write(json.dumps({
+                    'archivo_a': documents[i],
+                    'archivo_b': documents[j],
+                    'similitud': score * 100
+                }, ensure_ascii=False) + '\n')
+                summary['records'] += 1
+        else:
+            for offset, neighbors in enumerate(result):
+                out.write(json.dumps({
+                    'archivo': documents[start + offset],
+                    'vecinos': [{'archivo': documents[j], 'similitud': score * 100}
+                                for j, score in neighbors]
+                }, ensure_ascii=False) + '\n')
+                summary['records'] += 1
+        out.flush()
+
+    try:
+        if workers == 1:
+            for start, stop in matrix.blocks(block_cells):
+                write(*_score_block(start, stop, top_k, min_similarity, matrix))
+        else:
+            # Bloques en vuelo limitados; se escriben en orden de filas
+            max_pending = workers * 2
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_block_worker,
+                                     initargs=(matrix,)) as executor:
+                pending = deque()
+                for start, stop in matrix.blocks(block_cells):
+                    if len(pending) >= max_pending:
+                        write(*pending.popleft().result())
+                    pending.append(executor.submit(
+                        _score_block, start, stop, top_k, min_similarity
+                    ))
+                while pending:
+                    write(*pending.popleft().result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Similitud de todos contra todos en un conjunto de documentos"
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help="Archivos, directorios o patrones glob a comparar")
+    parser.add_argument('--top-k', type=int, default=10,
+                        help="Vecinos más parecidos por documento [por defecto: 10]")
+    parser.add_argument('--min-similarity', type=float, default=None,
+                        help="Escribir los pares que alcanzan este umbral (0-100) "
+                             "en lugar de los vecinos")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de procesos en paralelo [por defecto: uno por núcleo]")
+    parser.add_argument('--output', default='-',
+                        help="Archivo de salida .jsonl, o '-' para la salida estándar")
+    args = parser.parse_args()
+
+    summary = run_pairwise(
+        args.inputs,
+        top_k=max(0, args.top_k),
+        min_similarity=args.min_similarity,
+        workers=args.workers,
+        output=args.output
+    )
+    print(f"Documentos comparados: {summary['documents']} "
+          f"(con error: {summary['errors']})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
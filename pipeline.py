@@ -0,0 +1,391 @@
+# pipeline.py
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+from batch import TEXT_EXTENSIONS, ResultWriter, format_matches
+from streaming import extract_stream_features, read_chunks
+from tokenizer import tokenize
+from workers import create_analyzer, set_worker_analyzer, worker_analyzer, worker_pool
+
+# Documentos como máximo entre la lectura y la escritura de su resultado
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# Documentos como máximo por tarea enviada a los procesos; se agrupan los que
+# ya esperan en la cola, así que con poca carga cada documento va solo
+MAX_BATCH = 16
+
+# Segundos entre dos revisiones del directorio de entrada
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Subdirectorio al que se mueven los archivos ya procesados
+DONE_DIR = 'procesados'
+
+# Documento leído: (nombre, ruta del archivo o None, texto o None)
+Document = Tuple[str, Optional[str], Optional[str]]
+
+
+def _extract_documents(documents: List[Tuple[Optional[str], Optional[str]]]
+                       ) -> List[Tuple[Optional[Dict], Optional[str]]]:
+    """Extrae los rasgos de cada (ruta, texto); los archivos se leen por bloques."""
+    analyzer = worker_analyzer()
+    results = []
+    for path, text in documents:
+        try:
+            if path is not None:
+                features = extract_stream_features(analyzer, read_chunks(path))['features']
+            else:
+                features = tokenize(analyzer, text).features()
+            results.append((features, None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _score_documents(features_list: List[Dict], min_similarity: float, top_k: Optional[int]
+                     ) -> List[Tuple[List[Dict], Optional[str]]]:
+    """Compara unos rasgos ya extraídos contra la base de datos."""
+    analyzer = worker_analyzer()
+    results = []
+    for features in features_list:
+        try:
+            matches = analyzer.match_features(features, {}, min_similarity,
+                                              top_k=top_k, detail='scores')
+            results.append((format_matches(matches), None))
+        except Exception as e:
+            results.append(([], str(e)))
+    return results
+
+
+async def _take(queue: asyncio.Queue, limit: int) -> List:
+    """Espera un elemento y añade los que ya estén en la cola, hasta limit o un None."""
+    items = [await queue.get()]
+    while items[-1] is not None and len(items) < limit and not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+async def spool_documents(directory: str, claimed: Set[str],
+                          poll_interval: float = DEFAULT_POLL_INTERVAL,
+                          once: bool = False) -> AsyncIterator[Document]:
+    """
+    Entrega los archivos de texto que aparecen en un directorio de entrada.
+
+    Los archivos deben dejarse en el directorio ya completos (p. ej. escritos
+    con otro nombre y renombrados). Se entregan por orden de modificación y
+    cada uno se añade a claimed hasta que se procesa y se mueve a DONE_DIR.
+
+    Args:
+        directory (str): Directorio de entrada
+        claimed (Set[str]): Rutas entregadas y aún no movidas
+        poll_interval (float): Segundos entre revisiones del directorio
+        once (bool): Terminar tras entregar los archivos presentes al empezar
+
+    Returns:
+        AsyncIterator[Document]: Documentos por leer desde su ruta
+    """
+    while True:
+        with os.scandir(directory) as scan:
+            found = [entry for entry in scan
+                     if entry.is_file() and entry.name.lower().endswith(TEXT_EXTENSIONS)
+                     and entry.path not in claimed]
+        found.sort(key=lambda entry: (entry.stat().st_mtime, entry.name))
+
+        for entry in found:
+            claimed.add(entry.path)
+            yield entry.name, entry.path, None
+
+        if once:
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def line_documents(stream: TextIO) -> AsyncIterator[Document]:
+    """
+    Entrega un documento por cada línea no vacía de un flujo de texto.
+
+    Una línea puede ser el texto sin más o un objeto JSON con 'texto' y,
+    opcionalmente, 'id'.
+
+    Args:
+        stream (TextIO): Flujo de entrada, p. ej. sys.stdin
+
+    Returns:
+        AsyncIterator[Document]: Documentos con su texto
+    """
+    loop = asyncio.get_running_loop()
+    line_number = 0
+    while True:
+        # La lectura bloqueante se hace en un hilo para no detener el resto de etapas
+        line = await loop.run_in_executor(None, stream.readline)
+        if not line:
+            return
+        line_number += 1
+        line = line.rstrip('\n')
+        if not line.strip():
+            continue
+
+        name, text = f'<stdin>:{line_number}', line
+        if line.lstrip().startswith('{'):
+            try:
+                document = json.loads(line)
+            except ValueError:
+                document = None
+            if isinstance(document, dict) and isinstance(document.get('texto'), str):
+                name = str(document.get('id', name))
+                text = document['texto']
+        yield name, None, text
+
+
+async def _run_stages(documents: AsyncIterator[Document], executor: Executor,
+                      write: Callable[[Optional[str], Dict], None], stage_workers: int,
+                      min_similarity: float, top_k: Optional[int], ordered: bool,
+                      max_in_flight: int):
+    """
+    Conecta lectura, extracción, scoring y escritura con colas acotadas.
+
+    Un semáforo limita los documentos entre la lectura y la escritura, de
+    modo que la memoria no crece con el ritmo de llegada: si las etapas de
+    cálculo no dan abasto, la lectura espera. Con ordered, los resultados
+    se escriben en el orden de lectura. Si una etapa falla (p. ej. al
+    escribir en una tubería cerrada), las demás se cancelan y el error se
+    propaga.
+    """
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(max_in_flight)
+    extract_queue = asyncio.Queue(max_in_flight)
+    score_queue = asyncio.Queue(max_in_flight)
+    output_queue = asyncio.Queue(max_in_flight)
+
+    async def read():
+        sequence = 0
+        async for name, path, text in documents:
+            await in_flight.acquire()
+            await extract_queue.put((sequence, name, path, text))
+            sequence += 1
+        for _ in range(stage_workers):
+            await extract_queue.put(None)
+
+    async def extract():
+        while True:
+            items = await _take(extract_queue, MAX_BATCH)
+            documents = [item for item in items if item is not None]
+            if documents:
+                try:
+                    results = await loop.run_in_executor(
+                        executor, _extract_documents,
+                        [(path, text) for _, _, path, text in documents]
+                    )
+                except Exception as e:
+                    results = [(None, str(e))] * len(documents)
+                for (sequence, name, path, _), (features, error) in zip(documents, results):
+                    await score_queue.put((sequence, name, path, features, error))
+            if items[-1] is None:
+                return
+
+    async def score():
+        while True:
+            items = await _take(score_queue, MAX_BATCH)
+            documents = [item for item in items if item is not None]
+            # Los documentos que fallaron al extraer pasan sin puntuar
+            extracted = [item for item in documents if item[4] is None]
+            results = {}
+            if extracted:
+                try:
+                    scored = await loop.run_in_executor(
+                        executor, _score_documents, [item[3] for item in extracted],
+                        min_similarity, top_k
+                    )
+                except Exception as e:
+                    scored = [([], str(e))] * len(extracted)
+                results = {item[0]: result for item, result in zip(extracted, scored)}
+            for sequence, name, path, _, error in documents:
+                matches, error = results.get(sequence, ([], error))
+                record = {'archivo': name, 'coincidencias': matches, 'error': error}
+                await output_queue.put((sequence, path, record))
+            if items[-1] is None:
+                return
+
+    async def output():
+        waiting = {}
+        next_sequence = 0
+        while True:
+            item = await output_queue.get()
+            if item is None:
+                return
+            if not ordered:
+                try:
+                    write(item[1], item[2])
+                finally:
+                    in_flight.release()
+                continue
+
+            waiting[item[0]] = item
+            while next_sequence in waiting:
+                _, path, record = waiting.pop(next_sequence)
+                next_sequence += 1
+                try:
+                    write(path, record)
+                finally:
+                    in_flight.release()
+
+    async def close(stage: List[asyncio.Task], queue: asyncio.Queue, markers: int):
+        """Marca el final de la cola siguiente cuando termina una etapa."""
+        await asyncio.gather(*stage)
+        for _ in range(markers):
+            await queue.put(None)
+
+    extractors = [asyncio.create_task(extract()) for _ in range(stage_workers)]
+    scorers = [asyncio.create_task(score()) for _ in range(stage_workers)]
+    tasks = [asyncio.create_task(read()), asyncio.create_task(output()),
+             asyncio.create_task(close(extractors, score_queue, stage_workers)),
+             asyncio.create_task(close(scorers, output_queue, 1))] + extractors + scorers
+
+    try:
+        # La primera excepción de cualquier etapa se propaga aquí
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run_pipeline(source: str, min_similarity: float = 70.0, top_k: Optional[int] = None,
+                 workers: Optional[int] = None, output: str = '-',
+                 output_format: Optional[str] = None, corpus_path: Optional[str] = None,
+                 ordered: bool = False, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, once: bool = False) -> Dict:
+    """
+    Analiza un flujo continuo de documentos y escribe un resultado por documento.
+
+    Los documentos llegan como archivos en un directorio de entrada o como
+    líneas de la entrada estándar. La extracción de rasgos y el scoring se
+    reparten entre los procesos como etapas separadas, y la lectura se frena
+    cuando hay max_in_flight documentos pendientes. Los archivos procesados
+    se mueven a DONE_DIR dentro del directorio de entrada después de
+    escribir su resultado.
+
+    Args:
+        source (str): Directorio de entrada, o '-' para leer líneas de la entrada estándar
+        min_similarity (float): Umbral mínimo de similitud (0-100)
+        top_k (Optional[int]): Coincidencias por documento; por defecto todas
+        workers (Optional[int]): Número de procesos; por defecto uno por núcleo
+        output (str): Archivo de salida, o '-' para la salida estándar
+        output_format (Optional[str]): 'jsonl' o 'csv'
+        corpus_path (Optional[str]): Directorio del corpus; por defecto el incorporado
+        ordered (bool): Escribir los resultados en el orden de llegada de los documentos
+        max_in_flight (int): Documentos como máximo en proceso a la vez
+        poll_interval (float): Segundos entre revisiones del directorio de entrada
+        once (bool): Con un directorio, terminar tras procesar los archivos presentes
+
+    Returns:
+        Dict: Documentos procesados, documentos con error, segundos y documentos por segundo
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = {'documents': 0, 'errors': 0}
+
+    claimed: Set[str] = set()
+    if source == '-':
+        documents = line_documents(sys.stdin)
+        done_dir = None
+    else:
+        documents = spool_documents(source, claimed, poll_interval, once)
+        done_dir = os.path.join(source, DONE_DIR)
+        os.makedirs(done_dir, exist_ok=True)
+
+    writer = ResultWriter(output, output_format)
+
+    def write(path: Optional[str], record: Dict):
+        writer.write(record)
+        summary['documents'] += 1
+        if record['error']:
+            summary['errors'] += 1
+        if path is not None:
+            try:
+                os.replace(path, os.path.join(done_dir, os.path.basename(path)))
+            except OSError:
+                pass
+            claimed.discard(path)
+
+    analyzer = create_analyzer(corpus_path)
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            # Un solo hilo de cálculo con el analizador de este proceso
+            analyzer.load_references()
+            set_worker_analyzer(analyzer)
+            pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            pool = worker_pool(analyzer, corpus_path, workers)
+        with pool as executor:
+            asyncio.run(_run_stages(documents, executor, write, workers, min_similarity,
+                                    top_k, ordered, max(1, max_in_flight)))
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    summary['seconds'] = seconds
+    summary['documents_per_second'] = summary['documents'] / seconds if seconds > 0 else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Análisis continuo de documentos desde un directorio o la entrada estándar"
+    )
+    parser.add_argument('source',
+                        help="Directorio de entrada a vigilar, o '-' para leer un documento "
+                             "por línea de la entrada estándar")
+    parser.add_argument('--min-similarity', type=float, default=70.0,
+                        help="Umbral mínimo de similitud (0-100) [por defecto: 70]")
+    parser.add_argument('--top-k', type=int, default=None,
+                        help="Coincidencias por documento [por defecto: todas]")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de procesos en paralelo [por defecto: uno por núcleo]")
+    parser.add_argument('--output', default='-',
+                        help="Archivo de salida .jsonl o .csv, o '-' para la salida estándar")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None,
+                        help="Formato de salida [por defecto: según la extensión de --output]")
+    parser.add_argument('--corpus', default=None,
+                        help="Directorio del corpus de referencia [por defecto: el incorporado]")
+    parser.add_argument('--ordered', action='store_true',
+                        help="Escribir los resultados en el orden de llegada")
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help=f"Documentos en proceso a la vez [por defecto: {DEFAULT_MAX_IN_FLIGHT}]")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Segundos entre revisiones del directorio "
+                             f"[por defecto: {DEFAULT_POLL_INTERVAL}]")
+    parser.add_argument('--once', action='store_true',
+                        help="Procesar los archivos presentes en el directorio y terminar")
+    args = parser.parse_args()
+
+    try:
+        summary = run_pipeline(
+            args.source,
+            min_similarity=max(0, min(100, args.min_similarity)),
+            top_k=args.top_k,
+            workers=args.workers,
+            output=args.output,
+            output_format=args.format,
+            corpus_path=args.corpus,
+            ordered=args.ordered,
+            max_in_flight=args.max_in_flight,
+            poll_interval=args.poll_interval,
+            once=args.once
+        )
+    except KeyboardInterrupt:
+        print("\nInterrumpido", file=sys.stderr)
+        sys.exit(130)
+
+    print(f"Documentos analizados: {summary['documents']} "
+          f"(con error: {summary['errors']}, "
+          f"{summary['documents_per_second']:.1f} documentos/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
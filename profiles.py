@@ -0,0 +1,258 @@
+# profiles.py
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from vocabulary import CompactProfile, ProfileCodec
+
+# Versión del formato del archivo de perfiles
+PROFILE_FORMAT_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text: str) -> str:
+    """Calcula la huella SHA-256 de un texto."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _features_to_json(features: Mapping) -> Dict:
+    """Convierte un vector de rasgos a tipos serializables en JSON."""
+    data = {}
+    for key, value in features.items():
+        if isinstance(value, set):
+            data[key] = sorted(value)
+        elif isinstance(value, dict):
+            data[key] = dict(value)
+        elif isinstance(value, int):
+            data[key] = value
+        else:
+            data[key] = float(value)
+    return data
+
+
+class ProfileStore:
+    """
+    Almacén persistente de perfiles de rasgos de los textos de referencia.
+
+    Cada perfil se calcula una sola vez y se guarda indexado por la huella del
+    texto, así que un texto modificado obtiene un perfil nuevo. El archivo es
+    JSONL de solo anexado: una cabecera con la versión y la configuración y
+    una línea por perfil, de modo que guardar un perfil nuevo no reescribe los
+    anteriores. El archivo completo queda invalidado si cambia la
+    configuración del analizador.
+
+    Guardar es una optimización: si el archivo no se puede escribir, el error
+    se registra una vez y los perfiles se conservan solo en memoria.
+    """
+
+    def __init__(self, analyzer, path: Optional[str] = None):
+        """
+        Args:
+            analyzer (TextStyleAnalyzer): Analizador usado para extraer rasgos
+            path (Optional[str]): Archivo JSONL de perfiles; None para no persistir
+        """
+        self.analyzer = analyzer
+        self.path = path
+        self.config_hash = analyzer.feature_config_hash()
+        # Los perfiles se guardan en memoria como CompactProfile sobre un vocabulario común
+        self.codec = ProfileCodec(analyzer.spelling_analyzer.common_patterns.keys())
+        self._profiles: Dict[str, CompactProfile] = {}
+        self._pending: List[str] = []
+        # Posición e inodo leídos, para incorporar lo que anexen otros procesos.
+        # El archivo se lee al pedir el primer perfil que falte (ver refresh):
+        # si todos vienen de un archivo columnar, no se lee nunca
+        self._offset = 0
+        self._inode = None
+        # Tras un error de escritura no se vuelve a intentar guardar
+        self._writable = True
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._profiles)
+
+    def _header(self) -> str:
+        return json.dumps({'version': PROFILE_FORMAT_VERSION, 'config': self.config_hash}) + '\n'
+
+    def _load(self):
+        """Carga los perfiles guardados si son compatibles con la configuración."""
+        self._offset = 0
+        self._inode = None
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                header = f.readline()
+                if header.decode('utf-8') != self._header():
+                    return
+                self._inode = inode
+                self._offset = len(header)
+                self._read_lines(f)
+        except (OSError, ValueError):
+            self._inode = None
+
+    def _read_lines(self, f):
+        """Lee los perfiles desde la posición actual; ignora una última línea incompleta."""
+        f.seek(self._offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            self._offset += len(line)
+            record = json.loads(line.decode('utf-8'))
+            self._profiles[record['fingerprint']] = self.codec.encode(record['features'])
+
+    def refresh(self):
+        """Incorpora los perfiles anexados al archivo por otros procesos."""
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # El archivo se reescribió (compactación o cambio de configuración)
+            self._load()
+        elif stat.st_size > self._offset:
+            try:
+                with open(self.path, 'rb') as f:
+                    self._read_lines(f)
+            except (OSError, ValueError):
+                self._load()
+
+    def _record_line(self, fingerprint: str) -> str:
+        record = {'fingerprint': fingerprint,
+                  'features': _features_to_json(self._profiles[fingerprint])}
+        return json.dumps(record, ensure_ascii=False) + '\n'
+
+    def _write_failed(self, error: OSError):
+        """Registra un error de escritura y deja el almacén solo en memoria."""
+        self._writable = False
+        self._pending = []
+        logger.warning("No se pudo escribir el almacén de perfiles %s (%s); "
+                       "los perfiles se conservan solo en memoria", self.path, error)
+
+    def save(self):
+        """Anexa al disco los perfiles nuevos; reescribe el archivo si no es válido."""
+        if not self.path or not self._pending or not self._writable:
+            return
+        try:
+            self._save()
+        except OSError as e:
+            self._write_failed(e)
+
+    def _save(self):
+        try:
+            valid = self._inode is not None and os.stat(self.path).st_ino == self._inode
+        except OSError:
+            valid = False
+
+        if not valid:
+            self._rewrite(self._profiles)
+            return
+
+        # Una sola escritura en modo anexado por lote de perfiles
+        data = ''.join(self._record_line(fingerprint) for fingerprint in self._pending)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+        # Lo anexado por otros procesos se leerá en el siguiente refresh
+        self._pending = []
+
+    def _rewrite(self, fingerprints: Iterable[str]):
+        """Reescribe el archivo completo de forma atómica con los perfiles indicados."""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(self._header())
+                for fingerprint in fingerprints:
+                    f.write(self._record_line(fingerprint))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        stat = os.stat(self.path)
+        self._inode = stat.st_ino
+        self._offset = stat.st_size
+        self._pending = []
+
+    def compact(self, keep: Iterable[str]):
+        """
+        Descarta los perfiles que ya no usa ningún texto de referencia.
+
+        Args:
+            keep (Iterable[str]): Huellas de los textos vigentes
+        """
+        keep = set(keep)
+        self.refresh()
+        self._profiles = {
+            fingerprint: features for fingerprint, features in self._profiles.items()
+            if fingerprint in keep
+        }
+        if self.path and self._writable:
+            try:
+                self._rewrite(self._profiles)
+            except OSError as e:
+                self._write_failed(e)
+        self._pending = []
+
+    def discard(self, fingerprints: Iterable[str]):
+        """
+        Descarta los perfiles de los textos indicados y reescribe el archivo.
+
+        Args:
+            fingerprints (Iterable[str]): Huellas de los textos a descartar
+        """
+        discard = set(fingerprints)
+        self.refresh()
+        self.compact(fingerprint for fingerprint in self._profiles if fingerprint not in discard)
+
+    def get_profile(self, entry) -> CompactProfile:
+        """
+        Obtiene el perfil de un texto de referencia, calculándolo si hace falta.
+
+        El texto solo se lee cuando no hay un perfil guardado para su huella.
+
+        Args:
+            entry (CorpusEntry): Entrada del corpus de referencia
+
+        Returns:
+            CompactProfile: Vector de rasgos del texto
+        """
+        fingerprint = entry.fingerprint
+        features = self._profiles.get(fingerprint)
+
+        if features is None:
+            # Puede haberlo calculado otro proceso que comparte el archivo
+            self.refresh()
+            features = self._profiles.get(fingerprint)
+
+        if features is None:
+            features = self.codec.encode(self.analyzer.extract_features(entry.read_text()))
+            self._profiles[fingerprint] = features
+            self._pending.append(fingerprint)
+
+        return features
+
+    def get_profiles(self, entries: Iterable) -> List[CompactProfile]:
+        """
+        Obtiene los perfiles de una colección de textos de referencia.
+
+        Args:
+            entries (Iterable[CorpusEntry]): Entradas del corpus
+
+        Returns:
+            List[CompactProfile]: Vectores de rasgos en el mismo orden que las entradas
+        """
+        profiles = [self.get_profile(entry) for entry in entries]
+        self.save()
+        return profiles
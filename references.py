@@ -0,0 +1,229 @@
+# references.py
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Optional, Set, Union
+
+from corpus import Corpus, CorpusEntry
+from index import ReferenceIndex
+from profiles import ProfileStore
+from vocabulary import CompactProfile, ProfileCodec
+
+# La matriz de rasgos y el formato columnar dependen de NumPy: se importan al usarlos
+if TYPE_CHECKING:
+    import numpy as np
+    from columnar import ColumnarFeatures, ColumnarIndex
+    from vectorized import FeatureMatrix
+
+
+class _ColumnarProfiles(dict):
+    """Perfiles por identificador que se reconstruyen desde el archivo columnar al pedirlos."""
+
+    def __init__(self, columnar: 'ColumnarFeatures', codec: ProfileCodec):
+        super().__init__()
+        self._columnar = columnar
+        self._codec = codec
+
+    def __missing__(self, key):
+        profile, = self._columnar.compact_profiles([self._columnar.rows[key]], self._codec)
+        self[key] = profile
+        return profile
+
+    def decode(self, keys: Iterable[Hashable]):
+        """Reconstruye en bloque los perfiles de las claves que aún no se han pedido."""
+        missing = [key for key in keys if key not in self]
+        rows = self._columnar.rows
+        self.update(zip(missing, self._columnar.compact_profiles(
+            [rows[key] for key in missing], self._codec)))
+
+
+class ReferenceSet:
+    """
+    Perfiles, índice y matriz de rasgos de un corpus, mantenidos de forma incremental.
+
+    Al sincronizar con el corpus solo se procesan las entradas añadidas,
+    eliminadas o cuyo texto cambió: los perfiles salen del almacén, y el
+    índice y la matriz se actualizan por identificador en lugar de
+    reconstruirse. Si la huella del corpus no cambió, sincronizar no cuesta
+    nada. El índice se construye en su primer uso. Los perfiles son
+    CompactProfile del vocabulario de codec, que comparte la matriz de rasgos.
+
+    Si se parte de un archivo columnar, el índice trabaja sobre sus arreglos
+    proyectados en memoria y solo se reconstruyen los perfiles que se evalúan.
+    """
+
+    def __init__(self, weights: Dict[str, float], codec: ProfileCodec):
+        """
+        Args:
+            weights (Dict[str, float]): Pesos de cada métrica del analizador
+            codec (ProfileCodec): Codificador de los perfiles del almacén
+        """
+        self.weights = weights
+        self.codec = codec
+        self.entries: List[CorpusEntry] = []
+        self.positions: Dict[Hashable, int] = {}
+        self.profiles: Dict[Hashable, CompactProfile] = {}
+        self.fingerprints: Dict[Hashable, str] = {}
+        # Huellas de textos que el corpus dejó de usar desde la última compactación
+        self.retired: Set[str] = set()
+        self._index: Optional[Union[ReferenceIndex, 'ColumnarIndex']] = None
+        self.corpus_fingerprint: Optional[str] = None
+        self._matrix: Optional['FeatureMatrix'] = None
+        self._order: Optional['np.ndarray'] = None
+        # Archivo columnar del que se partió, mientras la matriz pueda construirse sobre él
+        self._columnar: Optional['ColumnarFeatures'] = None
+        # Archivo columnar del que se partió; el índice usa sus filas aún vigentes
+        self._base: Optional['ColumnarFeatures'] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def index(self) -> Union[ReferenceIndex, 'ColumnarIndex']:
+        """Índice de prefiltrado de las referencias."""
+        if self._index is None and self._base is not None:
+            from columnar import ColumnarIndex
+
+            base = self._base
+            index = ColumnarIndex(self.weights, base)
+            for entry in self.entries:
+                row = base.rows.get(entry.id)
+                if row is not None and base.fingerprints[row] == self.fingerprints[entry.id]:
+                    index.keep(entry.id)
+                else:
+                    index.add(entry.id, self.profiles[entry.id])
+            self._index = index
+        elif self._index is None:
+            index = ReferenceIndex(self.weights)
+            for entry in self.entries:
+                index.add(entry.id, self.profiles[entry.id])
+            self._index = index
+        return self._index
+
+    def load_columnar(self, corpus: Corpus, columnar: 'ColumnarFeatures') -> bool:
+        """
+        Toma el estado inicial de un archivo columnar exportado de este corpus.
+
+        El índice y la matriz de rasgos se construirán sobre los arreglos
+        proyectados en memoria y los perfiles solo se reconstruyen cuando se
+        piden. Si el corpus cambió desde la exportación, la siguiente
+        sincronización aplica solo la diferencia.
+
+        Args:
+            corpus (Corpus): Corpus de referencia
+            columnar (ColumnarFeatures): Perfiles exportados de ese corpus
+
+        Returns:
+            bool: True si se cargó el archivo
+        """
+        if self.corpus_fingerprint is not None or self.fingerprints:
+            return False
+
+        self.profiles = _ColumnarProfiles(columnar, self.codec)
+        # Las consultas se traducen al vocabulario común antes de reconstruir
+        # ningún perfil: sus palabras deben conocerse desde el principio
+        columnar.translate(self.codec)
+        self.fingerprints = dict(zip(columnar.keys, columnar.fingerprints))
+        self._index = None
+        self._matrix = None
+        self._order = None
+        self._columnar = columnar
+        self._base = columnar
+
+        if columnar.corpus_fingerprint == corpus.fingerprint:
+            entries = list(corpus)
+            if [entry.id for entry in entries] == columnar.keys:
+                self.entries = entries
+                self.positions = {entry.id: position for position, entry in enumerate(entries)}
+                self.corpus_fingerprint = columnar.corpus_fingerprint
+        return True
+
+    def sync(self, corpus: Corpus, store: ProfileStore) -> bool:
+        """
+        Aplica los cambios del corpus desde la última sincronización.
+
+        Args:
+            corpus (Corpus): Corpus de referencia
+            store (ProfileStore): Almacén del que se obtienen los perfiles
+
+        Returns:
+            bool: True si el corpus había cambiado
+        """
+        fingerprint = corpus.fingerprint
+        if fingerprint == self.corpus_fingerprint:
+            return False
+
+        entries = list(corpus)
+        positions = {}
+        for position, entry in enumerate(entries):
+            if entry.id in positions:
+                raise ValueError(f"Identificador duplicado en el corpus: {entry.id!r}")
+            positions[entry.id] = position
+
+        for key in [key for key in self.fingerprints if key not in positions]:
+            self.profiles.pop(key, None)
+            self.retired.add(self.fingerprints.pop(key))
+            if self._index is not None:
+                self._index.remove(key)
+            if self._matrix is not None:
+                self._matrix.remove(key)
+            self._columnar = None
+
+        for entry in entries:
+            entry_fingerprint = entry.fingerprint
+            previous = self.fingerprints.get(entry.id)
+            if previous == entry_fingerprint:
+                continue
+            if previous is not None:
+                self.retired.add(previous)
+            profile = store.get_profile(entry)
+            self.profiles[entry.id] = profile
+            self.fingerprints[entry.id] = entry_fingerprint
+            if self._index is not None:
+                self._index.add(entry.id, profile)
+            if self._matrix is not None:
+                self._matrix.add(entry.id, profile)
+            self._columnar = None
+        store.save()
+        self.retired.difference_update(self.fingerprints.values())
+
+        self.entries = entries
+        self.positions = positions
+        self.corpus_fingerprint = fingerprint
+        self._order = None
+        return True
+
+    def decode(self, keys: Iterable[Hashable]):
+        """Reconstruye en bloque los perfiles de un archivo columnar que se van a usar."""
+        if isinstance(self.profiles, _ColumnarProfiles):
+            self.profiles.decode(keys)
+
+    def profile_list(self) -> List[CompactProfile]:
+        """Vectores de rasgos en el orden del corpus."""
+        self.decode(entry.id for entry in self.entries)
+        return [self.profiles[entry.id] for entry in self.entries]
+
+    def matrix(self) -> 'FeatureMatrix':
+        """Matriz de rasgos de las referencias; se construye al primer uso."""
+        if self._matrix is None and self._columnar is not None:
+            self._matrix = self._columnar.feature_matrix()
+        elif self._matrix is None:
+            from vectorized import FeatureMatrix
+
+            self._matrix = FeatureMatrix(
+                self.profile_list(), vocabulary=self.codec.vocabulary,
+                keys=[entry.id for entry in self.entries]
+            )
+        return self._matrix
+
+    def order(self) -> 'np.ndarray':
+        """Fila de la matriz correspondiente a cada entrada, en el orden del corpus."""
+        if self._order is None:
+            import numpy as np
+
+            rows = self.matrix().rows
+            self._order = np.array([rows[entry.id] for entry in self.entries], dtype=np.int64)
+        return self._order
+
+    def compact(self):
+        """Elimina de la matriz las filas de referencias dadas de baja."""
+        if self._matrix is not None and self._matrix.removed:
+            self._matrix.compact()
+            self._order = None
@@ -0,0 +1,365 @@
+# server.py
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from analyzer import DETAIL_LEVELS, TextStyleAnalyzer
+from corpus import open_corpus
+from workers import create_analyzer, init_worker, worker_analyzer
+
+# Tamaño máximo del cuerpo de una petición
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Ruta de las entradas del corpus: POST para añadir, PUT y DELETE en /<id>
+AUTHORS_PATH = '/corpus/authors'
+
+_worker_corpus_version: Optional[int] = None
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convierte resultados del analizador (conjuntos, tuplas, tipos de NumPy) a JSON."""
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, set):
+        return sorted(to_jsonable(item) for item in value)
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _load_worker(corpus_path: Optional[str], corpus_version: int,
+                 features_path: Optional[str] = None, cache_dir: Optional[str] = None):
+    """Crea el analizador del proceso y deja listos los perfiles de referencia."""
+    global _worker_corpus_version
+    init_worker(corpus_path, features_path, cache_dir, cache=True)
+    _worker_corpus_version = corpus_version
+
+
+def _worker_analyzer_for(corpus_path: Optional[str], corpus_version: int) -> TextStyleAnalyzer:
+    """Devuelve el analizador del proceso, aplicando los cambios del corpus si los hubo."""
+    global _worker_corpus_version
+    if worker_analyzer() is None:
+        _load_worker(corpus_path, corpus_version)
+    elif _worker_corpus_version != corpus_version:
+        # El corpus relee su manifiesto y los perfiles nuevos vienen del almacén compartido
+        worker_analyzer().load_references()
+        _worker_corpus_version = corpus_version
+    return worker_analyzer()
+
+
+def _analyze_task(text: str, corpus_path: Optional[str], corpus_version: int) -> Dict:
+    analyzer = _worker_analyzer_for(corpus_path, corpus_version)
+    return to_jsonable(analyzer.analyze_text(text))
+
+
+def _match_task(text: str, min_similarity: float, corpus_path: Optional[str],
+                corpus_version: int, top_k: Optional[int] = None, detail: str = 'full') -> Dict:
+    analyzer = _worker_analyzer_for(corpus_path, corpus_version)
+    return to_jsonable(analyzer.analyze_against_database(text, min_similarity=min_similarity,
+                                                         top_k=top_k, detail=detail))
+
+
+class ScoringService:
+    """
+    Servicio de análisis con analizadores precargados en un grupo de procesos.
+
+    Cada proceso carga el analizador y los perfiles de referencia una sola vez.
+    Cada cambio del corpus se aplica aquí, calculando solo los perfiles
+    afectados, e incrementa su versión; cada proceso aplica los mismos cambios
+    de forma incremental en su siguiente tarea. El corpus incorporado es de
+    solo lectura.
+    """
+
+    def __init__(self, corpus_path: Optional[str] = None, workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            corpus_path (Optional[str]): Directorio del corpus; por defecto el incorporado
+            workers (Optional[int]): Número de procesos; por defecto uno por núcleo
+            cache_dir (Optional[str]): Directorio de la caché de resultados compartida
+                por los procesos; sin él, cada proceso solo tiene su caché en memoria
+        """
+        self.corpus_path = corpus_path
+        self.corpus_version = 0
+        self._lock = threading.Lock()
+
+        # Los perfiles se calculan aquí una vez y se exportan en formato columnar;
+        # los procesos proyectan ese archivo en memoria y comparten sus páginas
+        self.features_path = tempfile.mkdtemp(prefix='features-')
+        self.analyzer = create_analyzer(corpus_path, self.features_path)
+        self.analyzer.export_features()
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            initializer=_load_worker,
+            initargs=(corpus_path, self.corpus_version, self.features_path, cache_dir)
+        )
+
+    def analyze(self, text: str) -> Dict:
+        """Ejecuta analyze_text en el grupo de procesos."""
+        return self.executor.submit(
+            _analyze_task, text, self.corpus_path, self.corpus_version
+        ).result()
+
+    def match(self, text: str, min_similarity: float, top_k: Optional[int] = None,
+              detail: str = 'full') -> Dict:
+        """Ejecuta analyze_against_database en el grupo de procesos."""
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"Nivel de detalle desconocido: {detail!r}")
+        return self.executor.submit(
+            _match_task, text, min_similarity, self.corpus_path, self.corpus_version,
+            top_k, detail
+        ).result()
+
+    def list_corpus(self) -> Dict:
+        """Devuelve la versión y las entradas del corpus actual."""
+        with self._lock:
+            entries = list(self.analyzer.corpus)
+        return {
+            'version': self.corpus_version,
+            'entries': [{'id': entry.id, 'autor': entry.autor} for entry in entries]
+        }
+
+    def _modify_corpus(self, change, *args):
+        """Aplica un cambio al corpus en disco y publica una versión nueva."""
+        if self.corpus_path is None:
+            raise ValueError("El corpus incorporado es de solo lectura")
+        with self._lock:
+            result = change(*args)
+            self.analyzer.load_references()
+            self.corpus_version += 1
+        return result
+
+    def add_author(self, autor: str, texto: str, entry_id=None) -> Dict:
+        """Añade un texto de referencia y devuelve su identificador."""
+        entry_id = self._modify_corpus(self.analyzer.corpus.add_author, autor, texto, entry_id)
+        return {'id': entry_id, 'version': self.corpus_version}
+
+    def update_author(self, entry_id, texto: Optional[str] = None,
+                      autor: Optional[str] = None) -> Dict:
+        """Sustituye el texto o el autor de una entrada."""
+        self._modify_corpus(self.analyzer.corpus.update, entry_id, texto, autor)
+        return {'id': entry_id, 'version': self.corpus_version}
+
+    def remove_author(self, entry_id) -> Dict:
+        """Elimina una entrada del corpus."""
+        self._modify_corpus(self.analyzer.corpus.remove, entry_id)
+        return {'id': entry_id, 'version': self.corpus_version}
+
+    def compact_corpus(self) -> Dict:
+        """Compacta el manifiesto, los textos huérfanos y el almacén de perfiles."""
+        self._modify_corpus(self._compact)
+        return {'version': self.corpus_version}
+
+    def _compact(self):
+        self.analyzer.compact_references()
+        self.analyzer.export_features()
+
+    def reload_corpus(self) -> Dict:
+        """Vuelve a abrir el corpus, calcula los perfiles nuevos y publica una versión nueva."""
+        with self._lock:
+            self.analyzer.corpus = open_corpus(self.corpus_path)
+            self.analyzer.export_features()
+            self.corpus_version += 1
+        return self.list_corpus()
+
+    def shutdown(self):
+        self.executor.shutdown()
+        shutil.rmtree(self.features_path, ignore_errors=True)
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP con cuerpos y respuestas en JSON."""
+
+    service: ScoringService = None
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Tuple[Optional[Dict], Optional[str]]:
+        # Sin una longitud válida, leer el cuerpo bloquearía hasta que el cliente cierre
+        try:
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            length = -1
+        if length < 0:
+            return None, "Falta una cabecera Content-Length válida"
+        if length > MAX_BODY_BYTES:
+            return None, "El cuerpo de la petición es demasiado grande"
+        try:
+            data = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+        except (UnicodeDecodeError, ValueError):
+            return None, "El cuerpo de la petición no es JSON válido"
+        if not isinstance(data, dict):
+            return None, "El cuerpo de la petición debe ser un objeto JSON"
+        return data, None
+
+    def _author_id(self):
+        """Identificador de la ruta /corpus/authors/<id>; los numéricos se tratan como enteros."""
+        entry_id = unquote(self.path[len(AUTHORS_PATH) + 1:])
+        return int(entry_id) if entry_id.isdigit() else entry_id
+
+    def _is_author_path(self) -> bool:
+        return self.path.startswith(AUTHORS_PATH + '/') and len(self.path) > len(AUTHORS_PATH) + 1
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'corpus_version': self.service.corpus_version})
+        elif self.path == '/corpus':
+            self._send_json(200, self.service.list_corpus())
+        else:
+            self._send_json(404, {'error': f"Ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ('/analyze', '/match', '/corpus/reload', '/corpus/compact', AUTHORS_PATH):
+            self._send_json(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+
+        data, error = self._read_json()
+        if error:
+            self._send_json(400, {'error': error})
+            return
+
+        try:
+            if self.path == '/corpus/reload':
+                self._send_json(200, self.service.reload_corpus())
+                return
+            if self.path == '/corpus/compact':
+                self._send_json(200, self.service.compact_corpus())
+                return
+            if self.path == AUTHORS_PATH:
+                autor, text = data.get('autor'), data.get('texto')
+                if not isinstance(autor, str) or not isinstance(text, str):
+                    self._send_json(400, {'error': "Faltan los campos 'autor' y 'texto'"})
+                    return
+                entry_id = data.get('id')
+                if entry_id is not None and (isinstance(entry_id, bool) or
+                                             not isinstance(entry_id, (int, str))):
+                    self._send_json(400, {'error': "El campo 'id' debe ser un entero o una cadena"})
+                    return
+                self._send_json(201, self.service.add_author(autor, text, entry_id))
+                return
+
+            text = data.get('texto')
+            if not isinstance(text, str):
+                self._send_json(400, {'error': "Falta el campo 'texto'"})
+                return
+
+            if self.path == '/analyze':
+                self._send_json(200, self.service.analyze(text))
+            else:
+                min_similarity = float(data.get('min_similarity', 70.0))
+                min_similarity = max(0, min(100, min_similarity))
+                top_k = data.get('top_k')
+                if top_k is not None:
+                    top_k = max(0, int(top_k))
+                detail = data.get('detail', 'full')
+                self._send_json(200, {
+                    'coincidencias': self.service.match(text, min_similarity, top_k, detail)
+                })
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': f"Error interno: {e}"})
+
+    def do_PUT(self):
+        if not self._is_author_path():
+            self._send_json(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+
+        data, error = self._read_json()
+        if error:
+            self._send_json(400, {'error': error})
+            return
+
+        autor, text = data.get('autor'), data.get('texto')
+        if (autor is None and text is None) or not all(
+                value is None or isinstance(value, str) for value in (autor, text)):
+            self._send_json(400, {'error': "Se espera 'autor' o 'texto'"})
+            return
+        self._modify_author(self.service.update_author, text, autor)
+
+    def do_DELETE(self):
+        if not self._is_author_path():
+            self._send_json(404, {'error': f"Ruta desconocida: {self.path}"})
+            return
+        self._modify_author(self.service.remove_author)
+
+    def _modify_author(self, change, *args):
+        try:
+            self._send_json(200, change(self._author_id(), *args))
+        except KeyError as e:
+            self._send_json(404, {'error': e.args[0] if e.args else str(e)})
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': f"Error interno: {e}"})
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8000,
+                  service: Optional[ScoringService] = None) -> ThreadingHTTPServer:
+    """
+    Crea el servidor HTTP del servicio de análisis.
+
+    Args:
+        host (str): Dirección en la que escuchar
+        port (int): Puerto en el que escuchar
+        service (Optional[ScoringService]): Servicio a exponer; por defecto uno nuevo
+
+    Returns:
+        ThreadingHTTPServer: Servidor listo para serve_forever
+    """
+    handler = type('Handler', (ScoringRequestHandler,), {'service': service or ScoringService()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP del analizador de estilo")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección [por defecto: 127.0.0.1]")
+    parser.add_argument('--port', type=int, default=8000, help="Puerto [por defecto: 8000]")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Número de procesos [por defecto: uno por núcleo]")
+    parser.add_argument('--corpus', default=None,
+                        help="Directorio del corpus de referencia [por defecto: el incorporado]")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Directorio de confianza para la caché de resultados en disco, "
+                             "compartida por los procesos [por defecto: solo en memoria]")
+    args = parser.parse_args()
+
+    service = ScoringService(args.corpus, args.workers, args.cache_dir)
+    server = create_server(args.host, args.port, service)
+    print(f"Servicio escuchando en http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# streaming.py
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from tokenizer import tokenize
+
+# Tamaño de bloque (en caracteres) al leer archivos
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Último espacio en blanco del búfer: lo que sigue puede ser una palabra a medias
+_LAST_WHITESPACE = re.compile(r'\s(?=\S*\Z)')
+
+
+class StreamingFeatureExtractor:
+    """
+    Extrae los rasgos de un texto recibido por bloques sin guardarlo entero.
+
+    Cada bloque se corta en su último espacio en blanco y el resto se arrastra
+    al siguiente, así que ninguna palabra queda partida. Las oraciones pueden
+    cruzar bloques: se acumula el número de palabras de la oración en curso.
+    La memoria usada depende del tamaño de bloque y del vocabulario, no del
+    tamaño del texto.
+    """
+
+    def __init__(self, analyzer, max_examples: int = 5):
+        """
+        Args:
+            analyzer (TextStyleAnalyzer): Analizador con la configuración a usar
+            max_examples (int): Ejemplos de errores a conservar por categoría
+        """
+        self.analyzer = analyzer
+        self.max_examples = max_examples
+        self._pending = ''
+
+        # Estadísticas básicas sobre el texto original
+        self._word_count = 0
+        self._sentence_count = 0
+
+        # Palabras de la oración en curso (texto preprocesado, texto original)
+        self._carry = (0, 0)
+
+        # Longitudes de oración (texto preprocesado), media y varianza de Welford
+        self._sentences = 0
+        self._sentence_total = 0
+        self._sentence_mean = 0.0
+        self._sentence_m2 = 0.0
+        self._sentence_max = 0
+        self._sentence_min = 0
+
+        # Frecuencia de palabras (texto preprocesado, sin palabras vacías)
+        self._word_freq = Counter()
+        self._content_words = 0
+        self._content_chars = 0
+
+        categories = analyzer.spelling_analyzer.common_patterns.keys()
+        self._spelling_examples = {category: [] for category in categories}
+        self._spelling_present = {category: False for category in categories}
+
+    def feed(self, chunk: str):
+        """
+        Procesa un bloque de texto.
+
+        Args:
+            chunk (str): Siguiente fragmento del texto
+        """
+        buffer = self._pending + chunk
+        match = _LAST_WHITESPACE.search(buffer)
+        if match is None:
+            self._pending = buffer
+            return
+
+        self._pending = buffer[match.end():]
+        self._process(buffer[:match.end()])
+
+    def finish(self) -> Dict:
+        """
+        Procesa el resto pendiente y devuelve los rasgos del texto completo.
+
+        Returns:
+            Dict: 'basic_stats' como en analyze_text, 'features' como en
+                extract_features y 'spelling_examples' con ejemplos por categoría
+        """
+        if self._pending:
+            self._process(self._pending)
+            self._pending = ''
+
+        current, raw_current = self._carry
+        if raw_current:
+            self._sentence_count += 1
+        if current:
+            self._add_sentence(current)
+        self._carry = (0, 0)
+
+        sentences = self._sentences
+        words = self._content_words
+
+        features = {
+            'avg_sentence_length': self._sentence_total / sentences if sentences else 0,
+            'std_sentence_length': math.sqrt(self._sentence_m2 / sentences) if sentences else 0,
+            'max_sentence_length': self._sentence_max,
+            'min_sentence_length': self._sentence_min,
+            'unique_words_ratio': len(self._word_freq) / words if words else 0,
+            'avg_word_length': self._content_chars / words if words else 0,
+            'common_words': set(dict(self._word_freq.most_common(10)).keys()),
+            'spelling_categories': dict(self._spelling_present)
+        }
+
+        return {
+            'basic_stats': {
+                'word_count': self._word_count,
+                'sentence_count': self._sentence_count,
+                'avg_words_per_sentence': (self._word_count / self._sentence_count
+                                           if self._sentence_count > 0 else 0)
+            },
+            'features': features,
+            'spelling_examples': self._spelling_examples
+        }
+
+    def _process(self, segment: str):
+        """Procesa un fragmento que termina en un límite de palabra."""
+        record = tokenize(self.analyzer, segment, carry=self._carry)
+        self._carry = record.carry
+
+        self._word_count += record.word_count
+        self._sentence_count += len(record.raw_sentence_lengths)
+        for length in record.sentence_lengths:
+            self._add_sentence(length)
+
+        # Patrones ortográficos
+        for category, errors in record.spelling_patterns.items():
+            if errors:
+                self._spelling_present[category] = True
+                examples = self._spelling_examples[category]
+                if len(examples) < self.max_examples:
+                    examples.extend(errors[:self.max_examples - len(examples)])
+
+        # Frecuencia de palabras
+        self._word_freq.update(record.word_freq)
+        self._content_words += record.content_words
+        self._content_chars += record.content_chars
+
+    def _add_sentence(self, length: int):
+        """Añade una oración cerrada a las estadísticas."""
+        self._sentences += 1
+        self._sentence_total += length
+        delta = length - self._sentence_mean
+        self._sentence_mean += delta / self._sentences
+        self._sentence_m2 += delta * (length - self._sentence_mean)
+
+        if self._sentences == 1:
+            self._sentence_max = self._sentence_min = length
+        else:
+            self._sentence_max = max(self._sentence_max, length)
+            self._sentence_min = min(self._sentence_min, length)
+
+
+def extract_stream_features(analyzer, chunks: Iterable[str], max_examples: int = 5) -> Dict:
+    """
+    Extrae los rasgos de un texto entregado como secuencia de bloques.
+
+    Args:
+        analyzer (TextStyleAnalyzer): Analizador con la configuración a usar
+        chunks (Iterable[str]): Bloques del texto
+        max_examples (int): Ejemplos de errores a conservar por categoría
+
+    Returns:
+        Dict: Resultado de StreamingFeatureExtractor.finish
+    """
+    extractor = StreamingFeatureExtractor(analyzer, max_examples)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.finish()
+
+
+def read_chunks(path: str, chunk_size: Optional[int] = None) -> Iterable[str]:
+    """
+    Lee un archivo de texto UTF-8 por bloques.
+
+    Args:
+        path (str): Ruta del archivo
+        chunk_size (Optional[int]): Caracteres por bloque
+
+    Returns:
+        Iterable[str]: Bloques del archivo
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    with open(path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,77 @@
+# tests/conftest.py
+import os
+import random
+import sys
+from typing import Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import TextStyleAnalyzer  # noqa: E402
+
+# Vocabulario pequeño: los textos comparten palabras, de modo que abundan los
+# empates en las palabras comunes y en los scores. Incluye palabras que
+# activan los patrones ortográficos.
+VOCABULARY = (
+    'casa perro gato sol luna mar rio monte libro mesa silla puerta camino '
+    'biene vien haber asta llave yave cielo cena zapato sapo general jente '
+    'hombre ombre gracias grasias caballo cavallo verde rojo azul'
+).split()
+
+
+def make_text(rng: random.Random, sentences: int = 4) -> str:
+    """Texto corto con oraciones de longitud variable sobre VOCABULARY."""
+    return ' '.join(
+        ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 9))) + '.'
+        for _ in range(sentences)
+    )
+
+
+def make_samples(count: int, authors: int = 0, seed: int = 0) -> List[Dict]:
+    """
+    Textos de referencia con el formato de database.sample_texts.
+
+    Args:
+        count (int): Número de textos
+        authors (int): Autores entre los que se reparten; 0 para uno por texto
+        seed (int): Semilla
+
+    Returns:
+        List[Dict]: Entradas con 'id', 'autor' y 'texto'
+    """
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        autor = f'Autor{i % authors}' if authors else f'Autor{i}'
+        samples.append({'id': i + 1, 'autor': autor,
+                        'texto': make_text(rng, rng.randint(1, 6))})
+    # Textos repetidos: referencias con el mismo score exacto
+    for i in range(0, count, 7):
+        samples[i]['texto'] = samples[0]['texto']
+    return samples
+
+
+def brute_force_matches(analyzer: TextStyleAnalyzer, text: str, samples: List[Dict],
+                        min_similarity: float = 0.0) -> List[Dict]:
+    """
+    Búsqueda de referencia: compare_features contra cada texto, sin almacén,
+    índice ni perfiles compactos, con el orden de la implementación original.
+    """
+    input_features = analyzer.extract_features(text)
+    matches = []
+    for sample in samples:
+        score, details = analyzer.compare_features(
+            input_features, analyzer.extract_features(sample['texto'])
+        )
+        if score * 100 >= min_similarity:
+            matches.append({'id': sample['id'], 'autor': sample['autor'],
+                            'similitud': score * 100, 'detalles': details})
+    matches.sort(key=lambda match: match['similitud'], reverse=True)
+    return matches
+
+
+@pytest.fixture
+def analyzer() -> TextStyleAnalyzer:
+    """Analizador sin almacén de perfiles en disco."""
+    return TextStyleAnalyzer(profile_store_path=None)
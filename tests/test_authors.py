@@ -0,0 +1,71 @@
+# tests/test_authors.py
+import random
+
+from authors import AuthorSet
+from conftest import make_samples, make_text
+from corpus import BuiltinCorpus
+
+
+def assert_same_profiles(incremental: AuthorSet, rebuilt: AuthorSet):
+    assert [p.autor for p in incremental.author_profiles()] == \
+        [p.autor for p in rebuilt.author_profiles()]
+    for profile, expected in zip(incremental.author_profiles(), rebuilt.author_profiles()):
+        assert profile.features() == expected.features()
+        # El orden de aparición decide los empates de las palabras comunes
+        assert list(profile.word_counts) == list(expected.word_counts)
+        assert profile.samples == expected.samples
+
+
+def test_sync_matches_rebuild_after_changes(analyzer):
+    rng = random.Random(1)
+    corpus = BuiltinCorpus(make_samples(30, authors=5, seed=1))
+    incremental = AuthorSet(analyzer)
+    incremental.sync(corpus)
+
+    for step in range(40):
+        ids = [entry.id for entry in corpus]
+        operation = step % 4
+        if operation == 0:
+            corpus.add_author(f'Autor{rng.randrange(6)}', make_text(rng))
+        elif operation == 1:
+            corpus.update(rng.choice(ids), autor=f'Autor{rng.randrange(6)}')
+        elif operation == 2:
+            corpus.update(rng.choice(ids), texto=make_text(rng))
+        else:
+            corpus.remove(rng.choice(ids))
+
+        incremental.sync(corpus)
+        rebuilt = AuthorSet(analyzer)
+        rebuilt.sync(corpus)
+        assert_same_profiles(incremental, rebuilt)
+
+
+def test_sample_moved_to_existing_author(analyzer):
+    words = ('alfa beta gama delta epsilon zeta eta theta iota kappa lambda '
+             'mu nu xi omicron pi rho').split()
+    corpus = BuiltinCorpus([
+        {'id': 1, 'autor': 'A', 'texto': ' '.join(words[:8]) + '. ' + ' '.join(words[:3]) + '.'},
+        {'id': 2, 'autor': 'B', 'texto': ' '.join(words[8:]) + '. corto.'},
+        {'id': 3, 'autor': 'B', 'texto': ' '.join(words[4:14]) + '. otra frase mas.'},
+    ])
+    incremental = AuthorSet(analyzer)
+    incremental.sync(corpus)
+
+    corpus.update(1, autor='B')
+    incremental.sync(corpus)
+    rebuilt = AuthorSet(analyzer)
+    rebuilt.sync(corpus)
+    assert_same_profiles(incremental, rebuilt)
+
+    text = ' '.join(words[:10]) + '.'
+    assert analyzer.analyze_against_authors(text, 0, corpus=corpus) == \
+        analyzer.analyze_against_authors(text, 0, corpus=BuiltinCorpus(list(corpus.samples)))
+
+
+def test_single_sample_author_matches_database_score(analyzer):
+    corpus = BuiltinCorpus(make_samples(10, seed=2))
+    text = make_text(random.Random(3))
+    by_text = {match['autor']: match['similitud']
+               for match in analyzer.analyze_against_database(text, 0, corpus=corpus)}
+    for match in analyzer.analyze_against_authors(text, 0, corpus=corpus):
+        assert match['similitud'] == by_text[match['autor']]
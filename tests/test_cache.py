@@ -0,0 +1,91 @@
+# tests/test_cache.py
+import json
+import os
+import pickle
+import random
+
+from analyzer import TextStyleAnalyzer
+from batch import run_batch
+from cache import ResultCache
+from conftest import make_samples, make_text
+from corpus import BuiltinCorpus
+
+
+def write_document(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_file_results_cached_by_content(tmp_path):
+    corpus = BuiltinCorpus(make_samples(20, seed=9))
+    text = make_text(random.Random(10), 8)
+    first = write_document(tmp_path / 'a.txt', text)
+    copy = write_document(tmp_path / 'b.txt', text)
+
+    expected = TextStyleAnalyzer(profile_store_path=None, corpus=corpus) \
+        .analyze_file_against_database(first, 0)
+
+    cache = ResultCache(directory=str(tmp_path / 'cache'))
+    analyzer = TextStyleAnalyzer(profile_store_path=None, corpus=corpus, cache=cache)
+    assert analyzer.analyze_file_against_database(first, 0) == expected
+    assert analyzer.analyze_file_against_database(copy, 0) == expected
+    assert cache.hits == 1
+
+    # Otro proceso con el mismo directorio reutiliza el nivel en disco
+    other_cache = ResultCache(directory=str(tmp_path / 'cache'))
+    other = TextStyleAnalyzer(profile_store_path=None, corpus=corpus, cache=other_cache)
+    assert other.analyze_file_against_database(copy, 0) == expected
+    assert other_cache.hits == 1 and other_cache.misses == 0
+
+    # Un contenido distinto no reutiliza la entrada
+    write_document(tmp_path / 'b.txt', text + ' otra frase.')
+    other.analyze_file_against_database(copy, 0)
+    assert other_cache.misses > 0
+
+
+def test_batch_reuses_disk_cache(tmp_path):
+    inputs = tmp_path / 'docs'
+    inputs.mkdir()
+    rng = random.Random(11)
+    for i in range(4):
+        write_document(inputs / f'doc{i}.txt', make_text(rng, 6))
+
+    outputs = []
+    for run in range(2):
+        output = str(tmp_path / f'salida{run}.jsonl')
+        run_batch([str(inputs)], min_similarity=0, workers=1, output=output,
+                  timings=True, cache_dir=str(tmp_path / 'cache'))
+        with open(output, 'r', encoding='utf-8') as f:
+            outputs.append([json.loads(line) for line in f])
+
+    first, second = outputs
+    assert [r['coincidencias'] for r in first] == [r['coincidencias'] for r in second]
+    # En la segunda ejecución ningún documento pasa por el tokenizador
+    assert all('tokenize' in r['metricas']['calls'] for r in first)
+    assert not any('tokenize' in r['metricas']['calls'] for r in second)
+
+
+def test_disk_eviction_uses_the_index(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'cache')
+    value = {'similitud': 1.0, 'relleno': 'x' * 1000}
+    entry_size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(max_entries=1, directory=directory, max_disk_bytes=50 * entry_size)
+
+    scans = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir', lambda path: scans.append(path) or listdir(path))
+    for i in range(500):
+        cache.put(f'clave{i}', value)
+        # La primera entrada se sigue usando: no debe desalojarse
+        assert cache.get('clave0') == value
+
+    files = [name for name in listdir(directory) if name.endswith('.pkl')]
+    assert sum(os.path.getsize(os.path.join(directory, name)) for name in files) \
+        <= 50 * entry_size
+    assert 'clave0.pkl' in files and 'clave499.pkl' in files
+    # Sin recorrer el directorio en cada escritura
+    assert len(scans) <= 500 // 40
+
+    # Otro proceso con el mismo directorio parte del mismo índice
+    other = ResultCache(directory=directory, max_disk_bytes=50 * entry_size)
+    assert other.get('clave499') == value and other._disk_bytes == cache._disk_bytes
@@ -0,0 +1,99 @@
+# tests/test_columnar.py
+import os
+import random
+
+import pytest
+
+from analyzer import TextStyleAnalyzer
+from conftest import brute_force_matches, make_samples, make_text
+from corpus import BuiltinCorpus
+
+pytest.importorskip('numpy')
+
+
+def current_samples(corpus):
+    return [{'id': entry.id, 'autor': entry.autor, 'texto': entry.read_text()}
+            for entry in corpus]
+
+
+@pytest.fixture
+def exported(tmp_path):
+    samples = make_samples(60, seed=12)
+    path = str(tmp_path / 'features')
+    TextStyleAnalyzer(profile_store_path=str(tmp_path / 'profiles.jsonl'),
+                      corpus=BuiltinCorpus(samples)).export_features(path)
+    return samples, path
+
+
+def test_startup_decodes_no_profiles(exported, tmp_path):
+    samples, path = exported
+    analyzer = TextStyleAnalyzer(profile_store_path=str(tmp_path / 'profiles.jsonl'),
+                                 corpus=BuiltinCorpus(samples), features_path=path)
+    assert analyzer.load_references() == len(samples)
+
+    references = analyzer._references[analyzer.corpus]
+    assert len(references.profiles) == 0
+    # El almacén de perfiles no llega a leerse
+    assert analyzer.profile_store._inode is None
+
+    # Solo se reconstruyen los candidatos que superan la cota
+    text = make_text(random.Random(13))
+    assert analyzer.analyze_against_database(text, 70, detail='scores') == \
+        brute_force_matches(analyzer, text, samples, 70)
+    assert len(references.profiles) < len(samples)
+
+
+def test_matches_brute_force_after_corpus_changes(exported, tmp_path):
+    samples, path = exported
+    corpus = BuiltinCorpus(samples)
+    corpus.add_author('Nuevo', make_text(random.Random(14)))
+    corpus.update(2, texto=make_text(random.Random(15)))
+    corpus.update(3, autor='Renombrado')
+    corpus.remove(5)
+
+    analyzer = TextStyleAnalyzer(profile_store_path=str(tmp_path / 'profiles.jsonl'),
+                                 corpus=corpus, features_path=path)
+    rng = random.Random(16)
+    for _ in range(5):
+        text = make_text(rng)
+        expected = brute_force_matches(analyzer, text, current_samples(corpus))
+        for min_similarity in (0, 60, 80):
+            assert analyzer.analyze_against_database(text, min_similarity, detail='scores') == \
+                [match for match in expected if match['similitud'] >= min_similarity]
+        assert analyzer.analyze_against_database(text, 0, top_k=5, detail='scores') == \
+            expected[:5]
+
+    # Un texto de referencia da su propio score como umbral exacto
+    text = samples[0]['texto']
+    expected = brute_force_matches(analyzer, text, current_samples(corpus))
+    threshold = expected[0]['similitud']
+    assert analyzer.analyze_against_database(text, threshold, detail='scores') == \
+        [match for match in expected if match['similitud'] >= threshold]
+
+
+def test_reader_never_mixes_exports(tmp_path):
+    from columnar import ColumnarFeatures
+
+    path = str(tmp_path / 'features')
+    store_path = str(tmp_path / 'profiles.jsonl')
+    first = BuiltinCorpus(make_samples(20, seed=17))
+    second = BuiltinCorpus(make_samples(20, seed=18))
+    TextStyleAnalyzer(profile_store_path=store_path, corpus=first).export_features(path)
+    with open(tmp_path / 'features' / 'meta.json', 'rb') as f:
+        first_meta = f.read()
+
+    # Misma cantidad de filas: los tamaños de los archivos no cambian
+    TextStyleAnalyzer(profile_store_path=store_path, corpus=second).export_features(path)
+    columnar = ColumnarFeatures(path)
+    assert columnar.fingerprints == [entry.fingerprint for entry in second]
+    assert len(os.listdir(path)) == 5
+
+    # Unos metadatos de la exportación anterior no se emparejan con los datos nuevos
+    with open(tmp_path / 'features' / 'meta.json', 'wb') as f:
+        f.write(first_meta)
+    with pytest.raises(OSError):
+        ColumnarFeatures(path)
+    analyzer = TextStyleAnalyzer(profile_store_path=store_path, corpus=first, features_path=path)
+    text = make_text(random.Random(19))
+    assert analyzer.analyze_against_database(text, 0, detail='scores') == \
+        brute_force_matches(analyzer, text, current_samples(first))
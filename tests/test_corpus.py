@@ -0,0 +1,108 @@
+# tests/test_corpus.py
+import json
+import random
+
+import pytest
+
+from analyzer import TextStyleAnalyzer
+from conftest import brute_force_matches, make_samples, make_text
+from corpus import BuiltinCorpus, Corpus, DirectoryCorpus
+
+
+def test_incomplete_corpus_fails_on_instantiation():
+    class ReadOnlyCorpus(Corpus):
+        def __iter__(self):
+            return iter(())
+
+        @property
+        def fingerprint(self):
+            return ''
+
+    with pytest.raises(TypeError):
+        ReadOnlyCorpus()
+
+
+def apply_changes(corpus: Corpus, rng: random.Random, steps: int):
+    for step in range(steps):
+        ids = [entry.id for entry in corpus]
+        operation = step % 4
+        if operation == 0:
+            corpus.add_author(f'Nuevo{step}', make_text(rng))
+        elif operation == 1:
+            corpus.update(rng.choice(ids), texto=make_text(rng))
+        elif operation == 2:
+            corpus.update(rng.choice(ids), autor=f'Renombrado{step}')
+        else:
+            corpus.remove(rng.choice(ids))
+        yield step
+
+
+@pytest.mark.parametrize('directory', [False, True])
+def test_incremental_sync_matches_brute_force(analyzer, tmp_path, directory):
+    samples = make_samples(40, seed=5)
+    corpus = (DirectoryCorpus.create(str(tmp_path / 'corpus'), samples) if directory
+              else BuiltinCorpus(samples))
+    rng = random.Random(6)
+    text = make_text(rng)
+
+    for step in apply_changes(corpus, rng, 24):
+        if step % 3 == 0:
+            # Índice, matriz y perfiles se actualizan en lugar de reconstruirse
+            analyzer.score_many(text, corpus=corpus)
+        current = [{'id': entry.id, 'autor': entry.autor, 'texto': entry.read_text()}
+                   for entry in corpus]
+        for min_similarity in (0, 60):
+            assert analyzer.analyze_against_database(
+                text, min_similarity, corpus=corpus, detail='scores'
+            ) == brute_force_matches(analyzer, text, current, min_similarity)
+
+    analyzer.compact_references(corpus)
+    assert analyzer.analyze_against_database(text, 0, corpus=corpus, detail='scores') == \
+        brute_force_matches(analyzer, text, current)
+
+
+def stored_fingerprints(path: str) -> set:
+    with open(path, 'r', encoding='utf-8') as f:
+        next(f)
+        return {json.loads(line)['fingerprint'] for line in f}
+
+
+def test_compaction_keeps_profiles_of_other_corpora(tmp_path):
+    store_path = str(tmp_path / 'profiles.jsonl')
+    first = BuiltinCorpus(make_samples(10, seed=7))
+    second = BuiltinCorpus(make_samples(10, seed=8))
+
+    other = TextStyleAnalyzer(profile_store_path=store_path, corpus=second)
+    other.prepare_references()
+
+    analyzer = TextStyleAnalyzer(profile_store_path=store_path, corpus=first)
+    analyzer.prepare_references()
+    # Texto que no se repite en el corpus
+    removed = list(first)[1]
+    first.remove(removed.id)
+    analyzer.compact_references()
+
+    stored = stored_fingerprints(store_path)
+    assert {entry.fingerprint for entry in second} <= stored
+    assert {entry.fingerprint for entry in first} <= stored
+    assert removed.fingerprint not in stored
+
+    analyzer.compact_references(exclusive=True)
+    assert stored_fingerprints(store_path) == {entry.fingerprint for entry in first}
+
+
+def test_hostile_id_cannot_write_outside_texts(tmp_path):
+    root = tmp_path / 'a' / 'b'
+    corpus = DirectoryCorpus.create(str(root / 'corpus'), make_samples(3, seed=9))
+    hostile = ['../../escaped', '..\\..\\escaped', '/tmp/escaped', 'x/../../../escaped',
+               'nul\0byte']
+    for entry_id in hostile:
+        corpus.add_author('Intruso', f'texto de {entry_id!r}.', entry_id=entry_id)
+    for entry_id in hostile[:2]:
+        corpus.update(entry_id, texto='otro texto.')
+    corpus.compact()
+
+    texts_dir = root / 'corpus' / 'texts'
+    written = {path for path in tmp_path.rglob('*') if path.is_file()}
+    assert written == {root / 'corpus' / 'manifest.jsonl'} | set(texts_dir.iterdir())
+    assert {entry.id: entry.read_text() for entry in corpus}['../../escaped'] == 'otro texto.'
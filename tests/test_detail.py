@@ -0,0 +1,68 @@
+# tests/test_detail.py
+import pytest
+
+from analyzer import DETAIL_LEVELS, MAX_PATTERN_EXAMPLES
+from conftest import make_samples
+from corpus import BuiltinCorpus
+
+# Más de MAX_PATTERN_EXAMPLES errores por categoría, para que 'examples' recorte
+TEXT = ' '.join(['ombre asta yave jente grasias cavallo vien biene sapo.'] * 8)
+
+
+def without_patterns(matches):
+    return [{**match, 'detalles': {name: value for name, value in match['detalles'].items()
+                                   if name != 'raw_patterns'}}
+            for match in matches]
+
+
+def assert_trimmed(matches, full, detail):
+    # El nivel de detalle solo cambia 'raw_patterns': ni el orden ni los scores
+    assert without_patterns(matches) == without_patterns(full)
+    for match, expected in zip(matches, full):
+        if detail == 'scores':
+            assert 'raw_patterns' not in match['detalles']
+            continue
+        patterns = match['detalles']['raw_patterns']
+        expected_patterns = expected['detalles']['raw_patterns']
+        assert patterns.keys() == expected_patterns.keys()
+        for name, categories in patterns.items():
+            assert categories.keys() == expected_patterns[name].keys()
+            for category, errors in categories.items():
+                assert errors == expected_patterns[name][category][:MAX_PATTERN_EXAMPLES]
+
+
+@pytest.mark.parametrize('detail', ['scores', 'examples'])
+def test_database_detail_only_trims_patterns(analyzer, detail):
+    corpus = BuiltinCorpus(make_samples(40, seed=60))
+    full = analyzer.analyze_against_database(TEXT, 0, corpus=corpus, detail='full')
+    assert any(len(errors) > MAX_PATTERN_EXAMPLES
+               for errors in full[0]['detalles']['raw_patterns']['text1'].values())
+    for top_k in (None, 5):
+        matches = analyzer.analyze_against_database(TEXT, 0, corpus=corpus, top_k=top_k,
+                                                    detail=detail)
+        assert_trimmed(matches, full[:top_k], detail)
+
+
+@pytest.mark.parametrize('detail', ['scores', 'examples'])
+def test_authors_detail_only_trims_patterns(analyzer, detail):
+    corpus = BuiltinCorpus(make_samples(40, authors=6, seed=61))
+    full = analyzer.analyze_against_authors(TEXT, 0, corpus=corpus, detail='full')
+    matches = analyzer.analyze_against_authors(TEXT, 0, corpus=corpus, detail=detail)
+    assert len(matches) == 6
+    assert_trimmed(matches, full, detail)
+
+
+@pytest.mark.parametrize('detail', ['scores', 'examples'])
+def test_similarity_detail_only_trims_patterns(analyzer, detail):
+    other = make_samples(1, seed=62)[0]['texto']
+    full = analyzer.calculate_similarity_score(TEXT, other, detail='full')
+    score, details = analyzer.calculate_similarity_score(TEXT, other, detail=detail)
+    assert score == full[0]
+    assert_trimmed([{'detalles': details}], [{'detalles': full[1]}], detail)
+
+
+def test_unknown_detail_is_rejected(analyzer):
+    assert 'full' in DETAIL_LEVELS
+    with pytest.raises(ValueError):
+        analyzer.analyze_against_database(TEXT, 0, corpus=BuiltinCorpus(make_samples(3)),
+                                          detail='todo')
@@ -0,0 +1,52 @@
+# tests/test_index.py
+import random
+
+from conftest import brute_force_matches, make_samples, make_text
+from corpus import BuiltinCorpus
+from index import BOUND_EPSILON, ReferenceIndex
+
+
+def reference_features(analyzer, samples):
+    return {sample['id']: analyzer.extract_features(sample['texto']) for sample in samples}
+
+
+def test_bounds_never_drop_a_match(analyzer):
+    samples = make_samples(80, seed=20)
+    features = reference_features(analyzer, samples)
+    index = ReferenceIndex(analyzer.weights)
+    for key, profile in features.items():
+        index.add(key, profile)
+    # Las bajas no estrechan los grupos: las cotas deben seguir siendo válidas
+    for key in list(features)[::5]:
+        index.remove(key)
+        del features[key]
+
+    # Con los textos de referencia como consulta, la cota y el score coinciden
+    # salvo por el orden de las sumas: es el caso que cubre BOUND_EPSILON
+    rng = random.Random(21)
+    texts = [sample['texto'] for sample in samples[:10]] + [make_text(rng) for _ in range(5)]
+    for text in texts:
+        query = analyzer.extract_features(text)
+        scores = {key: analyzer.compare_features(query, profile)[0]
+                  for key, profile in features.items()}
+        bounds = {key: bound for bound, key in index.bounded_candidates(query, 0.0)}
+        assert set(bounds) == set(features)
+        for key, score in scores.items():
+            assert bounds[key] >= score - BOUND_EPSILON
+
+        # Umbral igual a cada score: el candidato no puede quedar fuera
+        for key, score in scores.items():
+            assert key in {k for _, k in index.bounded_candidates(query, score)}
+
+
+def test_threshold_at_exact_score_matches_brute_force(analyzer):
+    samples = make_samples(50, seed=22)
+    corpus = BuiltinCorpus(samples)
+    rng = random.Random(23)
+    texts = [sample['texto'] for sample in samples[:8]] + [make_text(rng) for _ in range(2)]
+    for text in texts:
+        expected = brute_force_matches(analyzer, text, samples)
+        for threshold in {match['similitud'] for match in expected[:10]}:
+            assert analyzer.analyze_against_database(
+                text, threshold, corpus=corpus, detail='scores'
+            ) == [match for match in expected if match['similitud'] >= threshold]
@@ -0,0 +1,74 @@
+# tests/test_instrumentation.py
+from conftest import make_samples
+from corpus import BuiltinCorpus
+from instrumentation import NULL_METRICS, Metrics
+
+
+def run_analysis(analyzer):
+    samples = make_samples(20, authors=4, seed=70)
+    corpus = BuiltinCorpus(samples)
+    analyzer.analyze_against_database(samples[0]['texto'], 0, corpus=corpus)
+    analyzer.analyze_against_authors(samples[0]['texto'], 0, corpus=corpus)
+
+
+def test_disabled_metrics_record_nothing(analyzer):
+    assert analyzer.metrics is NULL_METRICS
+    assert analyzer.spelling_analyzer.metrics is NULL_METRICS
+    run_analysis(analyzer)
+    assert analyzer.get_metrics() == {}
+    # Las operaciones nulas no guardan estado
+    assert NULL_METRICS.stage('a') is NULL_METRICS.stage('b')
+    assert vars(NULL_METRICS) == {}
+
+
+def test_enabled_metrics_record_stages_and_counters(analyzer):
+    events = []
+    metrics = analyzer.enable_instrumentation(lambda *event: events.append(event))
+    assert analyzer.spelling_analyzer.metrics is metrics
+    run_analysis(analyzer)
+
+    snapshot = analyzer.get_metrics()
+    for stage in ('tokenize', 'reference_profiles', 'candidate_filter', 'scoring',
+                  'author_profiles'):
+        assert snapshot['calls'][stage] > 0
+        assert snapshot['timings'][stage] >= 0
+    assert snapshot['counters']['references_scored'] == 20
+    assert snapshot['counters']['authors_scored'] == 4
+    assert snapshot['counters']['words_processed'] > 0
+    # Cada medición llega también a los ganchos
+    assert sum(1 for kind, _, _ in events if kind == 'timing') == sum(snapshot['calls'].values())
+    assert sum(value for kind, _, value in events if kind == 'counter') == \
+        sum(snapshot['counters'].values())
+
+    # Volver a activarla conserva las métricas y los ganchos
+    assert analyzer.enable_instrumentation() is metrics
+
+
+def test_disabling_stops_recording(analyzer):
+    events = []
+    metrics = analyzer.enable_instrumentation(lambda *event: events.append(event))
+    run_analysis(analyzer)
+    before = metrics.snapshot()
+    recorded = len(events)
+
+    analyzer.disable_instrumentation()
+    assert analyzer.spelling_analyzer.metrics is NULL_METRICS
+    run_analysis(analyzer)
+    assert analyzer.get_metrics() == {}
+    assert metrics.snapshot() == before
+    assert len(events) == recorded
+
+
+def test_merge_and_reset():
+    metrics = Metrics()
+    metrics.record('scoring', 0.5)
+    metrics.count('references_scored', 3)
+    other = Metrics()
+    other.merge(metrics.snapshot())
+    other.merge(metrics.snapshot())
+    assert other.snapshot() == {'timings': {'scoring': 1.0}, 'calls': {'scoring': 2},
+                                'counters': {'references_scored': 6}}
+
+    other.reset()
+    assert other.snapshot() == {'timings': {}, 'calls': {}, 'counters': {}}
+    assert other.format_report() == "No hay métricas registradas."
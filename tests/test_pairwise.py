@@ -0,0 +1,56 @@
+# tests/test_pairwise.py
+import json
+
+import pytest
+
+from conftest import make_samples
+from pairwise import run_pairwise
+
+
+@pytest.fixture
+def documents(tmp_path):
+    paths = []
+    for sample in make_samples(8, seed=4):
+        path = tmp_path / f"doc{sample['id']}.txt"
+        path.write_text(sample['texto'], encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def read_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_all_neighbors_without_top_k(analyzer, documents, tmp_path):
+    output = str(tmp_path / 'vecinos.jsonl')
+    summary = run_pairwise(documents, top_k=None, min_similarity=None,
+                           workers=1, output=output)
+    assert summary['records'] == len(documents)
+
+    features = {path: analyzer.extract_features(open(path, encoding='utf-8').read())
+                for path in documents}
+    for record in read_records(output):
+        neighbors = record['vecinos']
+        assert sorted(n['archivo'] for n in neighbors) == \
+            sorted(path for path in documents if path != record['archivo'])
+        scores = [n['similitud'] for n in neighbors]
+        assert scores == sorted(scores, reverse=True)
+        for neighbor in neighbors:
+            expected, _ = analyzer.compare_features(features[record['archivo']],
+                                                    features[neighbor['archivo']])
+            assert neighbor['similitud'] == pytest.approx(expected * 100)
+
+
+def test_pairs_match_neighbors(documents, tmp_path):
+    neighbors_path = str(tmp_path / 'vecinos.jsonl')
+    pairs_path = str(tmp_path / 'pares.jsonl')
+    run_pairwise(documents, top_k=None, workers=1, output=neighbors_path)
+    run_pairwise(documents, min_similarity=50, workers=1, output=pairs_path)
+
+    expected = {
+        tuple(sorted((record['archivo'], n['archivo'])))
+        for record in read_records(neighbors_path)
+        for n in record['vecinos'] if n['similitud'] >= 50
+    }
+    assert {(r['archivo_a'], r['archivo_b']) for r in read_records(pairs_path)} == expected
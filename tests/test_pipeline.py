@@ -0,0 +1,97 @@
+# tests/test_pipeline.py
+import asyncio
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from batch import run_batch
+from conftest import make_text
+from pipeline import DONE_DIR, _run_stages, run_pipeline
+from workers import set_worker_analyzer
+
+
+async def text_documents(count, counters):
+    rng = random.Random(80)
+    for i in range(count):
+        counters['read'] += 1
+        yield f'doc{i}', None, make_text(rng, 6)
+        # Cede el control para que las demás etapas avancen entre lecturas
+        await asyncio.sleep(0)
+
+
+def run_stages(analyzer, count, write, max_in_flight, counters, ordered=False):
+    set_worker_analyzer(analyzer)
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            await asyncio.wait_for(
+                _run_stages(text_documents(count, counters), executor, write, 2, 0, None,
+                            ordered, max_in_flight),
+                timeout=10
+            )
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_worker_analyzer(None)
+
+
+@pytest.mark.parametrize('ordered', [False, True])
+def test_in_flight_documents_are_bounded(analyzer, ordered):
+    counters = {'read': 0, 'written': 0, 'peak': 0}
+    names = []
+
+    def write(path, record):
+        # El documento que se escribe sigue contando como en vuelo
+        counters['peak'] = max(counters['peak'], counters['read'] - counters['written'])
+        counters['written'] += 1
+        names.append(record['archivo'])
+
+    run_stages(analyzer, 40, write, 4, counters, ordered)
+    assert counters['written'] == 40
+    # El lector cuenta un documento más antes de esperar al semáforo
+    assert counters['peak'] <= 4 + 1
+    if ordered:
+        assert names == [f'doc{i}' for i in range(40)]
+
+
+def test_write_error_stops_the_pipeline(analyzer):
+    counters = {'read': 0}
+
+    def write(path, record):
+        raise BrokenPipeError("salida cerrada")
+
+    with pytest.raises(BrokenPipeError):
+        run_stages(analyzer, 20, write, 4, counters)
+    assert counters['read'] < 20
+
+
+def read_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_output_matches_run_batch(tmp_path, workers):
+    inputs = tmp_path / 'entrada'
+    inputs.mkdir()
+    rng = random.Random(81)
+    for i in range(12):
+        (inputs / f'doc{i:02d}.txt').write_text(make_text(rng, 6), encoding='utf-8')
+
+    batch_output = str(tmp_path / 'lotes.jsonl')
+    run_batch([str(inputs)], min_similarity=50, workers=1, output=batch_output, top_k=5)
+    expected = {os.path.basename(record['archivo']): record['coincidencias']
+                for record in read_records(batch_output)}
+
+    pipeline_output = str(tmp_path / 'flujo.jsonl')
+    summary = run_pipeline(str(inputs), min_similarity=50, top_k=5, workers=workers,
+                           output=pipeline_output, once=True)
+    assert summary['documents'] == 12 and summary['errors'] == 0
+    assert {record['archivo']: record['coincidencias']
+            for record in read_records(pipeline_output)} == expected
+    # Los archivos procesados se mueven fuera del directorio de entrada
+    assert sorted(os.listdir(inputs / DONE_DIR)) == sorted(expected)
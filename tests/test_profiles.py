@@ -0,0 +1,36 @@
+# tests/test_profiles.py
+import logging
+import os
+import random
+
+import analyzer as analyzer_module
+from analyzer import TextStyleAnalyzer
+from conftest import brute_force_matches, make_samples, make_text
+from corpus import BuiltinCorpus
+
+
+def test_default_store_outside_source_tree():
+    source_dir = os.path.dirname(os.path.abspath(analyzer_module.__file__))
+    assert not os.path.abspath(analyzer_module.DEFAULT_PROFILE_STORE).startswith(source_dir)
+
+
+def test_unwritable_store_keeps_profiles_in_memory(analyzer, caplog):
+    samples = make_samples(20, seed=70)
+    corpus = BuiltinCorpus(samples)
+    # /dev/null no es un directorio: ni el archivo ni su directorio pueden crearse
+    unwritable = TextStyleAnalyzer(profile_store_path='/dev/null/cache/profiles.jsonl',
+                                   corpus=corpus)
+    rng = random.Random(71)
+
+    with caplog.at_level(logging.WARNING, logger='profiles'):
+        for _ in range(3):
+            text = make_text(rng)
+            assert unwritable.analyze_against_database(text, 0, detail='scores') == \
+                brute_force_matches(analyzer, text, samples)
+            corpus.add_author('Nuevo', make_text(rng))
+            samples = [{'id': entry.id, 'autor': entry.autor, 'texto': entry.read_text()}
+                       for entry in corpus]
+        unwritable.compact_references(exclusive=True)
+
+    assert len(caplog.records) == 1
+    assert len(unwritable.profile_store) == len({entry.fingerprint for entry in corpus})
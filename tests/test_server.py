@@ -0,0 +1,113 @@
+# tests/test_server.py
+import http.client
+import json
+import threading
+
+import pytest
+
+from conftest import make_samples
+from corpus import DirectoryCorpus
+from server import ScoringService, create_server
+
+pytest.importorskip('numpy')
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    corpus_path = str(tmp_path_factory.mktemp('corpus'))
+    DirectoryCorpus.create(corpus_path, make_samples(10, seed=100))
+    service = ScoringService(corpus_path, workers=1)
+    # Puerto 0: el sistema asigna uno libre
+    httpd = create_server('127.0.0.1', 0, service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def request(server, method, path, payload=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        headers = headers if headers is not None else {'Content-Length': str(len(body or b''))}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_health_and_unknown_routes(server):
+    status, payload = request(server, 'GET', '/health')
+    assert status == 200 and payload['status'] == 'ok'
+    assert request(server, 'GET', '/nada')[0] == 404
+    assert request(server, 'POST', '/nada', {})[0] == 404
+
+
+def test_detail_levels(server):
+    text = make_samples(10, seed=100)[3]['texto']
+    results = {}
+    for detail in ('scores', 'examples', 'full'):
+        status, payload = request(server, 'POST', '/match',
+                                  {'texto': text, 'min_similarity': 0, 'detail': detail})
+        assert status == 200
+        results[detail] = payload['coincidencias']
+
+    ranking = [(match['id'], match['similitud']) for match in results['full']]
+    for detail in ('scores', 'examples'):
+        assert [(match['id'], match['similitud']) for match in results[detail]] == ranking
+    assert all('raw_patterns' not in match['detalles'] for match in results['scores'])
+    assert all('raw_patterns' in match['detalles'] for match in results['full'])
+
+    status, payload = request(server, 'POST', '/match', {'texto': text, 'detail': 'todo'})
+    assert status == 400
+    status, payload = request(server, 'POST', '/match', {'min_similarity': 0})
+    assert status == 400
+
+
+def test_corpus_authors(server):
+    status, payload = request(server, 'POST', '/corpus/authors',
+                              {'autor': 'Nueva', 'texto': 'Un texto nuevo. Con dos frases.'})
+    assert status == 201
+    entry_id, version = payload['id'], payload['version']
+
+    status, payload = request(server, 'GET', '/corpus')
+    assert status == 200 and payload['version'] == version
+    assert {'id': entry_id, 'autor': 'Nueva'} in payload['entries']
+
+    status, payload = request(server, 'PUT', f'/corpus/authors/{entry_id}', {'autor': 'Otra'})
+    assert status == 200 and payload['version'] == version + 1
+    status, payload = request(server, 'POST', '/match',
+                              {'texto': 'Un texto nuevo. Con dos frases.', 'top_k': 1})
+    assert payload['coincidencias'][0]['autor'] == 'Otra'
+
+    assert request(server, 'DELETE', f'/corpus/authors/{entry_id}')[0] == 200
+    assert request(server, 'DELETE', f'/corpus/authors/{entry_id}')[0] == 404
+    assert request(server, 'PUT', '/corpus/authors/1', {'autor': 3})[0] == 400
+    assert request(server, 'POST', '/corpus/authors', {'autor': 'Sin texto'})[0] == 400
+    for entry_id in ([1], {'a': 1}, True, 1.5):
+        assert request(server, 'POST', '/corpus/authors',
+                       {'autor': 'A', 'texto': 'hola.', 'id': entry_id})[0] == 400
+
+    assert request(server, 'POST', '/corpus/compact', {})[0] == 200
+    assert request(server, 'POST', '/corpus/reload', {})[0] == 200
+
+
+def test_invalid_bodies(server):
+    assert request(server, 'POST', '/match', headers={'Content-Length': '-1'})[0] == 400
+    assert request(server, 'POST', '/match', headers={'Content-Length': 'mucho'})[0] == 400
+    assert request(server, 'POST', '/match',
+                   headers={'Content-Length': str(1 << 40)})[0] == 400
+
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        connection.request('POST', '/match', body=b'[1, 2]')
+        assert connection.getresponse().status == 400
+        # Sin Content-Length la petición se rechaza en lugar de esperar al cierre
+        connection.putrequest('POST', '/match')
+        connection.endheaders()
+        assert connection.getresponse().status == 400
+    finally:
+        connection.close()
@@ -0,0 +1,78 @@
+# tests/test_streaming.py
+import random
+
+import pytest
+
+from benchmark import synthetic_corpus
+from conftest import make_samples, make_text
+from corpus import BuiltinCorpus
+from streaming import extract_stream_features
+
+# Con bloques de 1, 3 y 7 caracteres casi todas las palabras y oraciones
+# quedan partidas entre bloques; None es el tamaño por defecto (un bloque)
+CHUNK_SIZES = [1, 3, 7, 64, None]
+
+TEXTS = [
+    '', '   ', '...', 'sin punto final',
+    '  Empieza con espacios.\n\nY  sigue\tcon saltos. ',
+    'El perro 123 corre... La casa3.tiene, 4 ¿puertas? ¡Sí!',
+    '.a.b. .c', 'uno.dos tres. . . cuatro', 'Hoy es 2024. El 3.5% de los casos_raros ...',
+    'Ñandú pingüino acción. hAber aSta yave llave jente cecina. zapato, sena',
+    synthetic_corpus(3000, seed=1) + ' fin.sin.punto 12',
+]
+
+
+def texts():
+    rng = random.Random(90)
+    return TEXTS + [make_text(rng, 8) for _ in range(4)]
+
+
+@pytest.fixture
+def corpus():
+    return BuiltinCorpus(make_samples(30, seed=91))
+
+
+def assert_same_matches(actual, expected):
+    assert [match['id'] for match in actual] == [match['id'] for match in expected]
+    for match, reference in zip(actual, expected):
+        assert match['similitud'] == pytest.approx(reference['similitud'], rel=1e-12)
+        details = dict(match['detalles'])
+        reference_details = dict(reference['detalles'])
+        assert details.pop('raw_patterns', None) == reference_details.pop('raw_patterns', None)
+        assert details == pytest.approx(reference_details, rel=1e-12)
+
+
+def assert_same_features(actual, expected):
+    # La desviación típica de Welford puede diferir en el último bit
+    actual, expected = dict(actual), dict(expected)
+    assert actual.pop('std_sentence_length') == \
+        pytest.approx(expected.pop('std_sentence_length'), rel=1e-12)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_file_matches_in_memory(analyzer, corpus, tmp_path, chunk_size):
+    path = tmp_path / 'documento.txt'
+    for text in texts():
+        path.write_text(text, encoding='utf-8')
+        # El archivo solo conserva ejemplos de cada categoría: se compara con 'examples'
+        for detail in ('scores', 'examples'):
+            assert_same_matches(
+                analyzer.analyze_file_against_database(str(path), 0, corpus=corpus,
+                                                       chunk_size=chunk_size, detail=detail),
+                analyzer.analyze_against_database(text, 0, corpus=corpus, detail=detail)
+            )
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_stream_features_match_in_memory(analyzer, chunk_size):
+    for text in texts():
+        size = chunk_size or max(len(text), 1)
+        result = extract_stream_features(
+            analyzer, (text[i:i + size] for i in range(0, len(text), size)))
+        assert_same_features(result['features'], analyzer.extract_features(text))
+        assert result['basic_stats'] == analyzer.analyze_text(text)['basic_stats']
+
+        patterns = analyzer.spelling_analyzer.find_spelling_patterns(text)
+        assert result['spelling_examples'] == \
+            {category: found[:5] for category, found in patterns.items()}
@@ -0,0 +1,55 @@
+# tests/test_tokenizer.py
+import random
+
+import pytest
+
+from benchmark import legacy_extract_features, legacy_find_spelling_patterns, synthetic_corpus
+from conftest import make_text
+from tokenizer import tokenize
+
+EDGE_TEXTS = [
+    '', '   ', '...', 'Hola. Adiós.',
+    'El perro 123 corre... La casa3.tiene, 4 ¿puertas? ¡Sí!',
+    'Hoy es 2024. El 3.5% de los casos_raros ...',
+    'El EL el La LA. Y y. Que QUE que.',
+    'İstanbul ß Straße. hAber aSta yave llave jente cecina.',
+    '.a.b. .c', 'uno.dos tres. . . cuatro', '12 34. 56',
+    'zapato, sena; gente: jeneral!', 'línea\nsiguiente\tcon\r\nsaltos. fin',
+]
+
+
+def texts():
+    rng = random.Random(50)
+    return EDGE_TEXTS + [make_text(rng, 8) for _ in range(10)] + \
+        [synthetic_corpus(size, seed=size) for size in (100, 2000, 20000)]
+
+
+@pytest.mark.parametrize('text', texts())
+def test_single_pass_matches_staged_extraction(analyzer, text):
+    features, spelling_patterns = legacy_extract_features(analyzer, text)
+    record = tokenize(analyzer, text, raw_stats=True)
+
+    assert record.features() == features
+    assert analyzer.extract_features(text) == features
+    assert record.spelling_patterns == \
+        legacy_find_spelling_patterns(analyzer.spelling_analyzer, text)
+    assert record.spelling_patterns == spelling_patterns
+
+
+@pytest.mark.parametrize('text', texts())
+def test_analyze_text_matches_staged_statistics(analyzer, text):
+    # Cálculo original de analyze_text: una pasada por estadística
+    word_count = len(text.split())
+    sentence_count = len([s for s in text.split('.') if s.strip()])
+    result = analyzer.analyze_text(text)
+
+    assert result['basic_stats'] == {
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'avg_words_per_sentence': word_count / sentence_count if sentence_count > 0 else 0
+    }
+    assert result['text_stats'] == {
+        **analyzer.get_sentence_length_stats(text),
+        **analyzer.get_word_frequency_stats(text)
+    }
+    assert result['spelling_patterns'] == analyzer.spelling_analyzer.find_spelling_patterns(text)
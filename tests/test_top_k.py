@@ -0,0 +1,36 @@
+# tests/test_top_k.py
+import random
+
+from conftest import brute_force_matches, make_samples, make_text
+from corpus import BuiltinCorpus
+
+
+def test_top_k_is_prefix_of_full_search(analyzer):
+    samples = make_samples(70, seed=40)
+    corpus = BuiltinCorpus(samples)
+    rng = random.Random(41)
+    # Los textos repetidos de make_samples empatan entre sí: el corte de top_k
+    # cae dentro de un grupo de empates y debe respetar el orden del corpus
+    texts = [samples[0]['texto'], samples[3]['texto']] + [make_text(rng) for _ in range(4)]
+    for text in texts:
+        expected = brute_force_matches(analyzer, text, samples)
+        scores = [match['similitud'] for match in expected]
+        # Umbrales exactos: el de la décima coincidencia y uno por encima de todas
+        for min_similarity in (0, 60, scores[9], scores[0] + 1):
+            full = [match for match in expected if match['similitud'] >= min_similarity]
+            for top_k in (0, 1, 2, 5, 10, len(samples), len(samples) + 3):
+                assert analyzer.analyze_against_database(
+                    text, min_similarity, corpus=corpus, top_k=top_k, detail='scores'
+                ) == full[:top_k]
+
+
+def test_top_k_breaks_ties_by_corpus_order(analyzer):
+    samples = make_samples(30, seed=42)
+    corpus = BuiltinCorpus(samples)
+    text = samples[0]['texto']
+    duplicates = [sample['id'] for sample in samples if sample['texto'] == text]
+    assert len(duplicates) > 2
+
+    matches = analyzer.analyze_against_database(text, 0, corpus=corpus, top_k=2)
+    assert [match['id'] for match in matches] == duplicates[:2]
+    assert all(match['similitud'] == 100 for match in matches)
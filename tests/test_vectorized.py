@@ -0,0 +1,48 @@
+# tests/test_vectorized.py
+import random
+
+import pytest
+
+from conftest import make_samples, make_text
+from corpus import BuiltinCorpus
+
+pytest.importorskip('numpy')
+
+
+def assert_matches_compare_features(analyzer, text, corpus):
+    scores, detailed = analyzer.score_many(text, corpus=corpus)
+    query = analyzer.extract_features(text)
+    entries = list(corpus)
+    assert len(scores) == len(entries)
+    for i, entry in enumerate(entries):
+        score, details = analyzer.compare_features(
+            query, analyzer.extract_features(entry.read_text()))
+        # Mismas operaciones en el mismo orden: el resultado es idéntico
+        assert scores[i] == score
+        for name, value in details.items():
+            assert detailed[name][i] == value
+
+
+def test_score_many_matches_compare_features(analyzer):
+    samples = make_samples(60, seed=30)
+    # Textos sin oraciones ni palabras de contenido: similitudes con ceros
+    samples += [{'id': 61, 'autor': 'Vacio', 'texto': ''},
+                {'id': 62, 'autor': 'Numeros', 'texto': '1 2 3'}]
+    corpus = BuiltinCorpus(samples)
+    rng = random.Random(31)
+    for text in ['', '1 2 3', samples[0]['texto'], make_text(rng), make_text(rng, 8)]:
+        assert_matches_compare_features(analyzer, text, corpus)
+
+
+def test_score_many_keeps_corpus_order_after_changes(analyzer):
+    corpus = BuiltinCorpus(make_samples(30, seed=32))
+    rng = random.Random(33)
+    text = make_text(rng)
+    analyzer.score_many(text, corpus=corpus)
+
+    # Altas y bajas alteran el orden interno de la matriz, no el del resultado
+    corpus.remove(3)
+    corpus.add_author('Nuevo', make_text(rng))
+    corpus.update(10, texto=make_text(rng))
+    corpus.remove(1)
+    assert_matches_compare_features(analyzer, text, corpus)
@@ -0,0 +1,56 @@
+# tests/test_vocabulary.py
+import pickle
+import random
+
+from analyzer import TextStyleAnalyzer
+from conftest import make_samples, make_text
+from corpus import BuiltinCorpus
+from vocabulary import CompactProfile, ProfileCodec
+
+
+def make_codec(analyzer) -> ProfileCodec:
+    return ProfileCodec(analyzer.spelling_analyzer.common_patterns.keys())
+
+
+def test_encode_round_trip(analyzer):
+    codec = make_codec(analyzer)
+    for sample in make_samples(30, seed=60):
+        features = analyzer.extract_features(sample['texto'])
+        profile = codec.encode(features)
+        assert isinstance(profile, CompactProfile)
+        assert dict(profile) == features
+        assert codec.encode(profile) is profile
+        # Se serializa como el diccionario original
+        assert pickle.loads(pickle.dumps(profile)) == features
+
+
+def test_compact_compare_matches_dict_compare(analyzer):
+    codec = make_codec(analyzer)
+    references = [analyzer.extract_features(sample['texto'])
+                  for sample in make_samples(40, seed=61)]
+    profiles = [codec.encode(features) for features in references]
+    vocabulary_size = len(codec.vocabulary)
+
+    rng = random.Random(62)
+    # La última consulta tiene palabras fuera del vocabulario de las referencias
+    texts = ['', make_text(rng), make_text(rng, 8), 'palabras nuevas casa perro ignotas.']
+    for text in texts:
+        features = analyzer.extract_features(text)
+        query = codec.query(features)
+        assert len(codec.vocabulary) == vocabulary_size
+        for reference, profile in zip(references, profiles):
+            assert analyzer.compare_features(query, profile) == \
+                analyzer.compare_features(features, reference)
+
+
+def test_stored_profiles_round_trip(tmp_path):
+    store_path = str(tmp_path / 'profiles.jsonl')
+    corpus = BuiltinCorpus(make_samples(20, seed=63))
+    writer = TextStyleAnalyzer(profile_store_path=store_path, corpus=corpus)
+    written = [dict(profile) for profile in writer.profile_store.get_profiles(corpus)]
+    writer.profile_store.save()
+
+    # Otro proceso reconstruye los perfiles sobre su propio vocabulario
+    reader = TextStyleAnalyzer(profile_store_path=store_path, corpus=corpus)
+    assert [dict(profile) for profile in reader.profile_store.get_profiles(corpus)] == written
+    assert len(reader.profile_store._pending) == 0
@@ -0,0 +1,221 @@
+# tokenizer.py
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Sustituciones de TextStyleAnalyzer.preprocess_text; ninguna cruza espacios en
+# blanco, así que aplicarlas palabra a palabra da el mismo resultado
+DIGITS = re.compile(r'\d+')
+SYMBOLS = re.compile(r'[^\w\s\.]')
+
+
+def sentence_length_stats(lengths: List[int]) -> Dict[str, float]:
+    """
+    Estadísticas de longitud de oración a partir del número de palabras de cada una.
+
+    Args:
+        lengths (List[int]): Palabras de cada oración no vacía, en orden
+
+    Returns:
+        Dict[str, float]: Media, desviación típica, máximo y mínimo
+    """
+    mean = sum(lengths) / len(lengths) if lengths else 0
+    return {
+        'avg_sentence_length': mean,
+        'std_sentence_length': math.sqrt(
+            sum((length - mean) ** 2 for length in lengths) / len(lengths)
+        ) if lengths else 0,
+        'max_sentence_length': max(lengths) if lengths else 0,
+        'min_sentence_length': min(lengths) if lengths else 0
+    }
+
+
+def word_frequency_stats(freq: Counter, words: int, chars: int) -> Dict[str, float]:
+    """
+    Estadísticas de frecuencia de palabras a partir de sus conteos.
+
+    Args:
+        freq (Counter): Apariciones de cada palabra, en orden de primera aparición
+        words (int): Total de palabras
+        chars (int): Total de caracteres de esas palabras
+
+    Returns:
+        Dict[str, float]: Proporción de palabras únicas, longitud media y palabras comunes
+    """
+    return {
+        'unique_words_ratio': len(freq) / words if words else 0,
+        'avg_word_length': chars / words if words else 0,
+        'common_words': set(dict(freq.most_common(10)).keys())
+    }
+
+
+def _parts(piece_text: str) -> Optional[tuple]:
+    """Palabras (0 o 1) de cada trozo entre puntos de una palabra; None si no tiene puntos."""
+    if '.' not in piece_text:
+        return None
+    return tuple(1 if piece else 0 for piece in piece_text.split('.'))
+
+
+class TextRecord:
+    """
+    Resultado de recorrer un texto una sola vez con tokenize.
+
+    Guarda agregados en lugar de las palabras: longitudes de oración del
+    texto original y del preprocesado, frecuencias de las palabras de
+    contenido y los patrones ortográficos de cada aparición. Todos los
+    rasgos del analizador se derivan de aquí sin volver a leer el texto.
+    """
+
+    def __init__(self):
+        self.word_count = 0
+        self.raw_sentence_lengths: List[int] = []
+        self.sentence_lengths: List[int] = []
+        self.word_freq = Counter()
+        self.content_words = 0
+        self.content_chars = 0
+        self.spelling_patterns: Dict[str, List] = {}
+        # Frecuencias sobre el texto original; solo con tokenize(..., raw_stats=True)
+        self.raw_word_freq: Optional[Counter] = None
+        self.raw_content_words = 0
+        self.raw_content_chars = 0
+        # Palabras de la última oración sin cerrar (preprocesada, original) con tokenize(..., carry)
+        self.carry: Optional[Tuple[int, int]] = None
+
+    def basic_stats(self) -> Dict:
+        """Palabras y oraciones del texto original, como en analyze_text."""
+        word_count = self.word_count
+        sentence_count = len(self.raw_sentence_lengths)
+        return {
+            'word_count': word_count,
+            'sentence_count': sentence_count,
+            'avg_words_per_sentence': word_count / sentence_count if sentence_count > 0 else 0
+        }
+
+    def spelling_categories(self) -> Dict[str, bool]:
+        """Presencia de cada categoría de patrones ortográficos."""
+        return {category: bool(errors) for category, errors in self.spelling_patterns.items()}
+
+    def features(self) -> Dict:
+        """Vector de rasgos con el formato de extract_features."""
+        return {
+            **sentence_length_stats(self.sentence_lengths),
+            **word_frequency_stats(self.word_freq, self.content_words, self.content_chars),
+            'spelling_categories': self.spelling_categories()
+        }
+
+    def raw_text_stats(self) -> Dict:
+        """Estadísticas de oraciones y palabras del texto sin preprocesar."""
+        if self.raw_word_freq is None:
+            raise ValueError("El texto se procesó sin raw_stats")
+        return {
+            **sentence_length_stats(self.raw_sentence_lengths),
+            **word_frequency_stats(self.raw_word_freq, self.raw_content_words,
+                                   self.raw_content_chars)
+        }
+
+
+def tokenize(analyzer, text: str, raw_stats: bool = False,
+             carry: Optional[Tuple[int, int]] = None) -> TextRecord:
+    """
+    Recorre el texto una vez y calcula todo lo que necesita el analizador.
+
+    El texto se divide en palabras una sola vez. Cada palabra distinta se
+    normaliza (minúsculas, sin dígitos ni símbolos) y se busca en el motor
+    de patrones una sola vez; sus apariciones solo suman conteos, cierran
+    oraciones en los puntos y añaden sus patrones. Los resultados coinciden
+    con find_spelling_patterns, preprocess_text y las estadísticas de
+    oraciones y palabras aplicadas por separado.
+
+    Para procesar un texto por fragmentos cortados en espacios en blanco, carry
+    continúa la oración en curso del fragmento anterior y deja la última
+    abierta en record.carry en lugar de cerrarla.
+
+    Args:
+        analyzer (TextStyleAnalyzer): Analizador con la configuración a usar
+        text (str): Texto a analizar
+        raw_stats (bool): Calcular también las frecuencias sobre el texto original
+        carry (Optional[Tuple[int, int]]): Palabras de la oración en curso
+            (texto preprocesado, texto original) del fragmento anterior
+
+    Returns:
+        TextRecord: Agregados del texto
+    """
+    spelling = analyzer.spelling_analyzer
+    stopwords = analyzer.spanish_stopwords
+    record = TextRecord()
+    patterns = {category: [] for category in spelling.common_patterns.keys()}
+    record.spelling_patterns = patterns
+
+    with analyzer.metrics.stage('tokenize'):
+        tokens = text.split()
+        # Palabra original -> [apariciones, palabra normalizada, trozos del texto
+        # preprocesado, trozos del texto original, patrones]
+        entries = {}
+        lengths = record.sentence_lengths
+        raw_lengths = record.raw_sentence_lengths
+        current, raw_current = carry if carry is not None else (0, 0)
+
+        for token in tokens:
+            entry = entries.get(token)
+            if entry is None:
+                lower = token.lower()
+                normalized = SYMBOLS.sub('', DIGITS.sub('', lower))
+                hits = tuple((patterns[category], (lower, error))
+                             for category, error in spelling.word_matches(lower))
+                entry = [0, normalized, _parts(normalized), _parts(token), hits]
+                entries[token] = entry
+            entry[0] += 1
+
+            for target, pair in entry[4]:
+                target.append(pair)
+
+            parts = entry[2]
+            if parts is None:
+                if entry[1]:
+                    current += 1
+            else:
+                current += parts[0]
+                for part in parts[1:]:
+                    if current:
+                        lengths.append(current)
+                    current = part
+
+            parts = entry[3]
+            if parts is None:
+                raw_current += 1
+            else:
+                raw_current += parts[0]
+                for part in parts[1:]:
+                    if raw_current:
+                        raw_lengths.append(raw_current)
+                    raw_current = part
+
+        if carry is not None:
+            record.carry = (current, raw_current)
+        else:
+            if current:
+                lengths.append(current)
+            if raw_current:
+                raw_lengths.append(raw_current)
+
+        # Conteos por palabra de contenido, en orden de primera aparición
+        freq = record.word_freq
+        for count, normalized, _, _, _ in entries.values():
+            if normalized and normalized not in stopwords:
+                freq[normalized] += count
+                record.content_words += count
+                record.content_chars += len(normalized) * count
+
+        if raw_stats:
+            record.raw_word_freq = Counter()
+            for token, entry in entries.items():
+                if token not in stopwords:
+                    record.raw_word_freq[token] = entry[0]
+                    record.raw_content_words += entry[0]
+                    record.raw_content_chars += len(token) * entry[0]
+
+    record.word_count = len(tokens)
+    if analyzer.metrics.enabled:
+        analyzer.metrics.count('words_processed', len(tokens))
+    return record
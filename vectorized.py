@@ -0,0 +1,239 @@
+# vectorized.py
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from vocabulary import Vocabulary
+
+# Columnas de rasgos numéricos de la matriz
+NUMERIC_COLUMNS = ('avg_sentence_length', 'avg_word_length', 'unique_words_ratio')
+
+# Capacidad inicial (en filas) de los arreglos
+MIN_CAPACITY = 64
+
+
+def safe_similarity(value: float, values: np.ndarray) -> np.ndarray:
+    """
+    Versión vectorizada de TextStyleAnalyzer._safe_similarity.
+
+    Args:
+        value (float): Valor del texto de entrada
+        values (np.ndarray): Valores de los textos de referencia
+
+    Returns:
+        np.ndarray: Similitud de cada referencia (0-1)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = 1 - np.abs(value - values) / np.maximum(value, values)
+    if value == 0:
+        similarity[:] = 0.0
+    else:
+        similarity[values == 0] = 0.0
+    similarity[values == value] = 1.0
+    return similarity
+
+
+class FeatureMatrix:
+    """
+    Rasgos de todos los textos de referencia en arreglos de NumPy.
+
+    Las palabras comunes se guardan como coordenadas dispersas (fila, id de
+    palabra) sobre un vocabulario compartido, y las categorías ortográficas
+    como una matriz booleana de N x categorías. Las filas se añaden al final
+    con capacidad creciente; las bajas solo las marcan como eliminadas y la
+    matriz se compacta cuando las eliminadas superan a las vigentes.
+    """
+
+    def __init__(self, profiles: List[Dict] = (), vocabulary: Optional[Vocabulary] = None,
+                 keys: Optional[List[Hashable]] = None):
+        """
+        Args:
+            profiles (List[Dict]): Vectores de rasgos de los textos de referencia
+            vocabulary (Optional[Vocabulary]): Vocabulario compartido a reutilizar
+            keys (Optional[List[Hashable]]): Clave de cada perfil; por defecto su posición
+        """
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.categories: Optional[List[str]] = None
+        self.keys: List[Hashable] = []
+        self.rows: Dict[Hashable, int] = {}
+        self.size = 0
+        self.removed = 0
+
+        capacity = max(len(profiles), MIN_CAPACITY)
+        self.numeric = np.zeros((capacity, len(NUMERIC_COLUMNS)), dtype=np.float64)
+        self.spelling = np.zeros((capacity, 0), dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.word_rows = np.zeros(capacity * 10, dtype=np.int64)
+        self.word_ids = np.zeros(capacity * 10, dtype=np.int64)
+        self.word_count = 0
+
+        if keys is None:
+            keys = range(len(profiles))
+        for key, profile in zip(keys, profiles):
+            self.add(key, profile)
+
+    @classmethod
+    def from_arrays(cls, keys: List[Hashable], numeric: np.ndarray, spelling: np.ndarray,
+                    word_rows: np.ndarray, word_ids: np.ndarray, vocabulary: Vocabulary,
+                    categories: List[str]) -> 'FeatureMatrix':
+        """
+        Crea una matriz sobre arreglos ya construidos, sin copiarlos.
+
+        Los arreglos pueden ser de solo lectura (p. ej. numpy.memmap): se
+        copian a memoria propia al crecer la matriz.
+
+        Args:
+            keys (List[Hashable]): Clave de cada fila
+            numeric (np.ndarray): Columnas NUMERIC_COLUMNS (N x 3)
+            spelling (np.ndarray): Categorías ortográficas (N x categorías, booleano)
+            word_rows (np.ndarray): Fila de cada palabra común, en orden de filas
+            word_ids (np.ndarray): Identificador de cada palabra común
+            vocabulary (Vocabulary): Vocabulario de los identificadores
+            categories (List[str]): Nombres de las categorías ortográficas
+
+        Returns:
+            FeatureMatrix: Matriz con una fila por clave
+        """
+        matrix = cls(vocabulary=vocabulary)
+        matrix.categories = list(categories)
+        matrix.keys = list(keys)
+        matrix.rows = {key: row for row, key in enumerate(matrix.keys)}
+        matrix.size = len(matrix.keys)
+        matrix.numeric = numeric
+        matrix.spelling = spelling
+        matrix.alive = np.ones(matrix.size, dtype=bool)
+        matrix.word_rows = word_rows
+        matrix.word_ids = word_ids
+        matrix.word_count = len(word_ids)
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _grow(self, rows: int, words: int):
+        """Duplica la capacidad de los arreglos cuando hace falta."""
+        if rows > len(self.alive):
+            capacity = max(rows, 2 * len(self.alive))
+            self.numeric = np.resize(np.asarray(self.numeric), (capacity, self.numeric.shape[1]))
+            self.spelling = np.resize(np.asarray(self.spelling), (capacity, self.spelling.shape[1]))
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self.size] = self.alive[:self.size]
+            self.alive = alive
+        if words > len(self.word_ids):
+            capacity = max(words, 2 * len(self.word_ids))
+            self.word_rows = np.resize(np.asarray(self.word_rows), capacity)
+            self.word_ids = np.resize(np.asarray(self.word_ids), capacity)
+
+    def add(self, key: Hashable, profile: Dict):
+        """
+        Añade un perfil como fila nueva, sustituyendo el anterior con la misma clave.
+
+        Args:
+            key (Hashable): Clave del perfil
+            profile (Dict): Vector de rasgos
+        """
+        if key in self.rows:
+            self.remove(key)
+
+        if self.categories is None:
+            self.categories = list(profile['spelling_categories'])
+            self.spelling = np.zeros((len(self.alive), len(self.categories)), dtype=bool)
+
+        words = profile['common_words']
+        row = self.size
+        self._grow(row + 1, self.word_count + len(words))
+
+        self.numeric[row] = [profile[column] for column in NUMERIC_COLUMNS]
+        self.spelling[row] = [bool(profile['spelling_categories'][category])
+                              for category in self.categories]
+        self.alive[row] = True
+        for word in words:
+            self.word_rows[self.word_count] = row
+            self.word_ids[self.word_count] = self.vocabulary.intern(word)
+            self.word_count += 1
+
+        self.keys.append(key)
+        self.rows[key] = row
+        self.size += 1
+
+    def remove(self, key: Hashable):
+        """Marca como eliminada la fila de un perfil."""
+        row = self.rows.pop(key)
+        self.alive[row] = False
+        self.removed += 1
+        if self.removed > len(self.rows) and self.removed >= MIN_CAPACITY:
+            self.compact()
+
+    def compact(self):
+        """Elimina físicamente las filas marcadas y renumera las vigentes."""
+        keep = self.alive[:self.size]
+        new_rows = np.cumsum(keep) - 1
+
+        word_rows = self.word_rows[:self.word_count]
+        word_keep = keep[word_rows]
+        self.word_ids = self.word_ids[:self.word_count][word_keep]
+        self.word_rows = new_rows[word_rows[word_keep]]
+        self.word_count = len(self.word_ids)
+
+        self.numeric = self.numeric[:self.size][keep]
+        self.spelling = self.spelling[:self.size][keep]
+        self.keys = [key for key, alive in zip(self.keys, keep) if alive]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.size = len(self.keys)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.removed = 0
+
+    def common_word_overlap(self, words) -> np.ndarray:
+        """Cuenta cuántas de las palabras dadas comparte cada fila."""
+        query_mask = np.zeros(len(self.vocabulary) + 1, dtype=bool)
+        for word in words:
+            word_id = self.vocabulary.get(word)
+            if word_id >= 0:
+                query_mask[word_id] = True
+        hits = query_mask[self.word_ids[:self.word_count]]
+        return np.bincount(self.word_rows[:self.word_count][hits], minlength=self.size)
+
+    def score(self, query: Dict, weights: Dict[str, float]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Calcula la similitud de un vector de rasgos contra todas las referencias.
+
+        Args:
+            query (Dict): Vector de rasgos del texto de entrada
+            weights (Dict[str, float]): Pesos de cada métrica
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, np.ndarray]]: Scores (0-1) y similitudes
+                individuales de cada fila; las filas eliminadas deben ignorarse
+        """
+        numeric = self.numeric[:self.size]
+        sentence_length_sim = safe_similarity(query['avg_sentence_length'], numeric[:, 0])
+        word_length_sim = safe_similarity(query['avg_word_length'], numeric[:, 1])
+        unique_words_sim = safe_similarity(query['unique_words_ratio'], numeric[:, 2])
+        common_words_sim = self.common_word_overlap(query['common_words']) / 10
+
+        if self.categories:
+            query_spelling = np.array(
+                [bool(query['spelling_categories'][category]) for category in self.categories]
+            )
+            spelling = self.spelling[:self.size]
+            spelling_sim = (spelling == query_spelling).sum(axis=1) / len(self.categories)
+        else:
+            spelling_sim = np.zeros(self.size)
+
+        final_scores = (
+            weights['sentence_length'] * sentence_length_sim +
+            weights['word_length'] * word_length_sim +
+            weights['unique_words'] * unique_words_sim +
+            weights['common_words'] * common_words_sim +
+            weights['spelling_patterns'] * spelling_sim
+        )
+
+        detailed_scores = {
+            'sentence_length_similarity': sentence_length_sim,
+            'word_length_similarity': word_length_sim,
+            'unique_words_similarity': unique_words_sim,
+            'common_words_similarity': common_words_sim,
+            'spelling_patterns_similarity': spelling_sim
+        }
+
+        return final_scores, detailed_scores
@@ -0,0 +1,166 @@
+# vocabulary.py
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+class Vocabulary:
+    """Vocabulario compartido que asigna a cada palabra un identificador entero."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.ids: Dict[str, int] = {}
+        self.words: List[str] = []
+        for word in words:
+            self.intern(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ids
+
+    def intern(self, word: str) -> int:
+        """Devuelve el identificador de una palabra, registrándola si es nueva."""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.ids[word] = word_id
+            self.words.append(word)
+        return word_id
+
+    def get(self, word: str, default: int = -1) -> int:
+        """Devuelve el identificador de una palabra sin registrarla."""
+        return self.ids.get(word, default)
+
+
+# Rasgos numéricos de un perfil, en el orden de extract_features
+PROFILE_NUMBERS = ('avg_sentence_length', 'std_sentence_length', 'max_sentence_length',
+                   'min_sentence_length', 'unique_words_ratio', 'avg_word_length')
+
+# Claves del vector de rasgos, en el orden de extract_features
+PROFILE_KEYS = PROFILE_NUMBERS + ('common_words', 'spelling_categories')
+
+
+class CompactProfile(Mapping):
+    """
+    Vector de rasgos de un texto de referencia en formato compacto.
+
+    Las palabras comunes se guardan como identificadores ordenados de un
+    vocabulario compartido y las categorías ortográficas como máscara de
+    bits, en lugar de un conjunto de cadenas y un diccionario por perfil.
+    Se lee como el diccionario de extract_features (de solo lectura): las
+    claves 'common_words' y 'spelling_categories' se reconstruyen al pedirlas.
+    """
+
+    __slots__ = PROFILE_NUMBERS + ('word_ids', 'spelling', 'codec')
+
+    def __getitem__(self, key: str):
+        if key == 'common_words':
+            words = self.codec.vocabulary.words
+            return {words[word_id] for word_id in self.word_ids}
+        if key == 'spelling_categories':
+            mask = self.spelling
+            return {category: bool(mask >> bit & 1)
+                    for bit, category in enumerate(self.codec.categories)}
+        if key in PROFILE_NUMBERS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PROFILE_KEYS)
+
+    def __len__(self) -> int:
+        return len(PROFILE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"CompactProfile({dict(self)!r})"
+
+    def __reduce__(self):
+        # Se serializa como diccionario: el vocabulario no viaja con cada perfil
+        return dict, (dict(self),)
+
+    def common_word_overlap(self, other: 'CompactProfile') -> int:
+        """Palabras comunes compartidas con otro perfil del mismo vocabulario."""
+        if isinstance(other.word_ids, frozenset):
+            return len(other.word_ids.intersection(self.word_ids))
+        return len(frozenset(self.word_ids).intersection(other.word_ids))
+
+
+class ProfileCodec:
+    """Convierte vectores de rasgos a CompactProfile sobre un vocabulario compartido."""
+
+    def __init__(self, categories: Iterable[str], vocabulary: Optional[Vocabulary] = None):
+        """
+        Args:
+            categories (Iterable[str]): Categorías ortográficas, en orden
+            vocabulary (Optional[Vocabulary]): Vocabulario a reutilizar
+        """
+        self.categories: List[str] = list(categories)
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+
+    def _profile(self, features: Mapping, word_ids, spelling: int) -> CompactProfile:
+        return self.from_values([features[key] for key in PROFILE_NUMBERS], word_ids, spelling)
+
+    def from_values(self, numbers: Sequence, word_ids, spelling: int) -> CompactProfile:
+        """
+        Crea un perfil a partir de valores ya codificados.
+
+        Args:
+            numbers (Sequence): Rasgos numéricos en el orden de PROFILE_NUMBERS
+            word_ids: Identificadores de las palabras comunes en este vocabulario,
+                como array ordenado (referencias) o frozenset (consultas)
+            spelling (int): Máscara de bits de las categorías ortográficas
+
+        Returns:
+            CompactProfile: Perfil del vocabulario de este codificador
+        """
+        profile = CompactProfile()
+        for key, value in zip(PROFILE_NUMBERS, numbers):
+            setattr(profile, key, value)
+        profile.word_ids = word_ids
+        profile.spelling = spelling
+        profile.codec = self
+        return profile
+
+    def _spelling_mask(self, categories: Dict[str, bool]) -> int:
+        mask = 0
+        for bit, category in enumerate(self.categories):
+            if categories[category]:
+                mask |= 1 << bit
+        return mask
+
+    def encode(self, features: Mapping) -> CompactProfile:
+        """
+        Convierte un vector de rasgos de referencia, registrando sus palabras.
+
+        Args:
+            features (Mapping): Vector de rasgos con el formato de extract_features
+
+        Returns:
+            CompactProfile: Perfil con las palabras como array ordenado de enteros
+        """
+        if isinstance(features, CompactProfile) and features.codec is self:
+            return features
+        word_ids = array('i', sorted(self.vocabulary.intern(word)
+                                     for word in features['common_words']))
+        return self._profile(features, word_ids,
+                             self._spelling_mask(features['spelling_categories']))
+
+    def query(self, features: Mapping) -> CompactProfile:
+        """
+        Convierte el vector de rasgos de un texto de entrada sin ampliar el vocabulario.
+
+        Las palabras que no están en el vocabulario no pueden coincidir con
+        ninguna referencia y se omiten; las demás quedan en un frozenset para
+        cruzarlas con los arrays de cada referencia.
+
+        Args:
+            features (Mapping): Vector de rasgos con el formato de extract_features
+
+        Returns:
+            CompactProfile: Perfil de consulta
+        """
+        ids = self.vocabulary.ids
+        word_ids = frozenset(ids[word] for word in features['common_words'] if word in ids)
+        return self._profile(features, word_ids,
+                             self._spelling_mask(features['spelling_categories']))
@@ -0,0 +1,106 @@
+# workers.py
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from analyzer import DEFAULT_PROFILE_STORE, TextStyleAnalyzer
+from cache import ResultCache
+from corpus import open_corpus
+
+# Referencias a partir de las cuales los procesos comparten un archivo columnar;
+# por debajo, leer el almacén de perfiles es más rápido que importar NumPy
+COLUMNAR_MIN_REFERENCES = 5000
+
+# Analizador de este proceso, reutilizado entre documentos y tareas
+_worker_analyzer: Optional[TextStyleAnalyzer] = None
+
+
+def create_analyzer(corpus_path: Optional[str] = None, features_path: Optional[str] = None,
+                    cache_dir: Optional[str] = None, timings: bool = False,
+                    cache: bool = False,
+                    profile_store_path: Optional[str] = DEFAULT_PROFILE_STORE
+                    ) -> TextStyleAnalyzer:
+    """
+    Crea un analizador con las opciones comunes de los modos por lotes y de servicio.
+
+    Args:
+        corpus_path (Optional[str]): Directorio del corpus; por defecto el incorporado
+        features_path (Optional[str]): Perfiles exportados en formato columnar
+        cache_dir (Optional[str]): Directorio de la caché de resultados en disco
+        timings (bool): Activar la instrumentación
+        cache (bool): Usar una caché de resultados en memoria aunque no haya cache_dir
+        profile_store_path (Optional[str]): Almacén de perfiles; None para no persistir
+
+    Returns:
+        TextStyleAnalyzer: Analizador configurado
+    """
+    # Con cache_dir, todos los procesos comparten el nivel en disco de la caché
+    result_cache = ResultCache(directory=cache_dir) if cache or cache_dir else None
+    analyzer = TextStyleAnalyzer(profile_store_path=profile_store_path,
+                                 corpus=open_corpus(corpus_path),
+                                 cache=result_cache, features_path=features_path)
+    if timings:
+        analyzer.enable_instrumentation()
+    return analyzer
+
+
+def init_worker(corpus_path: Optional[str] = None, features_path: Optional[str] = None,
+                cache_dir: Optional[str] = None, timings: bool = False, cache: bool = False,
+                profile_store_path: Optional[str] = DEFAULT_PROFILE_STORE,
+                references: bool = True):
+    """
+    Crea el analizador del proceso; sirve de initializer de ProcessPoolExecutor.
+
+    Los argumentos son los de create_analyzer. Con references, deja listos
+    los perfiles de referencia antes de la primera tarea.
+    """
+    global _worker_analyzer
+    _worker_analyzer = create_analyzer(corpus_path, features_path, cache_dir, timings, cache,
+                                       profile_store_path)
+    if references:
+        _worker_analyzer.load_references()
+
+
+def worker_analyzer() -> Optional[TextStyleAnalyzer]:
+    """Devuelve el analizador de este proceso, o None si no se ha creado."""
+    return _worker_analyzer
+
+
+def set_worker_analyzer(analyzer: Optional[TextStyleAnalyzer]):
+    """Usa un analizador ya creado como el de este proceso (ejecución en un solo proceso)."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+@contextmanager
+def worker_pool(analyzer: TextStyleAnalyzer, corpus_path: Optional[str], workers: int,
+                cache_dir: Optional[str] = None, timings: bool = False
+                ) -> Iterator[ProcessPoolExecutor]:
+    """
+    Abre un grupo de procesos con un analizador precargado en cada uno.
+
+    Los perfiles de referencia se calculan una vez en este proceso antes de
+    repartir el trabajo. Con corpus grandes se exportan en formato columnar a
+    un directorio temporal, que los procesos proyectan en memoria y comparten.
+
+    Args:
+        analyzer (TextStyleAnalyzer): Analizador de este proceso
+        corpus_path (Optional[str]): Directorio del corpus; por defecto el incorporado
+        workers (int): Número de procesos
+        cache_dir (Optional[str]): Directorio de la caché de resultados en disco
+        timings (bool): Activar la instrumentación en los procesos
+
+    Returns:
+        Iterator[ProcessPoolExecutor]: Grupo de procesos, cerrado al salir
+    """
+    references = analyzer.load_references()
+    with tempfile.TemporaryDirectory(prefix='features-') as features_dir:
+        features_path = None
+        if references >= COLUMNAR_MIN_REFERENCES:
+            features_path = features_dir
+            analyzer.export_features(features_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(corpus_path, features_path, cache_dir,
+                                           timings)) as executor:
+            yield executor